@@ -0,0 +1,233 @@
+"""
+Synthetic resume corpus for benchmarks and load tests.
+
+Usage (from backend/):
+    python benchmarks/corpus.py --out /tmp/corpus [--count 30] [--seed 1]
+
+Resumes are generated from a seed, so the same arguments always produce the
+same corpus. Sizes are spread log-uniformly between --min-words and
+--max-words (100 to 20,000 by default); PDFs get one page per ~400 words
+(1 to 50 pages). The skill density (share of bullets naming taxonomy skills)
+varies from 0 to 0.8. Each resume is written as TXT, DOCX or PDF in turn,
+together with manifest.json describing every file and job_descriptions.json.
+"""
+import argparse
+import io
+import json
+import math
+import os
+import random
+
+import docx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TAXONOMY_PATH = os.path.join(BACKEND_DIR, 'resumes', 'data', 'skills.json')
+
+FILE_TYPES = ('txt', 'docx', 'pdf')
+WORDS_PER_PAGE = 400
+MAX_PAGES = 50
+LINE_WIDTH = 90
+
+FIRST_NAMES = ['Alex', 'Jordan', 'Sam', 'Taylor', 'Morgan', 'Casey', 'Riley', 'Jamie', 'Avery', 'Quinn']
+LAST_NAMES = ['Smith', 'Garcia', 'Chen', 'Okafor', 'Novak', 'Patel', 'Silva', 'Kowalski', 'Haddad', 'Berg']
+TITLES = ['Software Engineer', 'Data Analyst', 'Backend Developer', 'DevOps Engineer', 'Product Manager',
+          'Data Scientist', 'Frontend Developer', 'QA Engineer', 'Solutions Architect', 'Site Reliability Engineer']
+COMPANIES = ['Acme Corp', 'Globex', 'Initech', 'Umbrella Labs', 'Stark Industries', 'Wayne Systems', 'Hooli',
+             'Vandelay Imports', 'Soylent Inc', 'Tyrell Analytics']
+VERBS = ['Developed', 'Designed', 'Implemented', 'Led', 'Built', 'Managed', 'Improved', 'Created', 'Automated',
+         'Migrated', 'Optimized', 'Maintained', 'Delivered', 'Reduced', 'Scaled']
+OBJECTS = ['a billing service', 'the reporting pipeline', 'customer onboarding flows', 'internal dashboards',
+           'the search backend', 'a data warehouse', 'release tooling', 'the mobile API', 'monitoring and alerting',
+           'an inventory system', 'payment integrations', 'the recommendation engine']
+OUTCOMES = ['cutting latency by {n}%', 'saving {n} hours per week', 'serving {n}k daily users',
+            'reducing costs by {n}%', 'improving conversion by {n}%', 'with a team of {n} engineers']
+FILLER = ['collaborated', 'with', 'stakeholders', 'across', 'teams', 'to', 'define', 'requirements', 'and',
+          'ship', 'reliable', 'features', 'on', 'schedule', 'while', 'mentoring', 'junior', 'colleagues']
+
+
+def load_skill_names():
+    with open(TAXONOMY_PATH, encoding='utf-8') as f:
+        return [skill['name'] for skill in json.load(f)['skills']]
+
+
+def corpus_specs(count, seed=1, min_words=100, max_words=20000, file_types=FILE_TYPES):
+    """Deterministic list of resume specs (name, file type, words, pages, skill density)"""
+    rng = random.Random(seed)
+    specs = []
+    for index in range(count):
+        words = int(math.exp(rng.uniform(math.log(min_words), math.log(max_words))))
+        file_type = file_types[index % len(file_types)]
+        specs.append({
+            'name': f"resume_{index:04d}.{file_type}",
+            'file_type': file_type,
+            'words': words,
+            'pages': max(1, min(MAX_PAGES, round(words / WORDS_PER_PAGE))),
+            'skill_density': round(rng.uniform(0, 0.8), 2),
+            'seed': rng.randrange(2 ** 31),
+        })
+    return specs
+
+
+def _wrap(text):
+    lines, current = [], ''
+    for word in text.split():
+        if current and len(current) + 1 + len(word) > LINE_WIDTH:
+            lines.append(current)
+            current = word
+        else:
+            current = f"{current} {word}" if current else word
+    if current:
+        lines.append(current)
+    return lines
+
+
+def _bullet(rng, skills, skill_density):
+    parts = [rng.choice(VERBS), rng.choice(OBJECTS)]
+    if rng.random() < skill_density:
+        parts.append('using ' + ', '.join(rng.sample(skills, rng.randint(1, 3))))
+    parts.append(rng.choice(OUTCOMES).format(n=rng.randint(2, 90)))
+    parts.extend(rng.sample(FILLER, rng.randint(0, 8)))
+    return ' '.join(parts) + '.'
+
+
+def resume_lines(spec, skills=None):
+    """Text lines of a resume: contact header, sections and enough bullets to reach its word count"""
+    skills = skills or load_skill_names()
+    rng = random.Random(spec['seed'])
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    years = rng.randint(1, 15)
+
+    lines = [
+        f"{first} {last}",
+        f"{first.lower()}.{last.lower()}@example.com | +1 555-{rng.randint(100, 999)}-{rng.randint(1000, 9999)}",
+        '',
+        'Summary',
+        f"{rng.choice(TITLES)} with {years} years of experience building production systems.",
+        '',
+        'Skills',
+        ', '.join(rng.sample(skills, max(3, int(15 * spec['skill_density'])))),
+        '',
+        'Experience',
+    ]
+    words = sum(len(line.split()) for line in lines)
+    while words < spec['words']:
+        if rng.random() < 0.15:
+            heading = f"{rng.choice(TITLES)}, {rng.choice(COMPANIES)} ({2024 - rng.randint(1, 20)})"
+            lines.append(heading)
+            words += len(heading.split())
+        for line in _wrap('- ' + _bullet(rng, skills, spec['skill_density'])):
+            lines.append(line)
+            words += len(line.split())
+    lines += ['', 'Education', f"BSc Computer Science, {rng.choice(COMPANIES)} University"]
+    return lines
+
+
+def _pdf_string(line):
+    text = line.encode('latin-1', 'replace')
+    return b'(' + text.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)') + b')'
+
+
+def render_pdf(lines, pages):
+    """Minimal PDF with the lines spread over the given number of text pages (Helvetica)"""
+    per_page = max(1, math.ceil(len(lines) / pages))
+    chunks = [lines[start:start + per_page] for start in range(0, len(lines), per_page)] or [[]]
+    leading = max(1, min(14, 700 // per_page))
+
+    objects = [b'<< /Type /Catalog /Pages 2 0 R >>', None,
+               b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>']
+    kids = []
+    for chunk in chunks:
+        content = b'BT /F1 %d Tf 40 760 Td %d TL ' % (max(4, leading - 2), leading)
+        content += b' '.join(_pdf_string(line) + b" '" for line in chunk) + b' ET'
+        objects.append(b'<< /Length %d >>\nstream\n' % len(content) + content + b'\nendstream')
+        objects.append(b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents %d 0 R '
+                       b'/Resources << /Font << /F1 3 0 R >> >> >>' % len(objects))
+        kids.append(len(objects))
+    objects[1] = (b'<< /Type /Pages /Kids [' + b' '.join(b'%d 0 R' % kid for kid in kids) +
+                  b'] /Count %d >>' % len(kids))
+
+    out = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b'%d 0 obj\n' % number + body + b'\nendobj\n'
+    xref = len(out)
+    out += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    out += b''.join(b'%010d 00000 n \n' % offset for offset in offsets)
+    out += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def render_docx(lines):
+    document = docx.Document()
+    document.sections[0].header.paragraphs[0].text = lines[1]
+    sections = {'Summary', 'Skills', 'Experience', 'Education'}
+    for line in lines:
+        if line in sections:
+            document.add_heading(line, level=1)
+        elif line:
+            document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def render(spec, skills=None):
+    """File bytes of a resume spec"""
+    lines = resume_lines(spec, skills)
+    if spec['file_type'] == 'pdf':
+        return render_pdf(lines, spec['pages'])
+    if spec['file_type'] == 'docx':
+        return render_docx(lines)
+    return '\n'.join(lines).encode('utf-8')
+
+
+def job_descriptions(count, seed=1, skills=None):
+    """Job postings naming 3-12 taxonomy skills each"""
+    skills = skills or load_skill_names()
+    rng = random.Random(seed + 1)
+    postings = []
+    for _ in range(count):
+        required = rng.sample(skills, rng.randint(3, 12))
+        postings.append(
+            f"We are hiring a {rng.choice(TITLES)} at {rng.choice(COMPANIES)}. "
+            f"Requirements: {rng.randint(2, 8)}+ years of experience with {', '.join(required)}. "
+            f"You will {rng.choice(VERBS).lower()} {rng.choice(OBJECTS)} and work closely with product teams."
+        )
+    return postings
+
+
+def write_corpus(out_dir, specs, job_count=10, seed=1):
+    os.makedirs(out_dir, exist_ok=True)
+    skills = load_skill_names()
+    manifest = []
+    for spec in specs:
+        data = render(spec, skills)
+        with open(os.path.join(out_dir, spec['name']), 'wb') as f:
+            f.write(data)
+        manifest.append({**spec, 'bytes': len(data)})
+    with open(os.path.join(out_dir, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    with open(os.path.join(out_dir, 'job_descriptions.json'), 'w') as f:
+        json.dump(job_descriptions(job_count, seed, skills), f, indent=2)
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--out', required=True, help='Directory to write the corpus to')
+    parser.add_argument('--count', type=int, default=30)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--min-words', type=int, default=100)
+    parser.add_argument('--max-words', type=int, default=20000)
+    parser.add_argument('--jobs', type=int, default=10, help='Number of job descriptions')
+    args = parser.parse_args()
+
+    specs = corpus_specs(args.count, args.seed, args.min_words, args.max_words)
+    manifest = write_corpus(args.out, specs, args.jobs, args.seed)
+    total = sum(item['bytes'] for item in manifest)
+    print(f"Wrote {len(manifest)} resumes ({total / 1024 / 1024:.1f} MiB) and {args.jobs} job descriptions to {args.out}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,348 @@
+"""
+Concurrent load test of the HTTP API with latency SLO checks.
+
+Usage (from backend/):
+    python benchmarks/load_test.py [--rate 20] [--duration 30]
+        [--mix upload=1,detail=6,list=3] [--workers 2] [--threads 4]
+        [--env ADMISSION_UPLOAD_CONCURRENCY=2] [--slo upload.p95=3000]
+        [--slo all.error_rate=0.01] [--json report.json]
+
+Starts gunicorn with resume_analyzer.wsgi (or the ASGI profile with --asgi)
+on a free local port, after running migrations, unless --url points at a
+running server. The server uses the configured settings and database; pass
+--settings to point it elsewhere. Requests are sent open-loop at --rate per
+second in the --mix proportions, with uploads drawn from a synthetic corpus
+(see corpus.py). Latency is measured from each request's scheduled start,
+so a backed-up client pool shows up as latency instead of a lower rate.
+
+Every --interval seconds it prints throughput, errors, p95 and the RSS of
+the server processes (gunicorn master, workers and pool processes; Linux
+only). The final report has throughput, error rate and p50/p95/p99/max per
+endpoint. Each --slo is `<endpoint or all>.<p50|p95|p99|max|error_rate>=<limit>`
+(milliseconds for latencies); the exit status is 1 if any is exceeded.
+"""
+import argparse
+import json
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from benchmarks.corpus import corpus_specs, job_descriptions, load_skill_names, render  # noqa: E402
+from benchmarks.stats import percentile, summarize  # noqa: E402
+
+ENDPOINTS = ('upload', 'detail', 'list')
+SLO_METRICS = ('p50', 'p95', 'p99', 'max', 'error_rate')
+CONTENT_TYPES = {
+    'pdf': 'application/pdf',
+    'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+    'txt': 'text/plain',
+}
+
+
+def parse_mix(value):
+    mix = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        if name not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"Unknown endpoint {name!r}; use {', '.join(ENDPOINTS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def parse_slo(value):
+    target, _, limit = value.partition('=')
+    scope, _, metric = target.partition('.')
+    if scope not in ENDPOINTS + ('all',) or metric not in SLO_METRICS or not limit:
+        raise argparse.ArgumentTypeError(f"Invalid SLO {value!r}; expected e.g. upload.p95=2000 or all.error_rate=0.01")
+    return scope, metric, float(limit)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def process_tree_rss(root_pid):
+    """Resident memory in bytes of a process and all its descendants (Linux /proc)"""
+    children = defaultdict(list)
+    for entry in os.listdir('/proc'):
+        if entry.isdigit():
+            try:
+                with open(f'/proc/{entry}/stat') as f:
+                    # The command name may contain spaces; fields resume after ')'
+                    parent = int(f.read().rsplit(')', 1)[1].split()[1])
+                children[parent].append(int(entry))
+            except (OSError, IndexError, ValueError):
+                continue
+
+    total, pending = 0, [root_pid]
+    while pending:
+        pid = pending.pop()
+        pending.extend(children.get(pid, ()))
+        try:
+            with open(f'/proc/{pid}/status') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        total += int(line.split()[1]) * 1024
+                        break
+        except OSError:
+            continue
+    return total
+
+
+class Server:
+    """A gunicorn process serving the app on a local port"""
+
+    def __init__(self, args):
+        self.port = free_port()
+        self.url = f'http://127.0.0.1:{self.port}'
+        self.env = dict(os.environ)
+        if args.settings:
+            self.env['DJANGO_SETTINGS_MODULE'] = args.settings
+        for item in args.env:
+            key, _, value = item.partition('=')
+            self.env[key] = value
+
+        command = [sys.executable, '-m', 'gunicorn', '--bind', f'127.0.0.1:{self.port}',
+                   '--workers', str(args.workers)]
+        if args.asgi:
+            self.env['ASYNC_VIEWS'] = 'True'
+            command += ['resume_analyzer.asgi:application', '-k', 'uvicorn.workers.UvicornWorker']
+        else:
+            command += ['resume_analyzer.wsgi:application', '--threads', str(args.threads)]
+            if args.worker_class:
+                command += ['-k', args.worker_class]
+        self.command = command + args.gunicorn_arg
+
+    def start(self):
+        subprocess.run([sys.executable, 'manage.py', 'migrate', '-v', '0'], cwd=BACKEND_DIR, env=self.env, check=True)
+        self.process = subprocess.Popen(self.command, cwd=BACKEND_DIR, env=self.env)
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"Server exited with status {self.process.returncode}")
+            try:
+                urllib.request.urlopen(f'{self.url}/api/my-resumes/?limit=1', timeout=2)
+                return
+            except (urllib.error.URLError, OSError):
+                time.sleep(0.2)
+        raise RuntimeError('Server did not become ready within 30 seconds')
+
+    def rss(self):
+        return process_tree_rss(self.process.pid)
+
+    def stop(self):
+        self.process.send_signal(signal.SIGTERM)
+        try:
+            self.process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+
+class LoadTest:
+    def __init__(self, base_url, corpus, jobs, timeout):
+        self.base_url = base_url
+        self.corpus = corpus
+        self.jobs = jobs
+        self.timeout = timeout
+        self.resume_ids = []
+        self.samples = []
+        self.lock = threading.Lock()
+
+    def _request(self, method, path, body=None, headers=None):
+        request = urllib.request.Request(self.base_url + path, data=body, method=method, headers=headers or {})
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return response.status, response.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.read()
+
+    def upload(self, rng):
+        document = rng.choice(self.corpus)
+        boundary = uuid.uuid4().hex
+        body = (
+            f'--{boundary}\r\nContent-Disposition: form-data; name="job_description"\r\n\r\n'
+            f'{rng.choice(self.jobs)}\r\n'
+            f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{document["name"]}"\r\n'
+            f'Content-Type: {CONTENT_TYPES[document["file_type"]]}\r\n\r\n'
+        ).encode() + document['data'] + f'\r\n--{boundary}--\r\n'.encode()
+        status, content = self._request('POST', '/api/upload/', body,
+                                        {'Content-Type': f'multipart/form-data; boundary={boundary}'})
+        if status == 201:
+            with self.lock:
+                self.resume_ids.append(json.loads(content)['id'])
+        return status
+
+    def detail(self, rng):
+        with self.lock:
+            resume_id = rng.choice(self.resume_ids) if self.resume_ids else 0
+        return self._request('GET', f'/api/resumes/{resume_id}/')[0]
+
+    def list(self, rng):
+        return self._request('GET', f'/api/my-resumes/?limit={rng.choice((10, 20, 50))}')[0]
+
+    def run_one(self, endpoint, scheduled, seed):
+        rng = random.Random(seed)
+        try:
+            status = getattr(self, endpoint)(rng)
+        except Exception:
+            status = None
+        finished = time.monotonic()
+        with self.lock:
+            self.samples.append((endpoint, scheduled, finished, finished - scheduled, status))
+
+
+def is_error(status):
+    return status is None or status >= 400
+
+
+def interval_line(elapsed, samples, rss):
+    latencies = sorted(sample[3] for sample in samples)
+    errors = sum(1 for sample in samples if is_error(sample[4]))
+    p95 = percentile(latencies, 95)
+    return (f"{elapsed:7.1f}s  {len(samples):6d} done  {errors:5d} errors  "
+            f"p95 {p95 * 1000 if p95 is not None else 0:9.1f} ms  "
+            + (f"rss {rss / 1024 / 1024:8.1f} MiB" if rss is not None else ''))
+
+
+def summarize_samples(samples, duration):
+    summary = {}
+    groups = {'all': samples, **{name: [s for s in samples if s[0] == name] for name in ENDPOINTS}}
+    for name, group in groups.items():
+        if not group:
+            continue
+        statuses = Counter(str(sample[4]) for sample in group)
+        errors = sum(1 for sample in group if is_error(sample[4]))
+        summary[name] = {
+            **summarize([sample[3] for sample in group]),
+            'throughput_per_s': round(len(group) / duration, 2),
+            'error_rate': round(errors / len(group), 4),
+            'statuses': dict(statuses),
+        }
+    return summary
+
+
+def check_slos(summary, slos):
+    violations = []
+    for scope, metric, limit in slos:
+        result = summary.get(scope)
+        if not result:
+            continue
+        value = result['error_rate'] if metric == 'error_rate' else result[f'{metric}_ms']
+        if value > limit:
+            violations.append(f"{scope}.{metric} = {value} > {limit}")
+    return violations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--url', help='Test a running server instead of starting gunicorn')
+    parser.add_argument('--rate', type=float, default=20, help='Requests per second')
+    parser.add_argument('--duration', type=float, default=30, help='Seconds of load')
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix('upload=1,detail=6,list=3'))
+    parser.add_argument('--clients', type=int, default=64, help='Concurrent client connections at most')
+    parser.add_argument('--timeout', type=float, default=60, help='Per-request timeout in seconds')
+    parser.add_argument('--corpus-count', type=int, default=20, help='Resumes in the upload corpus')
+    parser.add_argument('--max-words', type=int, default=5000, help='Largest resume in the corpus')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--seed-uploads', type=int, default=5, help='Uploads before the timed run')
+    parser.add_argument('--interval', type=float, default=5, help='Seconds between progress lines')
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn workers')
+    parser.add_argument('--threads', type=int, default=1, help='Threads per gunicorn worker (WSGI)')
+    parser.add_argument('--worker-class', help='gunicorn worker class (WSGI), e.g. gthread')
+    parser.add_argument('--asgi', action='store_true', help='Serve resume_analyzer.asgi with uvicorn workers')
+    parser.add_argument('--gunicorn-arg', action='append', default=[], help='Extra gunicorn argument')
+    parser.add_argument('--settings', help='DJANGO_SETTINGS_MODULE for the server')
+    parser.add_argument('--env', action='append', default=[], help='KEY=VALUE for the server environment')
+    parser.add_argument('--slo', type=parse_slo, action='append', default=[],
+                        help='e.g. upload.p95=3000, detail.p99=200, all.error_rate=0.01')
+    parser.add_argument('--json', help='Write the timeline and summary to this file')
+    args = parser.parse_args()
+
+    skills = load_skill_names()
+    specs = corpus_specs(args.corpus_count, args.seed, max_words=args.max_words)
+    corpus = [{**spec, 'data': render(spec, skills)} for spec in specs]
+    jobs = job_descriptions(10, args.seed, skills)
+
+    server = None if args.url else Server(args)
+    if server:
+        print(f"Starting: {' '.join(server.command)}")
+        server.start()
+    base_url = args.url or server.url
+
+    try:
+        test = LoadTest(base_url, corpus, jobs, args.timeout)
+        rng = random.Random(args.seed)
+        for _ in range(args.seed_uploads):
+            test.upload(rng)
+
+        names = list(args.mix)
+        weights = [args.mix[name] for name in names]
+        timeline = []
+        start = time.monotonic()
+        next_report = start + args.interval
+        reported = 0
+        sent = 0
+
+        with ThreadPoolExecutor(max_workers=args.clients) as executor:
+            while True:
+                scheduled = start + sent / args.rate
+                if scheduled >= start + args.duration:
+                    break
+                now = time.monotonic()
+                if now >= next_report:
+                    with test.lock:
+                        window = test.samples[reported:]
+                        reported = len(test.samples)
+                    rss = server.rss() if server else None
+                    print(interval_line(now - start, window, rss))
+                    timeline.append({'elapsed_s': round(now - start, 1), 'completed': len(window),
+                                     'errors': sum(1 for s in window if is_error(s[4])), 'rss_bytes': rss})
+                    next_report += args.interval
+                if scheduled > now:
+                    time.sleep(min(scheduled, next_report) - now)
+                    continue
+                executor.submit(test.run_one, rng.choices(names, weights)[0], scheduled, rng.random())
+                sent += 1
+
+        duration = time.monotonic() - start
+        rss = server.rss() if server else None
+    finally:
+        if server:
+            server.stop()
+
+    summary = summarize_samples(test.samples, duration)
+    print(f"\n{sent} requests in {duration:.1f}s" + (f", final server RSS {rss / 1024 / 1024:.1f} MiB" if rss else ''))
+    for name, result in summary.items():
+        print(f"{name:>7}: {result['count']:6d} req {result['throughput_per_s']:8.1f}/s  "
+              f"errors {result['error_rate']:7.2%}  p50 {result['p50_ms']:8.1f}  p95 {result['p95_ms']:8.1f}  "
+              f"p99 {result['p99_ms']:8.1f}  max {result['max_ms']:8.1f} ms  {result['statuses']}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'args': {k: v for k, v in vars(args).items() if k != 'slo'},
+                       'slos': [list(slo) for slo in args.slo], 'timeline': timeline, 'summary': summary}, f, indent=2)
+
+    violations = check_slos(summary, args.slo)
+    for violation in violations:
+        print(f"SLO violated: {violation}")
+    if violations:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,234 @@
+"""
+Benchmark the analysis pipeline on a synthetic corpus.
+
+Usage (from backend/):
+    python benchmarks/run_benchmarks.py [--count 30] [--seed 1] [--repeat 3]
+        [--only extract_text_from_pdf,upload] [--save baseline.json]
+        [--compare baseline.json] [--max-regression 0.2]
+
+Times each pipeline function over the corpus (see corpus.py) and the full
+POST /api/upload/ path through the Django test client, against a throwaway
+test database and media directory. Reports calls, throughput, p50/p95/p99
+latency and peak traced memory (measured in a separate, untimed pass).
+
+The analysis cache is disabled so every call does the real work. The
+function benchmarks extract inline (EXTRACTION_POOL_SIZE=0) so the parsing
+itself is measured; the upload benchmark uses the configured pool.
+
+--save writes the results as JSON; --compare reads such a file and exits
+with status 1 if any benchmark's p50 or p95 got more than --max-regression
+slower. Compare runs of the same corpus (--count, --seed) on the same machine.
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'resume_analyzer.settings')
+os.environ['ANALYSIS_CACHE_ENABLED'] = 'False'
+os.environ.setdefault('RESPONSE_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.core.files.uploadedfile import SimpleUploadedFile  # noqa: E402
+from django.test import Client, override_settings  # noqa: E402
+from django.test.utils import (  # noqa: E402
+    setup_databases, setup_test_environment, teardown_databases, teardown_test_environment,
+)
+
+from benchmarks.corpus import corpus_specs, job_descriptions, load_skill_names, render, resume_lines  # noqa: E402
+from benchmarks.stats import summarize  # noqa: E402
+from resumes.analyzer import (  # noqa: E402
+    analyze_resume_with_ai, calculate_experience_score, calculate_formatting_score, calculate_keywords_score,
+    calculate_text_quality, extract_skills, generate_suggestions,
+)
+from resumes.docx_text import extract_docx_text  # noqa: E402
+from resumes.extraction import extract_text_from_docx, extract_text_from_pdf  # noqa: E402
+from resumes.features import JobDescription, TokenizedDocument  # noqa: E402
+
+# Both p50 and p95 are compared; p99 over a few dozen calls is mostly noise
+COMPARED = ('p50_ms', 'p95_ms')
+
+
+def build_corpus(count, seed):
+    skills = load_skill_names()
+    documents = []
+    for spec in corpus_specs(count, seed):
+        text = '\n'.join(resume_lines(spec, skills))
+        documents.append({**spec, 'data': render(spec, skills), 'text': text})
+    return documents, job_descriptions(max(1, count // 3), seed, skills)
+
+
+def function_benchmarks(documents, jobs):
+    """(name, function, argument tuples) for each pipeline function"""
+    tokenized = [TokenizedDocument(doc['text']) for doc in documents]
+    prepared_jobs = [JobDescription(jobs[index % len(jobs)]) for index in range(len(documents))]
+
+    def uploaded(doc):
+        return SimpleUploadedFile(doc['name'], doc['data'])
+
+    pdfs = [doc for doc in documents if doc['file_type'] == 'pdf']
+    docxs = [doc for doc in documents if doc['file_type'] == 'docx']
+    texts = [doc['text'] for doc in documents]
+    return [
+        ('extract_text_from_pdf', lambda doc: extract_text_from_pdf(uploaded(doc)), [(doc,) for doc in pdfs]),
+        ('extract_text_from_docx', lambda doc: extract_text_from_docx(uploaded(doc)), [(doc,) for doc in docxs]),
+        ('extract_docx_text', lambda doc: extract_docx_text(uploaded(doc)), [(doc,) for doc in docxs]),
+        ('tokenize', TokenizedDocument, [(text,) for text in texts]),
+        ('extract_skills', extract_skills, [(doc,) for doc in tokenized]),
+        ('calculate_formatting_score', calculate_formatting_score, [(doc,) for doc in tokenized]),
+        ('calculate_experience_score', calculate_experience_score, [(doc,) for doc in tokenized]),
+        ('calculate_keywords_score', calculate_keywords_score, list(zip(tokenized, prepared_jobs))),
+        ('calculate_text_quality', calculate_text_quality, [(doc,) for doc in tokenized]),
+        ('generate_suggestions', lambda text: generate_suggestions(text, ['Python'], 60, 70), [(t,) for t in texts]),
+        ('analyze_resume_with_ai', analyze_resume_with_ai,
+         [(doc['text'], jobs[index % len(jobs)]) for index, doc in enumerate(documents)]),
+    ]
+
+
+def measure(func, calls, repeat):
+    # Warm up: pool start, taxonomy compilation, lazy imports
+    func(*calls[0])
+
+    samples = []
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for args in calls:
+            call_started = time.perf_counter()
+            func(*args)
+            samples.append(time.perf_counter() - call_started)
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    for args in calls:
+        func(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    result = summarize(samples)
+    result['throughput_per_s'] = round(len(samples) / elapsed, 2) if elapsed else None
+    result['peak_memory_kib'] = round(peak / 1024, 1)
+    return result
+
+
+def upload_benchmark(documents, jobs, repeat):
+    client = Client()
+
+    def upload(doc, job):
+        response = client.post('/api/upload/', {
+            'file': SimpleUploadedFile(doc['name'], doc['data']),
+            'job_description': job,
+        })
+        if response.status_code != 201:
+            raise RuntimeError(f"Upload of {doc['name']} failed: {response.status_code} {response.content[:200]}")
+
+    calls = [(doc, jobs[index % len(jobs)]) for index, doc in enumerate(documents)]
+    return measure(upload, calls, repeat)
+
+
+def run(args):
+    documents, jobs = build_corpus(args.count, args.seed)
+    selected = set(args.only.split(',')) if args.only else None
+    results = {}
+
+    with override_settings(EXTRACTION_POOL_SIZE=0):
+        for name, func, calls in function_benchmarks(documents, jobs):
+            if calls and (selected is None or name in selected):
+                results[name] = measure(func, calls, args.repeat)
+                report(name, results[name])
+
+    if selected is None or 'upload' in selected:
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+                results['upload'] = upload_benchmark(documents, jobs, args.repeat)
+                report('upload', results['upload'])
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+
+    return {
+        'meta': {
+            'count': args.count,
+            'seed': args.seed,
+            'repeat': args.repeat,
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'created_at': datetime.now(timezone.utc).isoformat(),
+        },
+        'results': results,
+    }
+
+
+def report(name, result):
+    print(f"{name:>28}: {result['count']:5d} calls {result['throughput_per_s']:9.1f}/s  "
+          f"p50 {result['p50_ms']:9.2f} ms  p95 {result['p95_ms']:9.2f} ms  p99 {result['p99_ms']:9.2f} ms  "
+          f"peak {result['peak_memory_kib']:9.1f} KiB")
+
+
+def compare(current, baseline, max_regression):
+    """Print the change of each benchmark against a baseline; returns the regressed names"""
+    if baseline['meta'].get('count') != current['meta']['count'] or baseline['meta'].get('seed') != current['meta']['seed']:
+        print("Warning: baseline was recorded on a different corpus (--count/--seed)")
+
+    regressions = []
+    print(f"\nCompared with baseline from {baseline['meta'].get('created_at')}:")
+    for name, result in current['results'].items():
+        old = baseline['results'].get(name)
+        if not old:
+            print(f"{name:>28}: new")
+            continue
+        changes = {key: result[key] / old[key] - 1 for key in COMPARED if old.get(key)}
+        regressed = any(change > max_regression for change in changes.values())
+        if regressed:
+            regressions.append(name)
+        print(f"{name:>28}: " + '  '.join(f"{key[:-3]} {change:+7.1%}" for key, change in changes.items()) +
+              ('  REGRESSION' if regressed else ''))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--count', type=int, default=30, help='Resumes in the corpus')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--repeat', type=int, default=3, help='Timed passes over the corpus')
+    parser.add_argument('--only', help='Comma-separated benchmark names')
+    parser.add_argument('--save', help='Write the results to this JSON file')
+    parser.add_argument('--compare', help='Baseline JSON file to compare against')
+    parser.add_argument('--max-regression', type=float, default=0.2,
+                        help='Allowed slowdown of p50/p95 against the baseline (0.2 = 20%%)')
+    args = parser.parse_args()
+
+    # Per-upload request logs would drown the report
+    logging.getLogger('resumes').setLevel(logging.WARNING)
+
+    current = run(args)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(current, f, indent=2)
+        print(f"\nSaved results to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.max_regression)
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) regressed by more than {args.max_regression:.0%}: "
+                  f"{', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,26 @@
+"""Latency summaries shared by the benchmark runner and the load test."""
+
+
+def percentile(sorted_values, q):
+    """Linearly interpolated percentile (q in 0-100) of an already sorted list"""
+    if not sorted_values:
+        return None
+    position = (len(sorted_values) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def summarize(seconds):
+    """Count, mean and p50/p95/p99/max in milliseconds of a list of durations"""
+    values = sorted(seconds)
+    if not values:
+        return {'count': 0}
+    return {
+        'count': len(values),
+        'mean_ms': round(sum(values) / len(values) * 1000, 4),
+        'p50_ms': round(percentile(values, 50) * 1000, 4),
+        'p95_ms': round(percentile(values, 95) * 1000, 4),
+        'p99_ms': round(percentile(values, 99) * 1000, 4),
+        'max_ms': round(values[-1] * 1000, 4),
+    }
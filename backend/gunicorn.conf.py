@@ -0,0 +1,25 @@
+"""
+Gunicorn settings, read from the working directory (see Procfile).
+
+Prometheus multiprocess mode: workers write metric samples to files in
+PROMETHEUS_MULTIPROC_DIR and /api/metrics merges them. The variable
+defaults to a directory under the system temp dir; it is set here, before
+any worker imports prometheus_client, and the directory is emptied at
+startup so samples of a previous run are not counted again.
+"""
+import os
+import shutil
+import tempfile
+
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), 'prometheus'))
+
+
+def on_starting(server):
+    path = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path, exist_ok=True)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
@@ -14,3 +14,9 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'resume_analyzer.settings')
 
 application = get_asgi_application()
+
+# Lease-guarded retention thread: one web process at a time deletes expired
+# uploads (RETENTION_THREAD_ENABLED=False when run_retention runs separately)
+from resumes.retention import start_retention_thread  # noqa: E402
+
+start_retention_thread()
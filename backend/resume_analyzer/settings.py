@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 import os
+import tempfile
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -51,6 +52,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'resumes.request_logging.RequestIdMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -88,6 +90,13 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Concurrent requests (threads or async views) write at the same time:
+        # take the write lock when a transaction starts and wait for it, instead
+        # of failing with "database is locked" on a read-to-write upgrade
+        'OPTIONS': {
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,
+        },
     }
 }
 
@@ -166,5 +175,200 @@ STATIC_URL = '/static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 
 # Upload settings
+# Uploads are streamed to temporary files (hashed, sized and type-checked on
+# the way in) instead of being held in memory; see resumes/uploads.py
+FILE_UPLOAD_HANDLERS = ['resumes.uploads.StreamingUploadHandler']
+UPLOAD_MAX_FILE_SIZE = int(os.environ.get('UPLOAD_MAX_FILE_SIZE', str(10 * 1024 * 1024)))  # 10MB
 FILE_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10MB
 DATA_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10MB
+
+# Background analysis queue
+# When enabled, uploads are queued and processed by `manage.py run_analysis_worker`.
+# Clients can also opt in per request with `async=true`.
+RESUME_ANALYSIS_ASYNC = os.environ.get('RESUME_ANALYSIS_ASYNC', 'False') == 'True'
+ANALYSIS_JOB_LEASE_SECONDS = int(os.environ.get('ANALYSIS_JOB_LEASE_SECONDS', '300'))
+ANALYSIS_JOB_MAX_ATTEMPTS = int(os.environ.get('ANALYSIS_JOB_MAX_ATTEMPTS', '3'))
+ANALYSIS_WORKER_POLL_INTERVAL = float(os.environ.get('ANALYSIS_WORKER_POLL_INTERVAL', '1.0'))
+
+# Every server process (gunicorn starts WEB_CONCURRENCY of them, 1 by default)
+# creates its own extraction and scoring pools, so by default the CPUs are
+# divided between the processes instead of each one taking them all
+WEB_CONCURRENCY = max(1, int(os.environ.get('WEB_CONCURRENCY', '1')))
+DEFAULT_POOL_SIZE = max(1, (os.cpu_count() or 1) // WEB_CONCURRENCY)
+
+# Text extraction budgets (see resumes/extraction.py)
+# Set EXTRACTION_POOL_SIZE=0 to parse in the request thread instead of worker processes.
+EXTRACTION_POOL_SIZE = int(os.environ.get('EXTRACTION_POOL_SIZE', str(DEFAULT_POOL_SIZE)))
+EXTRACTION_MAX_PAGES = int(os.environ.get('EXTRACTION_MAX_PAGES', '20'))
+# Stop reading further PDF pages once this much text has been extracted
+EXTRACTION_MAX_CHARS = int(os.environ.get('EXTRACTION_MAX_CHARS', '100000'))
+EXTRACTION_DEADLINE_SECONDS = float(os.environ.get('EXTRACTION_DEADLINE_SECONDS', '10'))
+EXTRACTION_MAX_MEMORY_MB = int(os.environ.get('EXTRACTION_MAX_MEMORY_MB', '512'))
+
+# Analysis result cache (content hash of the upload + normalized job description)
+# Entries never outlive RETENTION_MAX_AGE_SECONDS; the size bound applies to the
+# result and page text tables separately
+ANALYSIS_CACHE_ENABLED = os.environ.get('ANALYSIS_CACHE_ENABLED', 'True') == 'True'
+ANALYSIS_CACHE_MAX_ENTRIES = int(os.environ.get('ANALYSIS_CACHE_MAX_ENTRIES', '10000'))
+ANALYSIS_CACHE_TTL_SECONDS = int(os.environ.get('ANALYSIS_CACHE_TTL_SECONDS', str(7 * 24 * 3600)))
+
+# Skill taxonomy used by resumes.skills (JSON list of skills with aliases)
+SKILL_TAXONOMY_PATH = os.environ.get('SKILL_TAXONOMY_PATH', os.path.join(BASE_DIR, 'resumes', 'data', 'skills.json'))
+
+# Batch shortlisting (/api/shortlist/)
+SHORTLIST_MAX_FILES = int(os.environ.get('SHORTLIST_MAX_FILES', '500'))
+DATA_UPLOAD_MAX_NUMBER_FILES = SHORTLIST_MAX_FILES
+# Scoring processes used for large batches; 0 scores in the request thread
+SCORING_POOL_SIZE = int(os.environ.get('SCORING_POOL_SIZE', str(DEFAULT_POOL_SIZE)))
+SCORING_POOL_MIN_BATCH = int(os.environ.get('SCORING_POOL_MIN_BATCH', '16'))
+
+# Reverse matching over the term index (/api/match/)
+MATCH_DEFAULT_TOP_K = int(os.environ.get('MATCH_DEFAULT_TOP_K', '20'))
+MATCH_MAX_TOP_K = int(os.environ.get('MATCH_MAX_TOP_K', '200'))
+# Only the most selective query terms are scored; terms in more than this
+# share of the corpus are skipped
+MATCH_MAX_QUERY_TERMS = int(os.environ.get('MATCH_MAX_QUERY_TERMS', '32'))
+MATCH_MAX_DOC_FREQ_RATIO = float(os.environ.get('MATCH_MAX_DOC_FREQ_RATIO', '0.5'))
+
+# Resume listing (/api/my-resumes/), keyset paginated
+RESUME_LIST_PAGE_SIZE = int(os.environ.get('RESUME_LIST_PAGE_SIZE', '20'))
+RESUME_LIST_MAX_PAGE_SIZE = int(os.environ.get('RESUME_LIST_MAX_PAGE_SIZE', '100'))
+
+# Retention of uploaded resumes (see resumes/retention.py)
+# Every web process runs it in a daemon thread (a database lease keeps it to one
+# runner); set RETENTION_THREAD_ENABLED=False when `manage.py run_retention` runs
+# as a separate service
+RETENTION_THREAD_ENABLED = os.environ.get('RETENTION_THREAD_ENABLED', 'True') == 'True'
+RETENTION_MAX_AGE_SECONDS = int(os.environ.get('RETENTION_MAX_AGE_SECONDS', '3600'))
+RETENTION_ORPHAN_MAX_AGE_SECONDS = int(os.environ.get('RETENTION_ORPHAN_MAX_AGE_SECONDS', '3600'))
+RETENTION_INTERVAL_SECONDS = float(os.environ.get('RETENTION_INTERVAL_SECONDS', '300'))
+RETENTION_LOCK_SECONDS = int(os.environ.get('RETENTION_LOCK_SECONDS', str(int(RETENTION_INTERVAL_SECONDS * 3))))
+RETENTION_BATCH_SIZE = int(os.environ.get('RETENTION_BATCH_SIZE', '200'))
+RETENTION_MAX_BATCHES_PER_TICK = int(os.environ.get('RETENTION_MAX_BATCHES_PER_TICK', '10'))
+# Stored files examined per tick by the orphan sweep (resumes/storage.py)
+RETENTION_ORPHAN_SCAN_LIMIT = int(os.environ.get('RETENTION_ORPHAN_SCAN_LIMIT', '10000'))
+
+# Async views for upload, detail and listing under an ASGI server (see Procfile.asgi)
+ASYNC_VIEWS_ENABLED = os.environ.get('ASYNC_VIEWS', 'False') == 'True'
+# Threads per process running blocking extraction and scoring for async uploads
+ASYNC_ANALYSIS_THREADS = int(os.environ.get('ASYNC_ANALYSIS_THREADS', str(os.cpu_count() or 1)))
+
+# Admission control (see resumes/admission.py), shared by the processes of a host
+# Uploads and shortlists that extract and analyze in the request; 0 disables the limit
+ADMISSION_UPLOAD_CONCURRENCY = int(os.environ.get('ADMISSION_UPLOAD_CONCURRENCY', str(os.cpu_count() or 1)))
+ADMISSION_UPLOAD_QUEUE = int(os.environ.get('ADMISSION_UPLOAD_QUEUE', '16'))
+ADMISSION_UPLOAD_MAX_WAIT_SECONDS = float(os.environ.get('ADMISSION_UPLOAD_MAX_WAIT_SECONDS', '30'))
+# Resume detail and listing have their own budget so they stay fast under upload load
+ADMISSION_READ_CONCURRENCY = int(os.environ.get('ADMISSION_READ_CONCURRENCY', '32'))
+ADMISSION_READ_QUEUE = int(os.environ.get('ADMISSION_READ_QUEUE', '64'))
+ADMISSION_READ_MAX_WAIT_SECONDS = float(os.environ.get('ADMISSION_READ_MAX_WAIT_SECONDS', '5'))
+# Retry-After sent with 503 responses; 0 uses the limiter's max wait
+ADMISSION_RETRY_AFTER_SECONDS = int(os.environ.get('ADMISSION_RETRY_AFTER_SECONDS', '0'))
+# Slots are file locks in this directory; empty limits each process on its own
+ADMISSION_SHARED_DIR = os.environ.get('ADMISSION_SHARED_DIR', os.path.join(tempfile.gettempdir(), 'resume-admission'))
+# How often a queued request checks for a free slot
+ADMISSION_POLL_SECONDS = float(os.environ.get('ADMISSION_POLL_SECONDS', '0.05'))
+
+# Structured logging: one JSON object per line, tagged with the request id
+# (see resumes/request_logging.py)
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'filters': {
+        'request_id': {'()': 'resumes.request_logging.RequestIdFilter'},
+    },
+    'formatters': {
+        'json': {'()': 'resumes.request_logging.JsonFormatter'},
+    },
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+            'filters': ['request_id'],
+            'formatter': 'json',
+        },
+    },
+    'loggers': {
+        'resumes': {'handlers': ['console'], 'level': LOG_LEVEL, 'propagate': False},
+        'django.request': {'handlers': ['console'], 'level': 'WARNING', 'propagate': False},
+    },
+}
+
+# Opt-in profiling of uploads (see resumes/profiling.py); summarize the
+# results with `manage.py profile_report`
+PROFILING_SAMPLE_RATE = float(os.environ.get('PROFILING_SAMPLE_RATE', '0'))
+# Requests sending `X-Profile: <token>` are profiled; empty disables the header
+PROFILING_HEADER_TOKEN = os.environ.get('PROFILING_HEADER_TOKEN', '')
+PROFILING_DIR = os.environ.get('PROFILING_DIR', os.path.join(BASE_DIR, 'profiles'))
+PROFILING_TOP_ALLOCATIONS = int(os.environ.get('PROFILING_TOP_ALLOCATIONS', '25'))
+PROFILING_TRACEMALLOC_FRAMES = int(os.environ.get('PROFILING_TRACEMALLOC_FRAMES', '1'))
+
+# Server-sent progress events at /api/resumes/<id>/events/ (see resumes/progress.py)
+# Minimum seconds between progress writes to the database (the final event is always stored)
+PROGRESS_PERSIST_INTERVAL_SECONDS = float(os.environ.get('PROGRESS_PERSIST_INTERVAL_SECONDS', '0.5'))
+# How often a stream checks the database for events published by other processes
+PROGRESS_POLL_SECONDS = float(os.environ.get('PROGRESS_POLL_SECONDS', '1'))
+PROGRESS_KEEPALIVE_SECONDS = float(os.environ.get('PROGRESS_KEEPALIVE_SECONDS', '15'))
+# Streams close after this long; EventSource reconnects and resumes from the last event
+PROGRESS_STREAM_MAX_SECONDS = float(os.environ.get('PROGRESS_STREAM_MAX_SECONDS', '300'))
+# A sync (WSGI) stream holds a whole worker, so it closes well before gunicorn's
+# 30 second worker timeout; async views use PROGRESS_STREAM_MAX_SECONDS
+PROGRESS_SYNC_STREAM_MAX_SECONDS = float(os.environ.get('PROGRESS_SYNC_STREAM_MAX_SECONDS', '20'))
+# Analyses tracked in memory per process for waking local streams
+PROGRESS_MAX_CHANNELS = int(os.environ.get('PROGRESS_MAX_CHANNELS', '1000'))
+
+# Cached resume detail responses with ETags (see resumes/response_cache.py)
+RESPONSE_CACHE_ENABLED = os.environ.get('RESPONSE_CACHE_ENABLED', 'True') == 'True'
+# Browser max-age of completed analyses; revalidated with If-None-Match afterwards
+RESPONSE_CACHE_MAX_AGE_SECONDS = int(os.environ.get('RESPONSE_CACHE_MAX_AGE_SECONDS', '60'))
+# The file-based default is shared by the server processes of one host; point
+# it at Redis or Memcached when several hosts serve the API
+RESPONSE_CACHE_BACKEND = os.environ.get(
+    'RESPONSE_CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'
+)
+RESPONSE_CACHE_LOCATION = os.environ.get('RESPONSE_CACHE_LOCATION', os.path.join(BASE_DIR, 'response_cache'))
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'responses': {
+        'BACKEND': RESPONSE_CACHE_BACKEND,
+        'LOCATION': RESPONSE_CACHE_LOCATION,
+        'TIMEOUT': int(os.environ.get('RESPONSE_CACHE_TIMEOUT_SECONDS', '3600')),
+        'OPTIONS': {'MAX_ENTRIES': int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', '5000'))},
+    },
+}
+
+# JSON encoding of API responses and pre-rendered analyses (see resumes/renderers.py):
+# 'orjson' uses orjson when it is installed, 'json' the standard library
+JSON_ENCODER = os.environ.get('JSON_ENCODER', 'orjson')
+REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'] = [
+    os.environ.get('API_JSON_RENDERER', 'resumes.renderers.FastJSONRenderer'),
+]
+# Pre-rendered analysis responses (see resumes/response_blobs.py)
+RESPONSE_BLOB_COMPRESSION = os.environ.get('RESPONSE_BLOB_COMPRESSION', 'True') == 'True'
+RESPONSE_BLOB_COMPRESS_MIN_BYTES = int(os.environ.get('RESPONSE_BLOB_COMPRESS_MIN_BYTES', '1024'))
+RESPONSE_BLOB_COMPRESS_LEVEL = int(os.environ.get('RESPONSE_BLOB_COMPRESS_LEVEL', '6'))
+
+# gzip responses for clients sending Accept-Encoding: gzip (see resumes/compression.py)
+RESPONSE_COMPRESSION_ENABLED = os.environ.get('RESPONSE_COMPRESSION_ENABLED', 'True') == 'True'
+RESPONSE_COMPRESSION_MIN_BYTES = int(os.environ.get('RESPONSE_COMPRESSION_MIN_BYTES', '512'))
+if RESPONSE_COMPRESSION_ENABLED:
+    # Right after the request id middleware, so it compresses the final response
+    MIDDLEWARE.insert(
+        MIDDLEWARE.index('resumes.request_logging.RequestIdMiddleware') + 1,
+        'resumes.compression.CompressionMiddleware'
+    )
+
+# Compressed storage of resume text, analysis results and job descriptions
+# (see resumes/fields.py): 'zlib', 'zstd' (needs the zstandard package) or 'none'
+CONTENT_COMPRESSION = os.environ.get('CONTENT_COMPRESSION', 'zlib')
+CONTENT_COMPRESS_LEVEL = int(os.environ.get('CONTENT_COMPRESS_LEVEL', '6'))
+# Shorter values are stored uncompressed
+CONTENT_COMPRESS_MIN_BYTES = int(os.environ.get('CONTENT_COMPRESS_MIN_BYTES', '128'))
+
+# Re-scoring of analyses made by older analyzer versions (manage.py reanalyze, see resumes/reanalysis.py)
+REANALYZE_BATCH_SIZE = int(os.environ.get('REANALYZE_BATCH_SIZE', '200'))
+# Throttle that leaves CPU and database to live traffic; 0 runs flat out
+REANALYZE_MAX_ROWS_PER_SECOND = float(os.environ.get('REANALYZE_MAX_ROWS_PER_SECOND', '50'))
+REANALYZE_LOCK_SECONDS = int(os.environ.get('REANALYZE_LOCK_SECONDS', '300'))
@@ -0,0 +1,353 @@
+"""
+Admission control for the analysis and read endpoints.
+
+An AdmissionLimiter lets at most `max_concurrent` requests into its section
+at once. Further requests wait in a FIFO queue of at most `max_queue`
+entries, for up to `max_wait` seconds. A request that finds the queue full,
+or is still waiting when its time is up, is refused with AdmissionRejected
+and the view answers 503 with Retry-After. A finishing request hands its
+slot straight to the oldest waiter, so new arrivals cannot jump the queue.
+
+Uploads (extraction and analysis) and reads (resume detail and listing) have
+separate limiters, so reads keep their own budget while uploads are
+saturated. Both sync views (threads) and async views (coroutines) can wait
+on the same limiter.
+
+With ADMISSION_SHARED_DIR set (the default, a directory under the system
+temp dir) the limits apply to the whole host: a sync gunicorn worker serves
+one request at a time, so a per-process count would never queue anything.
+SharedAdmissionLimiter keeps its slots and queue places as file locks
+(flock) in that directory, which every process of the host sees and which
+the kernel releases when a process dies. Waiting requests poll for a slot
+every ADMISSION_POLL_SECONDS, so across processes the queue is not strictly
+FIFO. Without the directory, or where flock is unavailable, AdmissionLimiter
+counts the requests of its own process only.
+"""
+import asyncio
+import logging
+import math
+import os
+import random
+import socket
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+
+from django.conf import settings
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from .metrics import ADMISSION_REJECTIONS
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionRejected(Exception):
+    """The limiter's queue is full, or the request waited too long for a slot"""
+
+    def __init__(self, limiter, reason):
+        self.limiter = limiter.name
+        self.reason = reason
+        self.retry_after = limiter.retry_after
+        super().__init__(f'Server is busy ({limiter.name}), retry in {self.retry_after} seconds')
+        ADMISSION_REJECTIONS.labels(limiter.name, reason).inc()
+        logger.warning('admission rejected', extra={'limiter': limiter.name, 'reason': reason})
+
+
+class _ThreadWaiter:
+    def __init__(self):
+        self.granted = False
+        self._event = threading.Event()
+
+    def wake(self):
+        self._event.set()
+
+    def wait(self, timeout):
+        self._event.wait(timeout)
+
+
+class _AsyncWaiter:
+    def __init__(self):
+        self.granted = False
+        self._loop = asyncio.get_running_loop()
+        self._future = self._loop.create_future()
+
+    def wake(self):
+        # Slots are released from any thread, not only the event loop's
+        self._loop.call_soon_threadsafe(self._resolve)
+
+    def _resolve(self):
+        if not self._future.done():
+            self._future.set_result(True)
+
+    async def wait(self, timeout):
+        try:
+            await asyncio.wait_for(self._future, timeout)
+        except asyncio.TimeoutError:
+            pass
+
+
+class AdmissionLimiter:
+    """Concurrency limit with a bounded, time-limited FIFO wait queue"""
+
+    def __init__(self, name, max_concurrent, max_queue, max_wait, retry_after=None):
+        self.name = name
+        # 0 or less disables the limit
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.retry_after = retry_after or max(1, math.ceil(max_wait))
+
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._waiters = deque()
+        self._counts = {'admitted': 0, 'queued': 0, 'rejected': 0, 'timed_out': 0}
+
+    def _enter(self, waiter_class):
+        """Take a free slot (returns None) or join the queue (returns the waiter)"""
+        with self._lock:
+            if self.max_concurrent <= 0 or (self._in_flight < self.max_concurrent and not self._waiters):
+                self._in_flight += 1
+                self._counts['admitted'] += 1
+                return None
+            if len(self._waiters) >= self.max_queue:
+                self._counts['rejected'] += 1
+                raise AdmissionRejected(self, 'queue_full')
+            waiter = waiter_class()
+            self._waiters.append(waiter)
+            self._counts['queued'] += 1
+            return waiter
+
+    def _leave_queue(self, waiter, timed_out=True):
+        """Stop waiting; True if a slot was handed to the waiter in the meantime"""
+        with self._lock:
+            if waiter.granted:
+                return True
+            self._waiters.remove(waiter)
+            if timed_out:
+                self._counts['timed_out'] += 1
+            return False
+
+    def release(self):
+        with self._lock:
+            if self._waiters:
+                # The slot passes to the oldest waiter; in_flight is unchanged
+                waiter = self._waiters.popleft()
+                waiter.granted = True
+                self._counts['admitted'] += 1
+                waiter.wake()
+            else:
+                self._in_flight -= 1
+
+    @contextmanager
+    def admit(self):
+        """Hold a slot for the duration of the block, waiting for one if needed"""
+        waiter = self._enter(_ThreadWaiter)
+        if waiter is not None:
+            waiter.wait(self.max_wait)
+            if not self._leave_queue(waiter):
+                raise AdmissionRejected(self, 'timeout')
+        try:
+            yield
+        finally:
+            self.release()
+
+    @asynccontextmanager
+    async def admit_async(self):
+        """admit() for coroutines: waiting does not block the event loop"""
+        waiter = self._enter(_AsyncWaiter)
+        if waiter is not None:
+            try:
+                await waiter.wait(self.max_wait)
+            except asyncio.CancelledError:
+                # Client went away while queued; pass on a slot it was just given
+                if self._leave_queue(waiter, timed_out=False):
+                    self.release()
+                raise
+            if not self._leave_queue(waiter):
+                raise AdmissionRejected(self, 'timeout')
+        try:
+            yield
+        finally:
+            self.release()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'scope': 'process',
+                'in_flight': self._in_flight,
+                'queue_depth': len(self._waiters),
+                'max_concurrent': self.max_concurrent,
+                'max_queue': self.max_queue,
+                'max_wait_seconds': self.max_wait,
+                **self._counts,
+            }
+
+
+class _FileSlots:
+    """`count` slots shared by every process of the host, held as flock locks"""
+
+    def __init__(self, directory, prefix, count):
+        self.paths = [os.path.join(directory, f'{prefix}-{index}.lock') for index in range(max(count, 0))]
+
+    def acquire(self):
+        """Lock a free slot and return its file descriptor, or None if all are taken"""
+        # A random starting point spreads the processes over the slots
+        start = random.randrange(len(self.paths)) if self.paths else 0
+        for path in self.paths[start:] + self.paths[:start]:
+            fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return fd
+            except BlockingIOError:
+                os.close(fd)
+        return None
+
+    def release(self, fd):
+        # Closing the descriptor drops the lock
+        os.close(fd)
+
+    def in_use(self):
+        """Slots currently held (each free slot is locked for an instant to test it)"""
+        fds = []
+        try:
+            while True:
+                fd = self.acquire()
+                if fd is None:
+                    break
+                fds.append(fd)
+            return len(self.paths) - len(fds)
+        finally:
+            for fd in fds:
+                self.release(fd)
+
+
+class SharedAdmissionLimiter(AdmissionLimiter):
+    """AdmissionLimiter whose slots and queue are shared by all processes of the host"""
+
+    def __init__(self, name, max_concurrent, max_queue, max_wait, retry_after=None, directory=None,
+                 poll_interval=0.05):
+        super().__init__(name, max_concurrent, max_queue, max_wait, retry_after)
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.poll_interval = poll_interval
+        self._slots = _FileSlots(directory, name, max_concurrent)
+        self._queue = _FileSlots(directory, f'{name}-queue', max_queue)
+
+    def _count(self, name):
+        with self._lock:
+            self._counts[name] += 1
+
+    def _enter(self):
+        """A slot's descriptor, or (None, queue place's descriptor); raises if the queue is full"""
+        slot = self._slots.acquire()
+        if slot is not None:
+            self._count('admitted')
+            return slot, None
+        place = self._queue.acquire()
+        if place is None:
+            self._count('rejected')
+            raise AdmissionRejected(self, 'queue_full')
+        self._count('queued')
+        return None, place
+
+    def _timed_out(self):
+        self._count('timed_out')
+        return AdmissionRejected(self, 'timeout')
+
+    @contextmanager
+    def admit(self):
+        if self.max_concurrent <= 0:
+            yield
+            return
+        slot, place = self._enter()
+        if slot is None:
+            try:
+                deadline = time.monotonic() + self.max_wait
+                while slot is None and time.monotonic() < deadline:
+                    time.sleep(min(self.poll_interval, max(deadline - time.monotonic(), 0)))
+                    slot = self._slots.acquire()
+            finally:
+                self._queue.release(place)
+            if slot is None:
+                raise self._timed_out()
+            self._count('admitted')
+        try:
+            yield
+        finally:
+            self._slots.release(slot)
+
+    @asynccontextmanager
+    async def admit_async(self):
+        if self.max_concurrent <= 0:
+            yield
+            return
+        slot, place = self._enter()
+        if slot is None:
+            try:
+                deadline = time.monotonic() + self.max_wait
+                while slot is None and time.monotonic() < deadline:
+                    await asyncio.sleep(min(self.poll_interval, max(deadline - time.monotonic(), 0)))
+                    slot = self._slots.acquire()
+            finally:
+                # Also reached when the client goes away while queued
+                self._queue.release(place)
+            if slot is None:
+                raise self._timed_out()
+            self._count('admitted')
+        try:
+            yield
+        finally:
+            self._slots.release(slot)
+
+    def stats(self):
+        with self._lock:
+            counts = dict(self._counts)
+        return {
+            'scope': 'host',
+            'in_flight': self._slots.in_use(),
+            'queue_depth': self._queue.in_use(),
+            'max_concurrent': self.max_concurrent,
+            'max_queue': self.max_queue,
+            'max_wait_seconds': self.max_wait,
+            # Counted by the process that answered
+            **counts,
+        }
+
+
+def make_limiter(name, max_concurrent, max_queue, max_wait, retry_after=None):
+    """Host-wide limiter when ADMISSION_SHARED_DIR is set and flock is available"""
+    if settings.ADMISSION_SHARED_DIR and fcntl is not None:
+        return SharedAdmissionLimiter(
+            name, max_concurrent, max_queue, max_wait, retry_after,
+            directory=settings.ADMISSION_SHARED_DIR, poll_interval=settings.ADMISSION_POLL_SECONDS,
+        )
+    return AdmissionLimiter(name, max_concurrent, max_queue, max_wait, retry_after)
+
+
+upload_limiter = make_limiter(
+    'uploads',
+    settings.ADMISSION_UPLOAD_CONCURRENCY,
+    settings.ADMISSION_UPLOAD_QUEUE,
+    settings.ADMISSION_UPLOAD_MAX_WAIT_SECONDS,
+    settings.ADMISSION_RETRY_AFTER_SECONDS,
+)
+read_limiter = make_limiter(
+    'reads',
+    settings.ADMISSION_READ_CONCURRENCY,
+    settings.ADMISSION_READ_QUEUE,
+    settings.ADMISSION_READ_MAX_WAIT_SECONDS,
+    settings.ADMISSION_RETRY_AFTER_SECONDS,
+)
+
+
+def get_admission_stats():
+    """In-flight counts, queue depths and counters of every limiter, and the process reporting them"""
+    return {
+        'process': {'hostname': socket.gethostname(), 'pid': os.getpid()},
+        **{limiter.name: limiter.stats() for limiter in (upload_limiter, read_limiter)},
+    }
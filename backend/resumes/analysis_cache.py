@@ -0,0 +1,218 @@
+"""
+Content-addressed cache of analysis results.
+
+Entries are keyed on the SHA-256 of the uploaded file bytes plus a hash of
+the normalized job description, and live in the AnalysisCacheEntry table so
+they survive restarts and are shared by every server process. The table and
+the per-page text cache are each bounded by ANALYSIS_CACHE_MAX_ENTRIES
+(least recently used entries are evicted first), and entries expire after
+ANALYSIS_CACHE_TTL_SECONDS, but never later than the analyses themselves
+(RETENTION_MAX_AGE_SECONDS). Entries of a file are also purged once the last
+analysis of it is deleted. Results of another analyzer version (see
+analyzer.analyzer_version) are never reused.
+
+The hit/miss counters returned by get_cache_stats belong to the process
+that answers the request; the same events are counted in the
+resume_analysis_cache_events metric, which /api/metrics aggregates over
+all processes.
+"""
+import hashlib
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from .analyzer import analyzer_version
+from .metrics import CACHE_EVENTS
+from .models import AnalysisCacheEntry, PageTextCacheEntry, ResumeAnalysis
+
+# Per-process counters; persistent hit totals are kept on the entries themselves
+_stats_lock = threading.Lock()
+_stats = {'hits': 0, 'text_hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0}
+
+
+def _count(name, amount=1):
+    with _stats_lock:
+        _stats[name] += amount
+    CACHE_EVENTS.labels(name).inc(amount)
+
+
+def hash_uploaded_file(file):
+    """SHA-256 of an uploaded file, read in chunks unless computed while it streamed in"""
+    if getattr(file, 'sha256', ''):
+        return file.sha256
+    digest = hashlib.sha256()
+    for chunk in file.chunks():
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def normalize_job_description(job_description):
+    """Case and whitespace insensitive form of a job description"""
+    return ' '.join((job_description or '').lower().split())
+
+
+def hash_job_description(job_description):
+    return hashlib.sha256(normalize_job_description(job_description).encode('utf-8')).hexdigest()
+
+
+def _ttl_seconds():
+    # Cached text must not outlive the analyses retention deletes
+    return min(settings.ANALYSIS_CACHE_TTL_SECONDS, settings.RETENTION_MAX_AGE_SECONDS)
+
+
+def _expiry_cutoff():
+    return timezone.now() - timedelta(seconds=_ttl_seconds())
+
+
+def lookup_analysis(file_hash, job_description):
+    """Return the cached entry for this file and job description, or None"""
+    if not settings.ANALYSIS_CACHE_ENABLED or not file_hash:
+        return None
+
+    entry = AnalysisCacheEntry.objects.filter(
+        file_hash=file_hash,
+        job_hash=hash_job_description(job_description),
+        analyzer_version=analyzer_version(),
+        created_at__gte=_expiry_cutoff(),
+    ).first()
+
+    if entry is None:
+        _count('misses')
+        return None
+
+    AnalysisCacheEntry.objects.filter(pk=entry.pk).update(
+        last_used_at=timezone.now(),
+        hit_count=F('hit_count') + 1,
+    )
+    _count('hits')
+    return entry
+
+
+def lookup_text(file_hash):
+    """Return previously extracted text for this file (any job description), or None"""
+    if not settings.ANALYSIS_CACHE_ENABLED or not file_hash:
+        return None
+
+    raw_text = AnalysisCacheEntry.objects.filter(
+        file_hash=file_hash,
+        created_at__gte=_expiry_cutoff(),
+    ).values_list('raw_text', flat=True).first()
+
+    if raw_text is not None:
+        _count('text_hits')
+    return raw_text
+
+
+def store_analysis(file_hash, job_description, raw_text, analysis_results, evict=True):
+    """Save a completed analysis and keep the table within its size bound"""
+    if not settings.ANALYSIS_CACHE_ENABLED or not file_hash:
+        return
+
+    try:
+        AnalysisCacheEntry.objects.update_or_create(
+            file_hash=file_hash,
+            job_hash=hash_job_description(job_description),
+            defaults={
+                'raw_text': raw_text or '',
+                'analysis_results': analysis_results,
+                'analyzer_version': analyzer_version(),
+                'created_at': timezone.now(),
+                'last_used_at': timezone.now(),
+            },
+        )
+    except IntegrityError:
+        # Another process stored the same key concurrently; either copy is fine
+        return
+    _count('stores')
+    if evict:
+        evict_entries()
+
+
+def lookup_page_texts(file_hash, max_pages=None):
+    """Previously extracted PDF page texts of this file, as {page index: text}"""
+    if not settings.ANALYSIS_CACHE_ENABLED or not file_hash:
+        return {}
+
+    pages = PageTextCacheEntry.objects.filter(file_hash=file_hash, created_at__gte=_expiry_cutoff())
+    if max_pages:
+        pages = pages.filter(page_index__lt=max_pages)
+    page_texts = dict(pages.values_list('page_index', 'text'))
+    if page_texts:
+        pages.update(last_used_at=timezone.now())
+    return page_texts
+
+
+def store_page_texts(file_hash, page_texts):
+    """Cache newly extracted PDF page texts ({page index: text})"""
+    if not settings.ANALYSIS_CACHE_ENABLED or not file_hash or not page_texts:
+        return
+    PageTextCacheEntry.objects.bulk_create(
+        [PageTextCacheEntry(file_hash=file_hash, page_index=index, text=text)
+         for index, text in page_texts.items()],
+        ignore_conflicts=True,
+    )
+
+
+def purge_files(file_hashes):
+    """Drop cached text and results of files no remaining analysis was uploaded from"""
+    file_hashes = set(file_hashes) - {''}
+    if not file_hashes:
+        return 0
+    file_hashes -= set(
+        ResumeAnalysis.objects.filter(content_hash__in=file_hashes).values_list('content_hash', flat=True)
+    )
+    if not file_hashes:
+        return 0
+    purged, _ = AnalysisCacheEntry.objects.filter(file_hash__in=file_hashes).delete()
+    PageTextCacheEntry.objects.filter(file_hash__in=file_hashes).delete()
+    return purged
+
+
+def _evict_from(model):
+    """Drop expired rows of a cache table, then the least recently used ones above the size limit"""
+    evicted, _ = model.objects.filter(created_at__lt=_expiry_cutoff()).delete()
+
+    # The ordered scan only runs once the table is actually over the limit
+    overflow = model.objects.count() - settings.ANALYSIS_CACHE_MAX_ENTRIES
+    if overflow > 0:
+        overflow_ids = list(
+            model.objects.order_by('last_used_at', 'id')
+            .values_list('id', flat=True)[:overflow]
+        )
+        deleted, _ = model.objects.filter(id__in=overflow_ids).delete()
+        evicted += deleted
+    return evicted
+
+
+def evict_entries():
+    """Keep the analysis and page text caches within their expiry and size limits"""
+    evicted = _evict_from(AnalysisCacheEntry)
+    _evict_from(PageTextCacheEntry)
+
+    if evicted:
+        _count('evictions', evicted)
+    return evicted
+
+
+def get_cache_stats():
+    """Process-local hit/miss counters plus table-wide totals"""
+    with _stats_lock:
+        process_stats = dict(_stats)
+
+    lookups = process_stats['hits'] + process_stats['misses']
+    totals = AnalysisCacheEntry.objects.aggregate(total_hits=Sum('hit_count'))
+
+    return {
+        'process': process_stats,
+        'hit_ratio': round(process_stats['hits'] / lookups, 3) if lookups else None,
+        'entries': AnalysisCacheEntry.objects.count(),
+        'page_entries': PageTextCacheEntry.objects.count(),
+        'max_entries': settings.ANALYSIS_CACHE_MAX_ENTRIES,
+        'ttl_seconds': _ttl_seconds(),
+        'total_hits': totals['total_hits'] or 0,
+    }
@@ -0,0 +1,316 @@
+"""
+Rule-based resume scoring.
+
+These functions are pure (no database access), so they can run in worker
+processes that never set up the Django app registry.
+"""
+from .features import JobDescription, TokenizedDocument
+from .metrics import scorer_timer
+from .skills import get_skill_matcher
+from .suggestions import recommendation, suggestion
+
+# Bump whenever scoring changes (weights, thresholds, suggestions); stored
+# analyses of older versions are re-scored by `manage.py reanalyze`
+ANALYZER_VERSION = 1
+
+def analyzer_version():
+    """Version stored with every analysis: ANALYZER_VERSION and the skill taxonomy fingerprint"""
+    return f'{ANALYZER_VERSION}-{get_skill_matcher().fingerprint}'
+
+def analyze_resume_with_ai(resume_text, job_description=None):
+    """
+    Analyze resume using rule-based analysis (no API required).
+
+    `job_description` may be plain text or a JobDescription prepared once
+    for scoring many resumes against the same posting.
+    """
+    try:
+        # Tokenize once; every scorer reads from the shared document
+        with scorer_timer('tokenize'):
+            document = TokenizedDocument(resume_text)
+
+        # Calculate formatting score
+        with scorer_timer('formatting'):
+            formatting_score = calculate_formatting_score(document)
+
+        # Extract and score skills
+        with scorer_timer('skills'):
+            skills = extract_skills(document)
+        skills_score = min(100, len(skills) * 10)  # 10 points per skill, max 100
+
+        # Calculate experience score
+        with scorer_timer('experience'):
+            experience_score = calculate_experience_score(document)
+
+        # Calculate keyword score
+        with scorer_timer('keywords'):
+            keywords_score = calculate_keywords_score(document, job_description)
+
+        # Calculate overall ATS score
+        overall_score = (formatting_score + skills_score + experience_score + keywords_score) // 4
+
+        # Calculate text quality metrics
+        with scorer_timer('text_quality'):
+            text_quality = calculate_text_quality(document, document.word_count)
+
+        # Generate suggestions
+        with scorer_timer('suggestions'):
+            suggestions = generate_suggestions(resume_text, skills, experience_score, formatting_score)
+
+        # The job match score is the keyword score against the job description
+        job_match_score = keywords_score if job_description else None
+
+        return {
+            "ats_score": {
+                "overall_score": overall_score,
+                "breakdown": {
+                    "keywords": keywords_score,
+                    "formatting": formatting_score,
+                    "experience": experience_score,
+                    "skills": skills_score
+                }
+            },
+            "extracted_skills": skills,
+            "suggestions": suggestions,
+            "job_match_score": job_match_score,
+            "text_quality": text_quality
+        }
+
+    except Exception as e:
+        # Return a basic analysis if anything fails
+        return {
+            "ats_score": {
+                "overall_score": 60,
+                "breakdown": {
+                    "keywords": 60,
+                    "formatting": 70,
+                    "experience": 60,
+                    "skills": 60
+                }
+            },
+            "extracted_skills": ["Communication", "Teamwork", "Problem Solving"],
+            "suggestions": [
+                {
+                    "type": "important",
+                    "category": "Analysis",
+                    "suggestion": f"Basic analysis completed. Error: {str(e)}",
+                    "impact": "Medium"
+                }
+            ],
+            "job_match_score": None,
+            "text_quality": {
+                "word_count": len(resume_text.split()) if resume_text else 0,
+                "readability": "Basic"
+            }
+        }
+
+def calculate_formatting_score(document):
+    """Calculate formatting score based on resume structure"""
+    document = TokenizedDocument.of(document)
+    score = 50  # Base score
+
+    # Check for common resume sections
+    sections = ['experience', 'education', 'skills', 'summary', 'objective', 'projects', 'contact']
+
+    for section in sections:
+        if section in document.lower:
+            score += 8
+
+    # Check for email
+    if document.has_email:
+        score += 10
+
+    # Check for phone number patterns
+    if document.has_phone:
+        score += 10
+
+    # Check for bullet points or structure
+    if document.has_bullets:
+        score += 10
+
+    return min(100, score)
+
+def extract_skills(document):
+    """Extract skills from resume text using the skill taxonomy"""
+    document = TokenizedDocument.of(document)
+    found_skills = get_skill_matcher().find_tokens(document.skill_tokens)
+
+    # Add some default soft skills if none found
+    if not found_skills:
+        found_skills = ['Communication', 'Teamwork', 'Problem Solving']
+
+    return found_skills[:10]  # Unique skills in order of appearance, max 10
+
+def calculate_experience_score(document):
+    """Calculate experience score based on text content"""
+    document = TokenizedDocument.of(document)
+    score = 40  # Base score
+
+    # Look for experience indicators
+    experience_words = ['experience', 'worked', 'developed', 'managed', 'led', 'created',
+                       'implemented', 'designed', 'built', 'achieved', 'improved']
+
+    for word in experience_words:
+        if word in document.lower:
+            score += 6
+
+    # Look for years of experience
+    if document.years_mentioned:
+        max_years = max(document.years_mentioned)
+        score += min(30, max_years * 3)  # 3 points per year, max 30
+
+    return min(100, score)
+
+def calculate_keywords_score(document, job_description=None):
+    """Calculate keyword score"""
+    if not job_description:
+        return 60  # Base score
+
+    return keyword_overlap_score(TokenizedDocument.of(document).token_set, job_description)
+
+def keyword_overlap_score(resume_terms, job_description):
+    """Keyword score from a resume's set of lowercase words"""
+    score = 60  # Base score
+
+    if job_description:
+        # Find common words (excluding common stop words)
+        job_keywords = JobDescription.of(job_description).keywords
+        common_keywords = job_keywords.intersection(resume_terms)
+
+        # Score based on keyword match percentage
+        if job_keywords:
+            match_percentage = len(common_keywords) / len(job_keywords)
+            score = min(100, 40 + (match_percentage * 60))
+
+    return int(score)
+
+def calculate_job_match_score(document, job_description):
+    """Calculate job match score"""
+    if not job_description:
+        return None
+
+    return calculate_keywords_score(document, job_description)
+
+def rescore_for_job(analysis_results, resume_terms, job_description):
+    """
+    Recompute the job-dependent scores of a stored analysis.
+
+    Only the keyword score depends on the job description, so the other
+    breakdown components are reused and the overall score is rebuilt from
+    them. The result matches a full re-analysis with the new description.
+    """
+    keywords_score = keyword_overlap_score(frozenset(resume_terms), job_description)
+
+    breakdown = dict(analysis_results['ats_score']['breakdown'])
+    breakdown['keywords'] = keywords_score
+    overall_score = (
+        breakdown['formatting'] + breakdown['skills'] + breakdown['experience'] + keywords_score
+    ) // 4
+
+    rescored = dict(analysis_results)
+    rescored['ats_score'] = {'overall_score': overall_score, 'breakdown': breakdown}
+    rescored['job_match_score'] = keywords_score if job_description else None
+    return rescored
+
+def calculate_text_quality(document, word_count=None):
+    """Calculate comprehensive text quality metrics"""
+    document = TokenizedDocument.of(document)
+    if word_count is None:
+        word_count = document.word_count
+
+    # Basic readability metrics, precomputed by the tokenizer
+    sentences = document.sentence_count
+    syllable_count = document.syllable_count
+
+    # Calculate Flesch Reading Ease (simplified)
+    avg_sentence_length = word_count / sentences
+    avg_syllables_per_word = syllable_count / max(1, word_count)
+    flesch_score = 206.835 - (1.015 * avg_sentence_length) - (84.6 * avg_syllables_per_word)
+    flesch_score = max(0, min(100, flesch_score))  # Clamp between 0-100
+
+    # Calculate Flesch-Kincaid Grade Level
+    flesch_kincaid = (0.39 * avg_sentence_length) + (11.8 * avg_syllables_per_word) - 15.59
+    flesch_kincaid = max(1, flesch_kincaid)
+
+    # Determine readability level
+    if flesch_score >= 90:
+        readability_level = "Very Easy"
+    elif flesch_score >= 80:
+        readability_level = "Easy"
+    elif flesch_score >= 70:
+        readability_level = "Fairly Easy"
+    elif flesch_score >= 60:
+        readability_level = "Standard"
+    elif flesch_score >= 50:
+        readability_level = "Fairly Difficult"
+    elif flesch_score >= 30:
+        readability_level = "Difficult"
+    else:
+        readability_level = "Very Difficult"
+
+    # Calculate average word length
+    avg_word_length = document.avg_word_length
+
+    # Calculate quality score (0-100)
+    quality_score = 60  # Base score
+
+    # Adjust based on readability
+    if 60 <= flesch_score <= 80:  # Ideal range for professional documents
+        quality_score += 20
+    elif flesch_score < 30 or flesch_score > 90:
+        quality_score -= 10
+
+    # Adjust based on word count
+    if 200 <= word_count <= 800:  # Ideal resume length
+        quality_score += 10
+    elif word_count < 100:
+        quality_score -= 20
+
+    # Generate quality recommendations
+    recommendations = []
+
+    if flesch_score < 50:
+        recommendations.append(recommendation('readability'))
+
+    if word_count < 150:
+        recommendations.append(recommendation('too_short'))
+    elif word_count > 1000:
+        recommendations.append(recommendation('too_long'))
+
+    if avg_word_length > 6:
+        recommendations.append(recommendation('concise'))
+
+    return {
+        "grammar_errors": [],  # We don't have grammar checking in free version
+        "error_count": 0,
+        "readability": {
+            "flesch_reading_ease": round(flesch_score, 1),
+            "flesch_kincaid_grade": round(flesch_kincaid, 1),
+            "readability_level": readability_level,
+            "word_count": word_count,
+            "sentence_count": sentences,
+            "syllable_count": syllable_count
+        },
+        "word_count": word_count,
+        "avg_word_length": round(avg_word_length, 1),
+        "quality_score": min(100, max(0, quality_score)),
+        "recommendations": recommendations
+    }
+
+def generate_suggestions(resume_text, skills, experience_score, formatting_score):
+    """Generate improvement suggestions"""
+    suggestions = []
+
+    if formatting_score < 70:
+        suggestions.append(suggestion('formatting'))
+
+    if len(skills) < 5:
+        suggestions.append(suggestion('skills'))
+
+    if experience_score < 60:
+        suggestions.append(suggestion('experience'))
+
+    # Always add some general suggestions
+    suggestions.extend([suggestion('quantify'), suggestion('keywords')])
+
+    return suggestions[:5]  # Return max 5 suggestions
@@ -0,0 +1,220 @@
+"""
+Async versions of the upload, detail and listing endpoints for ASGI servers.
+
+Enabled with ASYNC_VIEWS=True (see Procfile.asgi). The request coroutines
+never block the event loop: database access goes through Django's async ORM
+(or sync_to_async for the shared helpers), and extraction and scoring run in
+a bounded thread pool (ASYNC_ANALYSIS_THREADS) whose threads hand PDF/DOCX
+parsing on to the extraction process pool. One uvicorn process can then
+hold many uploads and reads in flight at once. Request and response formats
+are the same as the DRF views in views.py.
+"""
+import asyncio
+import contextvars
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+
+from .admission import AdmissionRejected, read_limiter, upload_limiter
+from .analysis_cache import hash_uploaded_file, lookup_analysis
+from .metrics import stage_timer
+from .models import ResumeAnalysis
+from .pagination import InvalidListQuery, build_page, filter_resumes, page_queryset
+from .profiling import profile_call, profiled
+from .progress import aevent_stream, final_progress_event, initial_progress, notify_progress, parse_last_event_id
+from .response_blobs import analysis_response, build_analysis_response, store_response_blob
+from .response_cache import aget_detail_entry, build_detail_entry, entry_response
+from .search import index_resumes
+from .selection import (
+    ANALYSIS_COMPACT_EXCLUDE, ANALYSIS_FIELDS, DETAIL_COMPACT_EXCLUDE, DETAIL_FIELDS, InvalidFieldSelection,
+    parse_field_selection,
+)
+from .serializers import ResumeAnalysisSerializer
+from .uploads import upload_rejections
+from .views import (
+    DETAIL_QUERYSET, apply_cached_analysis, build_queued_response, log_analysis, run_resume_analysis,
+    wants_async_analysis,
+)
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_analysis_executor():
+    """Bounded thread pool for blocking extraction and scoring work"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.ASYNC_ANALYSIS_THREADS,
+                thread_name_prefix='analysis',
+            )
+        return _executor
+
+
+def _analyze(resume_analysis):
+    """Run an analysis in an executor thread, which uses its own database connection"""
+    close_old_connections()
+    try:
+        return run_resume_analysis(resume_analysis)
+    finally:
+        close_old_connections()
+
+
+def busy_response(rejection):
+    return JsonResponse(
+        {'error': str(rejection)},
+        status=503,
+        headers={'Retry-After': str(rejection.retry_after)}
+    )
+
+
+def _parse_upload(request):
+    # Reading the multipart body (spooled through the upload handler) blocks
+    return request.POST, request.FILES
+
+
+@profiled
+@csrf_exempt
+@require_POST
+async def upload_resume(request):
+    """Upload and analyze a resume"""
+    try:
+        try:
+            selection = parse_field_selection(request.GET, ANALYSIS_FIELDS, ANALYSIS_COMPACT_EXCLUDE)
+        except InvalidFieldSelection as e:
+            return JsonResponse({'error': str(e)}, status=400)
+
+        with stage_timer('upload_receive'):
+            data, files = await sync_to_async(_parse_upload)(request)
+        logger.info('upload received', extra={'fields': list(data.keys()) + list(files.keys())})
+
+        # Files rejected while streaming in (too large, wrong type or content)
+        rejected = upload_rejections(request, 'file')
+        if rejected and 'file' not in files:
+            return JsonResponse({'error': rejected[0]['error']}, status=400)
+
+        if 'file' not in files:
+            return JsonResponse({'error': 'No file provided'}, status=400)
+
+        file = files['file']
+        job_description = data.get('job_description', '')
+        run_async = wants_async_analysis(request, data)
+
+        # Identical file + job description already analyzed: reuse the result
+        content_hash = await sync_to_async(hash_uploaded_file)(file)
+        cached = await sync_to_async(lookup_analysis)(content_hash, job_description)
+
+        # Only uploads analyzed in this request take an analysis slot
+        analyze_here = cached is None and not run_async
+        queued = run_async and cached is None
+        async with upload_limiter.admit_async() if analyze_here else nullcontext():
+            with stage_timer('store'):
+                resume_analysis = await ResumeAnalysis.objects.acreate(
+                    filename=file.name,
+                    file=file,
+                    job_description=job_description,
+                    file_size=file.size,
+                    content_hash=content_hash,
+                    processing_status='pending' if queued else 'processing',
+                    progress=initial_progress('queued' if queued else 'received')
+                )
+            notify_progress(resume_analysis.pk, resume_analysis.progress, stored=True)
+
+            # In async mode a worker (manage.py run_analysis_worker) picks the row up
+            if queued:
+                return JsonResponse(build_queued_response(request, resume_analysis), status=202)
+
+            if cached is not None:
+                apply_cached_analysis(resume_analysis, cached)
+            else:
+                # Run in a copy of this context so logs keep the request id
+                context = contextvars.copy_context()
+                loop = asyncio.get_running_loop()
+                await loop.run_in_executor(
+                    get_analysis_executor(), context.run, profile_call, _analyze, resume_analysis
+                )
+        final_event = final_progress_event(resume_analysis)
+        with stage_timer('serialize'):
+            response_data = build_analysis_response(resume_analysis)
+            store_response_blob(resume_analysis, response_data)
+        with stage_timer('save'):
+            await resume_analysis.asave()
+        notify_progress(resume_analysis.pk, final_event, stored=True)
+        if resume_analysis.processing_status == 'completed':
+            await sync_to_async(index_resumes)([(resume_analysis.pk, resume_analysis.raw_text)])
+        log_analysis(resume_analysis, cached is not None)
+
+        return analysis_response(request, resume_analysis, selection, response_data, status=201)
+
+    except AdmissionRejected as e:
+        return busy_response(e)
+    except Exception as e:
+        logger.exception('upload failed')
+        return JsonResponse({'error': f'Upload failed: {str(e)}'}, status=500)
+
+
+@require_GET
+async def get_my_resumes(request):
+    """List resume analyses newest first, one keyset-paginated page at a time"""
+    try:
+        try:
+            resumes, limit = filter_resumes(request.GET, ResumeAnalysis.objects.all())
+            async with read_limiter.admit_async():
+                rows = [resume async for resume in page_queryset(resumes, request.GET.get('cursor'), limit)]
+        except InvalidListQuery as e:
+            return JsonResponse({'error': str(e)}, status=400)
+
+        return JsonResponse(build_page(rows, limit))
+    except AdmissionRejected as e:
+        return busy_response(e)
+    except Exception as e:
+        return JsonResponse({'error': f'Failed to fetch resumes: {str(e)}'}, status=500)
+
+
+@require_GET
+async def get_resume_detail(request, resume_id):
+    """Get detailed analysis for a specific resume"""
+    try:
+        try:
+            selection = parse_field_selection(request.GET, DETAIL_FIELDS, DETAIL_COMPACT_EXCLUDE)
+        except InvalidFieldSelection as e:
+            return JsonResponse({'error': str(e)}, status=400)
+
+        # Finished analyses are served from the response cache without a query
+        entry = await aget_detail_entry(resume_id)
+        if entry is None:
+            async with read_limiter.admit_async():
+                resume = await DETAIL_QUERYSET.aget(id=resume_id)
+            entry = await sync_to_async(build_detail_entry)(resume, ResumeAnalysisSerializer(resume).data)
+        return entry_response(request, entry, selection)
+    except ResumeAnalysis.DoesNotExist:
+        return JsonResponse({'error': 'Resume not found'}, status=404)
+    except AdmissionRejected as e:
+        return busy_response(e)
+    except Exception as e:
+        return JsonResponse({'error': f'Failed to fetch resume: {str(e)}'}, status=500)
+
+
+@require_GET
+async def get_resume_events(request, resume_id):
+    """Server-sent events following the progress of one analysis until it finishes"""
+    if not await ResumeAnalysis.objects.filter(id=resume_id).aexists():
+        return JsonResponse({'error': 'Resume not found'}, status=404)
+    response = StreamingHttpResponse(
+        aevent_stream(resume_id, parse_last_event_id(request)),
+        content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,201 @@
+"""
+Batch shortlisting: analyze many resumes against one job description.
+
+The job description is tokenized once. Files are extracted concurrently
+(each extraction runs in the extraction process pool), scored in a pool of
+scoring processes, saved with a single bulk insert and ranked by job match
+and ATS score. A file that fails is reported but never fails the batch.
+"""
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import repeat
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from .analysis_cache import evict_entries, hash_uploaded_file, lookup_analysis, lookup_text, store_analysis
+from .analyzer import analyze_resume_with_ai
+from .extraction import extract_text_from_file
+from .features import JobDescription
+from .models import ResumeAnalysis, store_contents, store_job_descriptions
+from .search import index_resumes
+from .storage import add_references, defer_references
+from .uploads import ALLOWED_EXTENSIONS, file_size_error, file_type_error
+
+_scoring_pool = None
+_scoring_pool_lock = threading.Lock()
+
+
+def get_scoring_pool():
+    """Process pool used to score large batches in parallel, or None if disabled"""
+    global _scoring_pool
+    if settings.SCORING_POOL_SIZE <= 0:
+        return None
+    with _scoring_pool_lock:
+        if _scoring_pool is None:
+            _scoring_pool = ProcessPoolExecutor(
+                max_workers=settings.SCORING_POOL_SIZE,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        return _scoring_pool
+
+
+def _reset_scoring_pool():
+    global _scoring_pool
+    with _scoring_pool_lock:
+        _scoring_pool = None
+
+
+def score_resumes(texts, job_description):
+    """Run analyze_resume_with_ai over many texts, in parallel when the batch is large"""
+    return score_resume_pairs(texts, repeat(JobDescription.of(job_description), len(texts)))
+
+
+def score_resume_pairs(texts, job_descriptions):
+    """Score each text against its own job description, in parallel when the batch is large"""
+    # Each distinct job description is prepared once
+    prepared = {}
+    jobs = []
+    for job in job_descriptions:
+        key = str(job or '')
+        if key not in prepared:
+            prepared[key] = JobDescription.of(job)
+        jobs.append(prepared[key])
+    pool = get_scoring_pool() if len(texts) >= settings.SCORING_POOL_MIN_BATCH else None
+
+    if pool is not None:
+        chunksize = max(1, len(texts) // (settings.SCORING_POOL_SIZE * 4))
+        try:
+            return list(pool.map(analyze_resume_with_ai, texts, jobs, chunksize=chunksize))
+        except BrokenProcessPool:
+            # A scoring process died; start a fresh pool next time and finish inline
+            _reset_scoring_pool()
+
+    return [analyze_resume_with_ai(text, job) for text, job in zip(texts, jobs)]
+
+
+def _validation_error(file):
+    extension = file.name.split('.')[-1].lower()
+    if extension not in ALLOWED_EXTENSIONS:
+        return file_type_error(extension)
+    if file.size > settings.UPLOAD_MAX_FILE_SIZE:
+        return file_size_error()
+    return None
+
+
+def _extract(resume_analysis):
+    """Extract one stored file, reusing text from the cache when possible"""
+    try:
+        cached_text = lookup_text(resume_analysis.content_hash)
+        if cached_text is not None:
+            return {'text': cached_text, 'cached': True}
+        return extract_text_from_file(resume_analysis.file, resume_analysis.content_hash)
+    finally:
+        # Runs in a pool thread, which opened its own database connection
+        connection.close()
+
+
+def shortlist_resumes(files, job_description, rejected=()):
+    """Analyze uploaded files against one job description and rank them"""
+    job = JobDescription(job_description)
+    # Files the upload handler already dropped while receiving the request
+    failures = [{'filename': item['filename'], 'error': item['error']} for item in rejected]
+    rows = []
+    cached_results = {}
+
+    # Store the files and build unsaved rows; the file references are added
+    # with the rows, so a failed insert leaves no reference behind
+    with defer_references() as stored_names:
+        for file in files:
+            error = _validation_error(file)
+            if error:
+                failures.append({'filename': file.name, 'error': error})
+                continue
+
+            content_hash = hash_uploaded_file(file)
+            resume_analysis = ResumeAnalysis(
+                filename=file.name,
+                job_description=job.text,
+                file_size=file.size,
+                content_hash=content_hash,
+                processing_status='processing',
+            )
+            resume_analysis.file.save(file.name, file, save=False)
+            rows.append(resume_analysis)
+
+            cached = lookup_analysis(content_hash, job.text)
+            if cached is not None:
+                cached_results[len(rows) - 1] = cached
+
+    # Extract everything that is not fully cached, concurrently
+    pending = [index for index in range(len(rows)) if index not in cached_results]
+    extractions = {}
+    if pending:
+        workers = max(1, min(len(pending), settings.EXTRACTION_POOL_SIZE or 1))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {index: executor.submit(_extract, rows[index]) for index in pending}
+        for index, future in futures.items():
+            try:
+                extractions[index] = future.result()
+            except Exception as e:
+                extractions[index] = e
+
+    # Score the extracted texts in one parallel pass
+    to_score = [index for index in pending if not isinstance(extractions[index], Exception)]
+    texts = [extractions[index]['text'] for index in to_score]
+    scored = dict(zip(to_score, score_resumes(texts, job)))
+
+    for index, resume_analysis in enumerate(rows):
+        if index in cached_results:
+            cached = cached_results[index]
+            resume_analysis.apply_analysis(cached.raw_text, cached.analysis_results)
+        elif index in scored:
+            extraction = extractions[index]
+            raw_text = extraction.pop('text')
+            analysis_results = scored[index]
+            analysis_results['extraction'] = extraction
+            resume_analysis.apply_analysis(raw_text, analysis_results)
+            store_analysis(resume_analysis.content_hash, job.text, raw_text,
+                           analysis_results, evict=False)
+        else:
+            resume_analysis.processing_status = 'failed'
+            resume_analysis.analysis_results = {'error': str(extractions[index])}
+
+    with transaction.atomic():
+        add_references(stored_names)
+        store_job_descriptions(rows)
+        ResumeAnalysis.objects.bulk_create(rows)
+        store_contents(rows)
+    index_resumes(
+        (row.pk, row.raw_text) for row in rows if row.processing_status == 'completed'
+    )
+    if scored:
+        evict_entries()
+
+    completed = [row for row in rows if row.processing_status == 'completed']
+    completed.sort(key=lambda row: (row.job_match_score or 0, row.ats_score or 0), reverse=True)
+    failures.extend(
+        {'id': row.pk, 'filename': row.filename, 'error': row.analysis_results.get('error')}
+        for row in rows if row.processing_status == 'failed'
+    )
+
+    return {
+        'job_keywords': len(job.keywords),
+        'total': len(files) + len(rejected),
+        'completed': len(completed),
+        'failed': len(failures),
+        'ranking': [
+            {
+                'rank': rank,
+                'id': row.pk,
+                'filename': row.filename,
+                'job_match_score': row.job_match_score,
+                'ats_score': row.ats_score,
+                'extracted_skills': row.analysis_results.get('extracted_skills', []),
+            }
+            for rank, row in enumerate(completed, start=1)
+        ],
+        'failures': failures,
+    }
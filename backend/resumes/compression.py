@@ -0,0 +1,21 @@
+"""
+gzip compression of API responses, negotiated by Accept-Encoding.
+
+Django's GZipMiddleware with two exceptions: server-sent event streams are
+sent uncompressed so every event reaches the client as soon as it is
+written, and bodies under RESPONSE_COMPRESSION_MIN_BYTES are not worth the
+CPU. Responses that already carry a Content-Encoding (pre-compressed
+analysis blobs, see response_blobs.py) pass through untouched. Compressed
+responses get weak ETags, which If-None-Match still matches.
+"""
+from django.conf import settings
+from django.middleware.gzip import GZipMiddleware
+
+
+class CompressionMiddleware(GZipMiddleware):
+    def process_response(self, request, response):
+        if response.get('Content-Type', '').startswith('text/event-stream'):
+            return response
+        if not response.streaming and len(response.content) < settings.RESPONSE_COMPRESSION_MIN_BYTES:
+            return response
+        return super().process_response(request, response)
@@ -0,0 +1,126 @@
+"""
+Streaming DOCX text extraction.
+
+python-docx builds an object tree for the whole document and only exposes
+body paragraphs, missing tables, text boxes, headers and footers, which is
+where many resume templates keep contact details and skills. This reads the
+.docx as a zip and streams word/document.xml plus the header and footer
+parts through an incremental XML parser, collecting runs into lists that are
+joined once. Elements are cleared as soon as their paragraph is done, so
+memory stays flat on large documents.
+
+python-docx remains the fallback for packages this parser cannot read.
+"""
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+
+import docx
+
+W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+MC = '{http://schemas.openxmlformats.org/markup-compatibility/2006}'
+
+PARAGRAPH = W + 'p'
+RUN = W + 'r'
+TEXT = W + 't'
+TABLE = W + 'tbl'
+# Run children that stand for characters (matching python-docx's run.text)
+RUN_CHARACTERS = {
+    W + 'tab': '\t',
+    W + 'ptab': '\t',
+    W + 'cr': '\n',
+    W + 'noBreakHyphen': '-',
+}
+BREAK = W + 'br'
+# Text boxes are stored twice, as mc:Choice (DrawingML) and mc:Fallback (VML)
+FALLBACK = MC + 'Fallback'
+
+HEADER_RE = re.compile(r'^word/header(\d*)\.xml$')
+FOOTER_RE = re.compile(r'^word/footer(\d*)\.xml$')
+DOCUMENT_PART = 'word/document.xml'
+
+
+def _numbered_parts(names, pattern):
+    numbered = []
+    for name in names:
+        match = pattern.match(name)
+        if match:
+            numbered.append((int(match.group(1) or 0), name))
+    return [name for _, name in sorted(numbered)]
+
+
+def _paragraphs(stream):
+    """Yield the text of each paragraph of one WordprocessingML part"""
+    open_paragraphs = []
+    run_depth = 0
+    skip_depth = 0
+
+    for event, element in ET.iterparse(stream, events=('start', 'end')):
+        tag = element.tag
+
+        if tag == FALLBACK:
+            skip_depth += 1 if event == 'start' else -1
+            if event == 'end':
+                element.clear()
+            continue
+        if skip_depth:
+            continue
+
+        if event == 'start':
+            if tag == PARAGRAPH:
+                open_paragraphs.append([])
+            elif tag == RUN:
+                run_depth += 1
+            continue
+
+        if tag == TEXT:
+            if open_paragraphs and element.text:
+                open_paragraphs[-1].append(element.text)
+        elif tag == RUN:
+            run_depth -= 1
+        elif run_depth and open_paragraphs:
+            if tag in RUN_CHARACTERS:
+                open_paragraphs[-1].append(RUN_CHARACTERS[tag])
+            elif tag == BREAK and element.get(W + 'type') in (None, 'textWrapping'):
+                open_paragraphs[-1].append('\n')
+        if tag == PARAGRAPH:
+            yield ''.join(open_paragraphs.pop())
+            element.clear()
+        elif tag == TABLE:
+            element.clear()
+
+
+def iter_docx_parts(source):
+    """Yield the text of each header, the body and each footer, in that order"""
+    with zipfile.ZipFile(source) as package:
+        names = package.namelist()
+        if DOCUMENT_PART not in names:
+            raise KeyError(f"{DOCUMENT_PART} not found in package")
+
+        parts = _numbered_parts(names, HEADER_RE) + [DOCUMENT_PART] + _numbered_parts(names, FOOTER_RE)
+        for name in parts:
+            with package.open(name) as stream:
+                yield '\n'.join(_paragraphs(stream))
+
+
+def extract_docx_text_python_docx(source):
+    """Body paragraphs only, through the python-docx object model"""
+    if hasattr(source, 'seek'):
+        source.seek(0)
+    document = docx.Document(source)
+    return '\n'.join(paragraph.text for paragraph in document.paragraphs)
+
+
+def extract_docx_text(source):
+    """Text of a .docx (path or binary file object), including tables, text boxes, headers and footers"""
+    try:
+        texts = []
+        seen = set()
+        for text in iter_docx_parts(source):
+            # Templates often repeat the same header for first/odd/even pages
+            if text.strip() and text not in seen:
+                seen.add(text)
+                texts.append(text)
+        return '\n'.join(texts)
+    except (zipfile.BadZipFile, KeyError, ET.ParseError):
+        return extract_docx_text_python_docx(source)
@@ -0,0 +1,352 @@
+"""
+Budgeted text extraction in a pool of pre-forked worker processes.
+
+PDF/DOCX parsing is CPU heavy and holds the GIL, and a malformed or very long
+document can take seconds. Documents are therefore parsed in separate worker
+processes, each limited by:
+
+- a page budget (EXTRACTION_MAX_PAGES, PDF only)
+- a text budget (EXTRACTION_MAX_CHARS, PDF only)
+- a wall-clock deadline (EXTRACTION_DEADLINE_SECONDS)
+- an address-space cap (EXTRACTION_MAX_MEMORY_MB)
+
+Workers stream text back one page at a time, so when a budget is hit the
+caller still gets the text extracted so far together with a `truncated` flag.
+PDF page texts are cached by (file hash, page index), so re-analysing or
+retrying a document only parses pages that were never extracted before.
+A worker that overruns its deadline or runs out of memory is killed and
+replaced with a fresh process.
+"""
+import io
+import multiprocessing
+import os
+import queue
+import threading
+import time
+
+from django.conf import settings
+
+from .docx_text import extract_docx_text
+from .metrics import extraction_timer, observe_document
+from .profiling import is_profiling
+from .pdf_text import iter_pdf_pages, open_pdf
+
+# Extra time a worker gets to notice its own deadline before it is killed
+KILL_GRACE_SECONDS = 2.0
+
+
+def _limit_memory(max_memory_mb):
+    """Cap the address space of the current process (Unix only)"""
+    if not max_memory_mb:
+        return
+    try:
+        import resource
+    except ImportError:
+        return
+    limit = max_memory_mb * 1024 * 1024
+    try:
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except (ValueError, OSError):
+        pass
+
+
+def _open_source(source):
+    """Workers receive either a filesystem path or the raw file bytes"""
+    if isinstance(source, bytes):
+        return io.BytesIO(source)
+    return source
+
+
+def _extract_pages(file_type, source, emit, max_pages=None, max_chars=None, deadline_seconds=None,
+                   cached_pages=None):
+    """Extract a document page by page, reporting progress through `emit`"""
+    started = time.monotonic()
+    reason = None
+
+    if file_type == 'pdf':
+        reader = open_pdf(_open_source(source))
+        total_pages = len(reader.pages)
+        emit(('pages', total_pages))
+
+        chars = 0
+        pages = iter_pdf_pages(reader, max_pages, cached_pages)
+        for index, text, fresh in pages:
+            emit(('page', (index, text, fresh)))
+            chars += len(text)
+            # Stopping the generator here leaves the remaining pages unparsed
+            if max_chars and chars >= max_chars:
+                reason = 'max_chars'
+            elif deadline_seconds and time.monotonic() - started > deadline_seconds:
+                reason = 'deadline'
+            if reason:
+                if index + 1 == total_pages:
+                    reason = None
+                break
+        else:
+            if max_pages and max_pages < total_pages:
+                reason = 'max_pages'
+    else:
+        text = extract_docx_text(_open_source(source))
+        emit(('pages', 1))
+        emit(('chunk', text))
+
+    emit(('done', reason))
+
+
+def _worker_main(conn, max_memory_mb):
+    """Entry point of an extraction worker process"""
+    _limit_memory(max_memory_mb)
+
+    while True:
+        try:
+            job = conn.recv()
+        except (EOFError, OSError):
+            return
+        if job is None:
+            return
+
+        file_type, source, budgets = job
+        try:
+            _extract_pages(file_type, source, conn.send, **budgets)
+        except MemoryError:
+            conn.send(('done', 'memory'))
+        except Exception as e:
+            conn.send(('error', str(e)))
+
+
+class _Worker:
+    """Parent-side handle of one extraction process"""
+
+    def __init__(self, context, max_memory_mb):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(child_conn, max_memory_mb),
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+
+    def kill(self):
+        try:
+            self.conn.close()
+        finally:
+            if self.process.is_alive():
+                self.process.kill()
+            self.process.join(timeout=1)
+
+
+class ExtractionPool:
+    """Bounded pool of pre-forked extraction workers"""
+
+    def __init__(self, size, max_memory_mb=None):
+        self.size = size
+        self.max_memory_mb = max_memory_mb
+        self.context = multiprocessing.get_context('spawn')
+        self.idle = queue.Queue()
+        for _ in range(size):
+            self.idle.put(_Worker(self.context, max_memory_mb))
+
+    def extract(self, file_type, source, budgets, on_page=None):
+        """Run one document on the next free worker (blocks while all are busy)"""
+        worker = self.idle.get()
+        outcome = None
+        try:
+            outcome = self._collect(worker, file_type, source, budgets, on_page)
+        finally:
+            if outcome is None or not outcome[3]:
+                worker.kill()
+                worker = _Worker(self.context, self.max_memory_mb)
+            self.idle.put(worker)
+
+        result, reason, error, healthy = outcome
+        if error:
+            raise ValueError(error)
+        return _finish(result, reason)
+
+    def _collect(self, worker, file_type, source, budgets, on_page=None):
+        """Gather streamed pages until the worker finishes or must be killed"""
+        result = _new_result()
+        kill_at = time.monotonic() + budgets['deadline_seconds'] + KILL_GRACE_SECONDS
+        worker.conn.send((file_type, source, budgets))
+
+        while True:
+            remaining = kill_at - time.monotonic()
+            if remaining <= 0 or not worker.conn.poll(remaining):
+                return result, 'deadline', None, False
+            try:
+                kind, payload = worker.conn.recv()
+            except (EOFError, OSError):
+                # The process died, most likely killed for exceeding its memory cap
+                return result, 'crashed', None, False
+
+            if kind in ('chunk', 'page', 'pages'):
+                _record(result, kind, payload, on_page)
+            elif kind == 'done':
+                return result, payload, None, payload != 'memory'
+            elif kind == 'error':
+                return result, None, payload, True
+
+    def shutdown(self):
+        """Stop all idle workers"""
+        while True:
+            try:
+                self.idle.get_nowait().kill()
+            except queue.Empty:
+                return
+
+
+def _new_result():
+    return {'chunks': [], 'page_count': None, 'pages_extracted': 0, 'new_pages': {}}
+
+
+def _record(result, kind, payload, on_page=None):
+    """Add one streamed message to a result being collected; `on_page(done, total)` follows PDF pages"""
+    if kind == 'chunk':
+        result['chunks'].append(payload)
+    elif kind == 'pages':
+        result['page_count'] = payload
+    elif kind == 'page':
+        index, text, fresh = payload
+        result['pages_extracted'] += 1
+        if text:
+            result['chunks'].append(text)
+        if fresh:
+            result['new_pages'][index] = text
+        if on_page is not None:
+            on_page(result['pages_extracted'], result['page_count'])
+
+
+def _finish(result, reason):
+    chunks = result.pop('chunks')
+    result['text'] = '\n'.join(chunks).strip()
+    result['truncated'] = reason is not None
+    result['truncation_reason'] = reason
+    if reason in ('deadline', 'memory', 'crashed') and not result['text']:
+        raise ValueError(f"no text extracted before the document was aborted ({reason})")
+    return result
+
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def get_extraction_pool():
+    """Return this process's extraction pool, or None if pooling is disabled"""
+    global _pool, _pool_pid
+    if settings.EXTRACTION_POOL_SIZE <= 0:
+        return None
+    with _pool_lock:
+        # A forked server worker must not share its parent's pipes
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = ExtractionPool(settings.EXTRACTION_POOL_SIZE, settings.EXTRACTION_MAX_MEMORY_MB)
+            _pool_pid = os.getpid()
+        return _pool
+
+
+def _file_source(file):
+    """Prefer handing workers a path so the document is never copied through the pipe"""
+    for get_path in (lambda: file.path, lambda: file.temporary_file_path()):
+        try:
+            path = get_path()
+        except (AttributeError, NotImplementedError, ValueError):
+            continue
+        if path and os.path.exists(path):
+            return path
+    file.seek(0)
+    return file.read()
+
+
+def extract_document(file, file_type, content_hash='', on_page=None):
+    """
+    Extract text from a PDF or DOCX file within the configured budgets.
+
+    Returns a dict with `text`, `truncated`, `truncation_reason`,
+    `page_count` and, for PDFs, how many pages were parsed and how many came
+    from the page cache (keyed by `content_hash`). `on_page(done, total)` is
+    called after each PDF page.
+    """
+    # Imported here: worker processes load this module without Django set up
+    from .analysis_cache import lookup_page_texts, store_page_texts
+
+    label = 'PDF' if file_type == 'pdf' else 'DOCX'
+    budgets = {
+        'max_pages': settings.EXTRACTION_MAX_PAGES,
+        'max_chars': settings.EXTRACTION_MAX_CHARS,
+        'deadline_seconds': settings.EXTRACTION_DEADLINE_SECONDS,
+        'cached_pages': {},
+    }
+
+    try:
+        if file_type == 'pdf':
+            budgets['cached_pages'] = lookup_page_texts(content_hash, budgets['max_pages'])
+
+        source = _file_source(file)
+        # Profiled requests parse inline so the profiler sees the parsing
+        pool = None if is_profiling() else get_extraction_pool()
+        if pool is not None:
+            result = pool.extract(file_type, source, budgets, on_page)
+        else:
+            # Inline mode: same budgets, enforced cooperatively in this thread
+            result = _new_result()
+            reason = []
+
+            def emit(message):
+                kind, payload = message
+                if kind == 'done':
+                    reason.append(payload)
+                else:
+                    _record(result, kind, payload, on_page)
+
+            _extract_pages(file_type, source, emit, **budgets)
+            result = _finish(result, reason[0] if reason else None)
+    except Exception as e:
+        raise ValueError(f"Error reading {label}: {str(e)}")
+
+    new_pages = result.pop('new_pages')
+    if file_type == 'pdf':
+        store_page_texts(content_hash, new_pages)
+        result['cached_pages'] = result['pages_extracted'] - len(new_pages)
+    else:
+        del result['pages_extracted']
+    return result
+
+
+def extract_text_from_file(file, content_hash='', on_page=None):
+    """
+    Extract text from uploaded file based on file type.
+
+    PDF and DOCX files are parsed in the extraction pool under the configured
+    page, character, time and memory budgets. Returns a dict with `text`,
+    `truncated`, `truncation_reason` and `page_count`. `on_page(done, total)`
+    reports PDF pages as they are extracted.
+    """
+    file_extension = file.name.split('.')[-1].lower()
+    file_type = 'docx' if file_extension == 'doc' else file_extension
+
+    with extraction_timer(file_type):
+        if file_type in ('pdf', 'docx'):
+            result = extract_document(file, file_type, content_hash, on_page)
+        elif file_type == 'txt':
+            result = {
+                'text': file.read().decode('utf-8'),
+                'truncated': False,
+                'truncation_reason': None,
+                'page_count': None
+            }
+        else:
+            raise ValueError(f"Unsupported file type: {file_extension}")
+
+    observe_document(file_type, file.size, result['page_count'])
+    return result
+
+
+def extract_text_from_pdf(file):
+    """Extract text from PDF file"""
+    return extract_document(file, 'pdf')['text']
+
+
+def extract_text_from_docx(file):
+    """Extract text from DOCX file"""
+    return extract_document(file, 'docx')['text']
@@ -0,0 +1,91 @@
+"""
+Single-pass feature extraction shared by the resume scorers.
+
+Every scorer in analyze_resume_with_ai used to lowercase, split and
+regex-scan the resume on its own. TokenizedDocument does that work once and
+the scorers read the precomputed features instead.
+"""
+import re
+
+from .skills import tokenize as tokenize_skills
+
+PHONE_RE = re.compile(r'\b\d{3}[-.\s]?\d{3}[-.\s]?\d{4}\b')
+YEARS_RE = re.compile(r'\b(\d+)\s*(?:years?|yrs?)\b')
+NON_LETTER_RE = re.compile(r'[^a-z\s]')
+VOWEL_GROUP_RE = re.compile(r'[aeiouy]+')
+# A whole (letters-only) word with no vowel group still counts as one syllable
+NO_VOWEL_WORD_RE = re.compile(r'(?<!\S)[^aeiouy\s]+(?!\S)')
+
+STOP_WORDS = frozenset({'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by'})
+
+
+def keyword_terms(text):
+    """Sorted unique lowercase words of a text, the persisted form of a document's token set"""
+    return sorted(set((text or '').lower().split()))
+
+
+class TokenizedDocument:
+    """Lowercase text, tokens and regex features of a resume, computed once"""
+
+    def __init__(self, text):
+        self.text = text
+        self.lower = self.text.lower()
+        self.tokens = self.lower.split()
+        self.token_set = set(self.tokens)
+        self.word_count = len(self.tokens)
+
+        sentences = self.text.count('.') + self.text.count('!') + self.text.count('?')
+        self.sentence_count = max(1, sentences)  # Avoid division by zero
+
+        # Syllables are estimated as vowel groups per word, ignoring non-letters.
+        # Stripping non-letters from the whole text keeps words separated by
+        # whitespace, so three regex passes replace two regexes per word.
+        letters = NON_LETTER_RE.sub('', self.lower)
+        self.syllable_count = (
+            len(VOWEL_GROUP_RE.findall(letters)) + len(NO_VOWEL_WORD_RE.findall(letters))
+        )
+        self.avg_word_length = (
+            sum(len(word.strip('.,!?;:')) for word in self.tokens) / max(1, self.word_count)
+        )
+
+        self.has_email = '@' in self.text
+        self.has_phone = PHONE_RE.search(self.text) is not None
+        self.has_bullets = '•' in self.text or '-' in self.text or '*' in self.text
+        self.years_mentioned = [int(years) for years in YEARS_RE.findall(self.lower)]
+
+        self._skill_tokens = None
+
+    @property
+    def skill_tokens(self):
+        """Word tokens used by the skill matcher (computed on first use)"""
+        if self._skill_tokens is None:
+            self._skill_tokens = tokenize_skills(self.lower)
+        return self._skill_tokens
+
+    @classmethod
+    def of(cls, value):
+        """Accept either a TokenizedDocument or plain resume text"""
+        if isinstance(value, cls):
+            return value
+        return cls(value)
+
+
+class JobDescription:
+    """A job description with its keyword set, preprocessed once and reusable across resumes"""
+
+    def __init__(self, text):
+        self.text = text or ''
+        self.keywords = frozenset(self.text.lower().split()) - STOP_WORDS
+
+    def __bool__(self):
+        return bool(self.text)
+
+    def __str__(self):
+        return self.text
+
+    @classmethod
+    def of(cls, value):
+        """Accept either a JobDescription or plain job description text"""
+        if isinstance(value, cls):
+            return value
+        return cls(value)
@@ -0,0 +1,102 @@
+"""
+Model fields that store text and JSON compressed.
+
+Values are written as bytes with a one-byte header naming the codec, so
+rows written with different CONTENT_COMPRESSION settings can be read side by
+side: raw (values under CONTENT_COMPRESS_MIN_BYTES), zlib, or zstd when the
+zstandard package is installed. Reading a zstd value without zstandard
+raises an error rather than returning garbage.
+
+The fields behave like TextField and JSONField in Python code. They cannot
+be filtered on by content, which nothing in this app does.
+"""
+import json
+import zlib
+
+from django.conf import settings
+from django.db import models
+
+from .suggestions import pack_results, unpack_results
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+RAW = b'\x00'
+ZLIB = b'\x01'
+ZSTD = b'\x02'
+
+
+def compress(data):
+    """Header byte + `data` in the configured codec"""
+    codec = settings.CONTENT_COMPRESSION
+    if codec == 'none' or len(data) < settings.CONTENT_COMPRESS_MIN_BYTES:
+        return RAW + data
+    if codec == 'zstd' and zstandard is not None:
+        return ZSTD + zstandard.ZstdCompressor(level=settings.CONTENT_COMPRESS_LEVEL).compress(data)
+    return ZLIB + zlib.compress(data, settings.CONTENT_COMPRESS_LEVEL)
+
+
+def decompress(value):
+    value = bytes(value)
+    header, body = value[:1], value[1:]
+    if header == RAW:
+        return body
+    if header == ZLIB:
+        return zlib.decompress(body)
+    if header == ZSTD:
+        if zstandard is None:
+            raise RuntimeError('zstd compressed content needs the zstandard package')
+        return zstandard.ZstdDecompressor().decompress(body)
+    raise ValueError(f'Unknown content encoding {header!r}')
+
+
+class CompressedTextField(models.BinaryField):
+    """Text stored compressed"""
+
+    def encode(self, value):
+        return value.encode('utf-8')
+
+    def decode(self, data):
+        return data.decode('utf-8')
+
+    def from_db_value(self, value, expression, connection):
+        if value is None:
+            return None
+        return self.decode(decompress(value))
+
+    def get_prep_value(self, value):
+        if value is None:
+            return None
+        return compress(self.encode(value))
+
+    def to_python(self, value):
+        return value
+
+    def value_to_string(self, obj):
+        return self.value_from_object(obj)
+
+    def _check_str_default_value(self):
+        # Defaults are Python values (text), not stored bytes
+        return []
+
+
+class CompressedJSONField(CompressedTextField):
+    """JSON document stored compressed"""
+
+    def encode(self, value):
+        return json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    def decode(self, data):
+        return json.loads(data)
+
+
+class AnalysisResultsField(CompressedJSONField):
+    """Analysis results stored compressed, with catalog suggestions kept as codes"""
+
+    def encode(self, value):
+        return super().encode(pack_results(value))
+
+    def decode(self, data):
+        return unpack_results(super().decode(data))
@@ -0,0 +1,143 @@
+"""
+Durable analysis job queue backed by the ResumeAnalysis table.
+
+A row with processing_status='pending' is a queued job. Workers claim a row
+by flipping it to 'processing' with a conditional UPDATE that also stamps a
+lease (owner + expiry). Only one UPDATE can win for a given row, so several
+worker processes can share the same SQLite/PostgreSQL database without
+double-processing. If a worker dies, its lease expires and the row becomes
+claimable again (visibility timeout). While a job is processed, a thread
+renews its lease every third of the lease period (see keep_lease), so a
+slow extraction is not claimed a second time.
+"""
+import os
+import socket
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import ResumeAnalysis, ResumeContent, store_contents
+
+
+def make_worker_id():
+    """Build a unique, human readable worker identifier"""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def claimable_jobs(now):
+    """Rows that are queued, or whose processing lease has expired"""
+    return ResumeAnalysis.objects.filter(
+        Q(processing_status='pending') |
+        Q(processing_status='processing', lease_expires_at__lt=now)
+    )
+
+
+def claim_next_job(worker_id, lease_seconds=None, max_attempts=None, batch_size=10):
+    """Claim the oldest available job, or return None if the queue is empty"""
+    lease_seconds = lease_seconds or settings.ANALYSIS_JOB_LEASE_SECONDS
+    max_attempts = max_attempts or settings.ANALYSIS_JOB_MAX_ATTEMPTS
+    now = timezone.now()
+
+    candidates = (
+        claimable_jobs(now)
+        .order_by('upload_timestamp', 'id')
+        .values_list('id', 'attempts')[:batch_size]
+    )
+
+    for job_id, attempts in candidates:
+        # Matching on the attempts counter makes the claim a compare-and-swap:
+        # if another worker got there first the row no longer matches.
+        job = claimable_jobs(now).filter(id=job_id, attempts=attempts)
+
+        if attempts >= max_attempts:
+            with transaction.atomic():
+                abandoned = job.update(
+                    processing_status='failed',
+                    lease_owner='',
+                    lease_expires_at=None,
+                    analysis_timestamp=now,
+                )
+                if abandoned:
+                    ResumeContent.objects.update_or_create(
+                        resume_id=job_id,
+                        defaults={'analysis_results': {'error': f'Analysis abandoned after {attempts} attempts'}},
+                    )
+            continue
+
+        claimed = job.update(
+            processing_status='processing',
+            lease_owner=worker_id,
+            lease_expires_at=now + timedelta(seconds=lease_seconds),
+            attempts=F('attempts') + 1,
+        )
+        if claimed:
+            return ResumeAnalysis.objects.select_related('content', 'stored_job_description').get(id=job_id)
+
+    return None
+
+
+def extend_lease(resume_analysis, worker_id, lease_seconds=None):
+    """Push the lease expiry forward for a job this worker still owns"""
+    lease_seconds = lease_seconds or settings.ANALYSIS_JOB_LEASE_SECONDS
+    return bool(ResumeAnalysis.objects.filter(
+        id=resume_analysis.pk,
+        lease_owner=worker_id,
+        processing_status='processing',
+    ).update(lease_expires_at=timezone.now() + timedelta(seconds=lease_seconds)))
+
+
+@contextmanager
+def keep_lease(resume_analysis, worker_id, lease_seconds=None):
+    """Renew the lease of a claimed job in a background thread until the block exits"""
+    lease_seconds = lease_seconds or settings.ANALYSIS_JOB_LEASE_SECONDS
+    done = threading.Event()
+
+    def renew():
+        try:
+            while not done.wait(lease_seconds / 3):
+                # Lost (expired and re-claimed): complete_job will discard the result
+                if not extend_lease(resume_analysis, worker_id, lease_seconds):
+                    break
+        finally:
+            connection.close()
+
+    thread = threading.Thread(target=renew, name=f'lease-{resume_analysis.pk}', daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        done.set()
+        thread.join()
+
+
+def complete_job(resume_analysis, worker_id):
+    """Store the results of a processed job if this worker still holds the lease"""
+    with transaction.atomic():
+        updated = _complete_job(resume_analysis, worker_id)
+        if updated:
+            store_contents([resume_analysis])
+    return bool(updated)
+
+
+def _complete_job(resume_analysis, worker_id):
+    return ResumeAnalysis.objects.filter(
+        id=resume_analysis.pk,
+        lease_owner=worker_id,
+        processing_status='processing',
+    ).update(
+        ats_score=resume_analysis.ats_score,
+        job_match_score=resume_analysis.job_match_score,
+        processing_status=resume_analysis.processing_status,
+        progress=resume_analysis.progress,
+        response_blob=resume_analysis.response_blob,
+        response_blob_encoding=resume_analysis.response_blob_encoding,
+        lease_owner='',
+        lease_expires_at=None,
+        analysis_timestamp=timezone.now(),
+    )
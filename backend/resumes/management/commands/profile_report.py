@@ -0,0 +1,87 @@
+import glob
+import io
+import json
+import os
+import pstats
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Aggregate collected upload profiles into hot-function and allocation reports'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dir', default=settings.PROFILING_DIR, help='Directory holding the profiles')
+        parser.add_argument('--file-type', help='Only profiles of this file type (pdf, docx, txt)')
+        parser.add_argument('--min-size', type=int, default=0, help='Only files of at least this many bytes')
+        parser.add_argument('--sort', default='tottime', choices=['tottime', 'cumulative', 'ncalls'],
+                            help='Order of the hot-function report')
+        parser.add_argument('--limit', type=int, default=30, help='Rows per report')
+        parser.add_argument('--function', help='Only functions whose name or file matches this text')
+        parser.add_argument('--scope', choices=['request', 'process'],
+                            help='Only profiles of one request, or only process-wide ones (async views)')
+
+    def handle(self, *args, **options):
+        profiles = []
+        for tags_path in sorted(glob.glob(os.path.join(options['dir'], '*.json'))):
+            with open(tags_path) as f:
+                tags = json.load(f)
+            stats_path = tags_path[:-len('.json')] + '.pstats'
+            if not os.path.exists(stats_path):
+                continue
+            if options['file_type'] and tags['file_type'] != options['file_type']:
+                continue
+            if (tags['file_size'] or 0) < options['min_size']:
+                continue
+            if options['scope'] and tags.get('scope', 'request') != options['scope']:
+                continue
+            profiles.append((stats_path, tags))
+
+        if not profiles:
+            self.stdout.write(f"No matching profiles in {options['dir']}")
+            return
+
+        durations = sorted(tags['duration_ms'] for _, tags in profiles)
+        by_type = defaultdict(int)
+        for _, tags in profiles:
+            by_type[tags['file_type']] += 1
+        self.stdout.write(
+            f"{len(profiles)} profiles ({', '.join(f'{t}: {n}' for t, n in sorted(by_type.items()))}), "
+            f"median {durations[len(durations) // 2]} ms, max {durations[-1]} ms"
+        )
+        process_wide = sum(1 for _, tags in profiles if tags.get('scope') == 'process')
+        if process_wide:
+            self.stdout.write(
+                f"{process_wide} process-wide profiles (async views) include concurrent requests; "
+                f"use --scope request to leave them out"
+            )
+
+        # Hot functions over all matching profiles
+        output = io.StringIO()
+        stats = pstats.Stats(profiles[0][0], stream=output)
+        for stats_path, _ in profiles[1:]:
+            stats.add(stats_path)
+        stats.strip_dirs().sort_stats(options['sort'])
+        restrictions = [options['function']] if options['function'] else []
+        stats.print_stats(*restrictions, options['limit'])
+        self.stdout.write(f"\nHot functions by {options['sort']}:")
+        self.stdout.write(output.getvalue())
+
+        # Allocation sites summed over all matching profiles
+        allocations = defaultdict(lambda: [0, 0, 0])
+        for _, tags in profiles:
+            for allocation in tags['allocations']:
+                totals = allocations[allocation['location']]
+                totals[0] += allocation['size_bytes']
+                totals[1] += allocation['count']
+                totals[2] += 1
+        self.stdout.write("Top allocation sites (net bytes allocated during the request):")
+        ranked = sorted(allocations.items(), key=lambda item: item[1][0], reverse=True)
+        for location, (size, count, seen) in ranked[:options['limit']]:
+            self.stdout.write(f"{size / 1024:12.1f} KiB {count:9d} blocks  in {seen:4d} profiles  {location}")
+
+        peaks = sorted(tags['peak_memory_bytes'] for _, tags in profiles)
+        self.stdout.write(f"\nPeak traced memory: median {peaks[len(peaks) // 2] / 1024:.1f} KiB, "
+                          f"max {peaks[-1] / 1024:.1f} KiB")
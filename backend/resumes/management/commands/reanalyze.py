@@ -0,0 +1,97 @@
+import signal
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from resumes.analyzer import analyzer_version
+from resumes.jobs import make_worker_id
+from resumes.reanalysis import (
+    REANALYZE_LOCK, load_checkpoint, outdated_analyses, reanalyze_next_batch, save_checkpoint,
+)
+from resumes.retention import acquire_lock, release_lock
+
+
+class Command(BaseCommand):
+    help = 'Re-score stored analyses made by an older analyzer version, resuming where the last run stopped'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=settings.REANALYZE_BATCH_SIZE,
+                            help='Rows re-scored and written per transaction')
+        parser.add_argument('--max-rows-per-second', type=float, default=settings.REANALYZE_MAX_ROWS_PER_SECOND,
+                            help='Throttle (0 runs flat out)')
+        parser.add_argument('--limit', type=int, default=0,
+                            help='Stop after examining this many rows (the next run continues)')
+        parser.add_argument('--lease-seconds', type=int, default=settings.REANALYZE_LOCK_SECONDS,
+                            help='How long the run lock lasts without being renewed')
+        parser.add_argument('--restart', action='store_true', help='Ignore the checkpoint of an earlier run')
+        parser.add_argument('--dry-run', action='store_true', help='Only count the outdated analyses')
+
+    def handle(self, *args, **options):
+        version = analyzer_version()
+        if options['dry_run']:
+            self.stdout.write(f"{outdated_analyses(version).count()} analyses to re-score for analyzer {version}")
+            return
+
+        owner = make_worker_id()
+        if not acquire_lock(REANALYZE_LOCK, owner, options['lease_seconds']):
+            self.stderr.write("Another re-analysis run holds the lock")
+            return
+
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self.request_stop)
+        signal.signal(signal.SIGINT, self.request_stop)
+
+        try:
+            last_id = 0 if options['restart'] else load_checkpoint(version)
+            self.stdout.write(f"Re-analysis to analyzer {version} started after id {last_id}")
+            self.run(version, last_id, options, owner)
+        finally:
+            release_lock(REANALYZE_LOCK, owner)
+
+    def run(self, version, last_id, options, owner):
+        rate = options['max_rows_per_second']
+        started = time.monotonic()
+        examined = rescored = 0
+
+        while not self.stopping:
+            close_old_connections()
+            batch_size = options['batch_size']
+            if options['limit']:
+                batch_size = min(batch_size, options['limit'] - examined)
+                if batch_size <= 0:
+                    break
+
+            count, count_rescored, last_id = reanalyze_next_batch(version, last_id, batch_size)
+            if not count:
+                # Finished: the next run scans from the start again
+                save_checkpoint(version, 0)
+                self.stdout.write("No outdated analyses left")
+                break
+            examined += count
+            rescored += count_rescored
+            rows_per_second = examined / max(time.monotonic() - started, 0.001)
+            self.stdout.write(
+                f"Re-scored {rescored} of {examined} rows up to id {last_id} ({rows_per_second:.1f} rows/s)"
+            )
+
+            if not acquire_lock(REANALYZE_LOCK, owner, options['lease_seconds']):
+                self.stderr.write("Lost the re-analysis lock, stopping")
+                break
+
+            # Throttle: sleep (in short steps, so SIGTERM is handled promptly)
+            # until the average rate is back under the limit
+            if rate > 0:
+                deadline = started + examined / rate
+                while not self.stopping and time.monotonic() < deadline:
+                    time.sleep(min(1.0, deadline - time.monotonic()))
+
+        self.stdout.write(
+            f"Re-analysis stopped after {examined} rows ({rescored} re-scored) "
+            f"in {time.monotonic() - started:.1f}s; last id {last_id}"
+        )
+
+    def request_stop(self, signum, frame):
+        """Finish the current batch, then exit"""
+        self.stopping = True
@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from resumes.models import CorpusTerm, ResumeAnalysis, ResumeTerm
+from resumes.search import index_resumes
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the term index used by /api/match/ from all completed analyses'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Resumes indexed per transaction')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        ResumeTerm.objects.all().delete()
+        CorpusTerm.objects.all().delete()
+
+        completed = (
+            ResumeAnalysis.objects.filter(processing_status='completed')
+            .order_by('id')
+            .values_list('id', 'content__raw_text')
+        )
+
+        indexed = 0
+        postings = 0
+        last_id = 0
+        while True:
+            batch = list(completed.filter(id__gt=last_id)[:options['batch_size']])
+            if not batch:
+                break
+            postings += index_resumes(batch)
+            indexed += len(batch)
+            last_id = batch[-1][0]
+
+        self.stdout.write(
+            f"Indexed {indexed} resumes ({postings} postings) in {time.monotonic() - started:.1f}s"
+        )
@@ -0,0 +1,83 @@
+import signal
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, close_old_connections
+
+from resumes.jobs import claim_next_job, complete_job, keep_lease, make_worker_id
+from resumes.progress import final_progress_event, notify_progress, publish_progress
+from resumes.response_blobs import build_analysis_response, store_response_blob
+from resumes.search import index_resumes
+from resumes.views import run_resume_analysis
+
+
+class Command(BaseCommand):
+    help = 'Process queued resume analyses (run several of these to scale throughput)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--worker-id', default=None, help='Identifier stored in the job lease')
+        parser.add_argument('--lease-seconds', type=int, default=settings.ANALYSIS_JOB_LEASE_SECONDS,
+                            help='How long a claimed job stays invisible to other workers')
+        parser.add_argument('--max-attempts', type=int, default=settings.ANALYSIS_JOB_MAX_ATTEMPTS,
+                            help='Mark a job failed after this many claims')
+        parser.add_argument('--poll-interval', type=float, default=settings.ANALYSIS_WORKER_POLL_INTERVAL,
+                            help='Seconds to sleep when the queue is empty')
+        parser.add_argument('--max-jobs', type=int, default=0, help='Exit after processing this many jobs')
+        parser.add_argument('--burst', action='store_true', help='Exit as soon as the queue is empty')
+
+    def handle(self, *args, **options):
+        worker_id = options['worker_id'] or make_worker_id()
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self.request_stop)
+        signal.signal(signal.SIGINT, self.request_stop)
+
+        self.stdout.write(f"Analysis worker {worker_id} started")
+        processed = 0
+
+        while not self.stopping:
+            close_old_connections()
+            try:
+                job = claim_next_job(
+                    worker_id,
+                    lease_seconds=options['lease_seconds'],
+                    max_attempts=options['max_attempts'],
+                )
+            except OperationalError as e:
+                # SQLite reports lock contention between workers this way; just retry
+                self.stderr.write(f"Could not claim job: {e}")
+                time.sleep(options['poll_interval'])
+                continue
+
+            if job is None:
+                if options['burst']:
+                    break
+                time.sleep(options['poll_interval'])
+                continue
+
+            started = time.monotonic()
+            with keep_lease(job, worker_id, options['lease_seconds']):
+                publish_progress(job, 'received')
+                run_resume_analysis(job)
+                # Stored by complete_job together with the results
+                final_event = final_progress_event(job)
+                store_response_blob(job, build_analysis_response(job))
+            if complete_job(job, worker_id):
+                notify_progress(job.pk, final_event, stored=True)
+                if job.processing_status == 'completed':
+                    index_resumes([(job.pk, job.raw_text)])
+                self.stdout.write(
+                    f"Job {job.pk} {job.processing_status} in {time.monotonic() - started:.2f}s"
+                )
+            else:
+                self.stderr.write(f"Job {job.pk} lease lost, result discarded")
+
+            processed += 1
+            if options['max_jobs'] and processed >= options['max_jobs']:
+                break
+
+        self.stdout.write(f"Analysis worker {worker_id} stopped after {processed} jobs")
+
+    def request_stop(self, signum, frame):
+        """Finish the current job, then exit"""
+        self.stopping = True
@@ -0,0 +1,53 @@
+import signal
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, close_old_connections
+
+from resumes.jobs import make_worker_id
+from resumes.retention import run_retention_tick
+
+
+class Command(BaseCommand):
+    help = 'Periodically delete expired resume analyses and uploaded files'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=settings.RETENTION_INTERVAL_SECONDS,
+                            help='Seconds between retention ticks')
+        parser.add_argument('--once', action='store_true', help='Run a single tick and exit')
+
+    def handle(self, *args, **options):
+        owner = make_worker_id()
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self.request_stop)
+        signal.signal(signal.SIGINT, self.request_stop)
+
+        self.stdout.write(f"Retention service {owner} started")
+
+        while not self.stopping:
+            close_old_connections()
+            try:
+                result = run_retention_tick(owner)
+            except OperationalError as e:
+                self.stderr.write(f"Retention tick failed: {e}")
+                result = None
+
+            if result is None:
+                self.stdout.write("Retention lock held by another process, skipping tick")
+            else:
+                self.stdout.write(f"Retention tick: {result}")
+
+            if options['once']:
+                break
+
+            # Sleep in short steps so SIGTERM is handled promptly
+            deadline = time.monotonic() + options['interval']
+            while not self.stopping and time.monotonic() < deadline:
+                time.sleep(min(1.0, deadline - time.monotonic()))
+
+        self.stdout.write(f"Retention service {owner} stopped")
+
+    def request_stop(self, signum, frame):
+        """Finish the current tick, then exit"""
+        self.stopping = True
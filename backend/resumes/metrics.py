@@ -0,0 +1,130 @@
+"""
+Prometheus metrics for the upload and analysis pipeline, served at /api/metrics.
+
+Samples are aggregated in-process; an observation costs about a
+microsecond. With PROMETHEUS_MULTIPROC_DIR set every process, including the
+scoring pool workers, writes its samples to memory-mapped files in that
+directory and the endpoint merges them, so one scrape covers all workers
+rather than the one that answered. gunicorn.conf.py sets it for the web
+process when the environment does not; other servers (uvicorn, runserver)
+need it set explicitly, or each process reports only its own samples.
+
+This module only depends on prometheus_client, so pool worker processes can
+import it without Django being set up.
+"""
+import os
+import time
+from contextlib import contextmanager
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram,
+    generate_latest, multiprocess,
+)
+
+# Processes started outside gunicorn (management commands, pool workers) may
+# be the first to use the directory
+if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+    os.makedirs(os.environ['PROMETHEUS_MULTIPROC_DIR'], exist_ok=True)
+
+STAGE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+SCORER_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1)
+SIZE_BUCKETS = (10e3, 50e3, 100e3, 250e3, 500e3, 1e6, 2.5e6, 5e6, 10e6)
+PAGE_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100)
+
+STAGE_SECONDS = Histogram(
+    'resume_stage_duration_seconds',
+    'Time spent in each stage of the upload pipeline',
+    ['stage'], buckets=STAGE_BUCKETS,
+)
+EXTRACTION_SECONDS = Histogram(
+    'resume_extraction_duration_seconds',
+    'Time spent extracting text from an uploaded file',
+    ['file_type'], buckets=STAGE_BUCKETS,
+)
+SCORER_SECONDS = Histogram(
+    'resume_scorer_duration_seconds',
+    'Time spent in each scorer of the analysis',
+    ['scorer'], buckets=SCORER_BUCKETS,
+)
+STAGE_FAILURES = Counter(
+    'resume_stage_failures',
+    'Pipeline stages that raised an error',
+    ['stage'],
+)
+DOCUMENT_BYTES = Histogram(
+    'resume_document_size_bytes',
+    'Size of extracted documents',
+    ['file_type'], buckets=SIZE_BUCKETS,
+)
+DOCUMENT_PAGES = Histogram(
+    'resume_document_pages',
+    'Page count of extracted PDF and DOCX documents',
+    ['file_type'], buckets=PAGE_BUCKETS,
+)
+RETENTION_SECONDS = Histogram(
+    'resume_retention_duration_seconds',
+    'Duration of retention ticks (expired records and orphaned files)',
+    buckets=STAGE_BUCKETS,
+)
+RETENTION_DELETED = Counter(
+    'resume_retention_deleted',
+    'Records and files removed by retention',
+    ['kind'],
+)
+CACHE_EVENTS = Counter(
+    'resume_analysis_cache_events',
+    'Analysis cache hits, text hits, misses, stores and evictions',
+    ['event'],
+)
+ADMISSION_REJECTIONS = Counter(
+    'resume_admission_rejections',
+    'Requests refused by admission control',
+    ['limiter', 'reason'],
+)
+
+
+@contextmanager
+def _timed(histogram, failure_stage):
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        STAGE_FAILURES.labels(failure_stage).inc()
+        raise
+    finally:
+        histogram.observe(time.perf_counter() - started)
+
+
+def stage_timer(stage):
+    """Time a pipeline stage; errors raised in it are counted as failures of the stage"""
+    return _timed(STAGE_SECONDS.labels(stage), stage)
+
+
+def extraction_timer(file_type):
+    return _timed(EXTRACTION_SECONDS.labels(file_type), 'extract')
+
+
+def scorer_timer(scorer):
+    return _timed(SCORER_SECONDS.labels(scorer), 'score')
+
+
+def observe_document(file_type, size, page_count=None):
+    DOCUMENT_BYTES.labels(file_type).observe(size)
+    if page_count:
+        DOCUMENT_PAGES.labels(file_type).observe(page_count)
+
+
+def observe_retention(result):
+    RETENTION_SECONDS.observe(result['duration_ms'] / 1000)
+    RETENTION_DELETED.labels('records').inc(result['records_deleted'])
+    RETENTION_DELETED.labels('files').inc(result['files_deleted'])
+
+
+def render_metrics():
+    """(body, content type) of the Prometheus text exposition for all processes"""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.5 on 2026-10-18 01:23
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resumes', '0002_analysis_job_lease'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resumeanalysis',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=64),
+        ),
+        migrations.CreateModel(
+            name='AnalysisCacheEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file_hash', models.CharField(max_length=64)),
+                ('job_hash', models.CharField(max_length=64)),
+                ('raw_text', models.TextField(blank=True, default='')),
+                ('analysis_results', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ('hit_count', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Analysis Cache Entry',
+                'verbose_name_plural': 'Analysis Cache Entries',
+                'constraints': [models.UniqueConstraint(fields=('file_hash', 'job_hash'), name='unique_analysis_cache_key')],
+            },
+        ),
+    ]
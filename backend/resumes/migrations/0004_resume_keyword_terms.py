@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-18 01:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resumes', '0003_analysis_cache'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resumeanalysis',
+            name='keyword_terms',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
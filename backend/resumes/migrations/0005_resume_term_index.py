@@ -0,0 +1,33 @@
+# Generated by Django 5.2.5 on 2026-10-18 01:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resumes', '0004_resume_keyword_terms'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CorpusTerm',
+            fields=[
+                ('term', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('doc_freq', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ResumeTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64)),
+                ('weight', models.FloatField()),
+                ('resume', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='terms', to='resumes.resumeanalysis')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('term', 'resume'), name='unique_resume_term')],
+            },
+        ),
+    ]
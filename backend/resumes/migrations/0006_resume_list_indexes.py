@@ -0,0 +1,21 @@
+# Generated by Django 5.2.5 on 2026-10-18 01:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resumes', '0005_resume_term_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='resumeanalysis',
+            index=models.Index(fields=['-upload_timestamp', '-id'], name='resume_list_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='resumeanalysis',
+            index=models.Index(fields=['processing_status', '-upload_timestamp', '-id'], name='resume_list_status_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.5 on 2026-10-18 01:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resumes', '0006_resume_list_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MaintenanceLock',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('owner', models.CharField(blank=True, default='', max_length=100)),
+                ('expires_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.5 on 2026-10-18 01:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resumes', '0008_content_addressed_storage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PageTextCacheEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file_hash', models.CharField(max_length=64)),
+                ('page_index', models.IntegerField()),
+                ('text', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('file_hash', 'page_index'), name='unique_page_text_key')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-18 02:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resumes', '0009_page_text_cache'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resumeanalysis',
+            name='progress',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-18 02:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resumes', '0010_resume_progress'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resumeanalysis',
+            name='response_blob',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='resumeanalysis',
+            name='response_blob_encoding',
+            field=models.CharField(blank=True, default='', max_length=10),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.5 on 2026-10-18 02:26
+
+import django.db.models.deletion
+import resumes.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resumes', '0011_resume_response_blob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumeContent',
+            fields=[
+                ('resume', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='content', serialize=False, to='resumes.resumeanalysis')),
+                ('raw_text', resumes.fields.CompressedTextField(blank=True, null=True)),
+                ('analysis_results', resumes.fields.AnalysisResultsField(blank=True, default=dict)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='StoredJobDescription',
+            fields=[
+                ('hash', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('text', resumes.fields.CompressedTextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='resumeanalysis',
+            name='stored_job_description',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='resumes', to='resumes.storedjobdescription'),
+        ),
+    ]
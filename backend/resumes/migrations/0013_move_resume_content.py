@@ -0,0 +1,89 @@
+# Generated by Django 5.2.5 on 2026-10-18 02:26
+
+import hashlib
+
+from django.db import migrations
+
+BATCH_SIZE = 500
+
+
+def move_content(apps, schema_editor):
+    """Copy text and results into ResumeContent and deduplicate job descriptions"""
+    db = schema_editor.connection.alias
+    ResumeAnalysis = apps.get_model('resumes', 'ResumeAnalysis')
+    ResumeContent = apps.get_model('resumes', 'ResumeContent')
+    StoredJobDescription = apps.get_model('resumes', 'StoredJobDescription')
+
+    rows = (
+        ResumeAnalysis.objects.using(db).order_by('id')
+        .values_list('id', 'raw_text', 'analysis_results', 'job_description')
+    )
+    last_id = 0
+    while True:
+        batch = list(rows.filter(id__gt=last_id)[:BATCH_SIZE])
+        if not batch:
+            break
+
+        ResumeContent.objects.using(db).bulk_create([
+            ResumeContent(resume_id=resume_id, raw_text=raw_text, analysis_results=analysis_results or {})
+            for resume_id, raw_text, analysis_results, _ in batch
+        ])
+
+        texts = {}
+        resume_ids = {}
+        for resume_id, _, _, job_description in batch:
+            if job_description is None:
+                continue
+            digest = hashlib.sha256(job_description.encode('utf-8')).hexdigest()
+            texts[digest] = job_description
+            resume_ids.setdefault(digest, []).append(resume_id)
+        StoredJobDescription.objects.using(db).bulk_create(
+            [StoredJobDescription(hash=digest, text=text) for digest, text in texts.items()],
+            ignore_conflicts=True,
+        )
+        for digest, ids in resume_ids.items():
+            ResumeAnalysis.objects.using(db).filter(id__in=ids).update(stored_job_description_id=digest)
+
+        last_id = batch[-1][0]
+
+
+def restore_content(apps, schema_editor):
+    """Copy text, results and job descriptions back onto the resume rows"""
+    db = schema_editor.connection.alias
+    ResumeAnalysis = apps.get_model('resumes', 'ResumeAnalysis')
+
+    rows = (
+        ResumeAnalysis.objects.using(db).order_by('id')
+        .values_list('id', 'content__raw_text', 'content__analysis_results', 'stored_job_description__text')
+    )
+    last_id = 0
+    while True:
+        batch = list(rows.filter(id__gt=last_id)[:BATCH_SIZE])
+        if not batch:
+            break
+        ResumeAnalysis.objects.using(db).bulk_update([
+            ResumeAnalysis(
+                id=resume_id, raw_text=raw_text, analysis_results=analysis_results or {},
+                job_description=job_description
+            )
+            for resume_id, raw_text, analysis_results, job_description in batch
+        ], ['raw_text', 'analysis_results', 'job_description'])
+        last_id = batch[-1][0]
+
+
+def clear_analysis_cache(apps, schema_editor):
+    """Cached analyses are dropped rather than converted; they are filled again by uploads"""
+    AnalysisCacheEntry = apps.get_model('resumes', 'AnalysisCacheEntry')
+    AnalysisCacheEntry.objects.using(schema_editor.connection.alias).all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resumes', '0012_resume_content'),
+    ]
+
+    operations = [
+        migrations.RunPython(move_content, restore_content),
+        migrations.RunPython(clear_analysis_cache, clear_analysis_cache),
+    ]
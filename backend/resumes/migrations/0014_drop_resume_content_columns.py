@@ -0,0 +1,46 @@
+# Generated by Django 5.2.5 on 2026-10-18 02:26
+
+import resumes.fields
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resumes', '0013_move_resume_content'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='resumeanalysis',
+            name='analysis_results',
+        ),
+        migrations.RemoveField(
+            model_name='resumeanalysis',
+            name='job_description',
+        ),
+        migrations.RemoveField(
+            model_name='resumeanalysis',
+            name='raw_text',
+        ),
+        # Replaced rather than altered: text and jsonb columns have no cast to
+        # the compressed bytes (the table was emptied in 0013)
+        migrations.RemoveField(
+            model_name='analysiscacheentry',
+            name='analysis_results',
+        ),
+        migrations.RemoveField(
+            model_name='analysiscacheentry',
+            name='raw_text',
+        ),
+        migrations.AddField(
+            model_name='analysiscacheentry',
+            name='analysis_results',
+            field=resumes.fields.AnalysisResultsField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='analysiscacheentry',
+            name='raw_text',
+            field=resumes.fields.CompressedTextField(blank=True, default=''),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-18 02:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resumes', '0014_drop_resume_content_columns'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='analysiscacheentry',
+            name='analyzer_version',
+            field=models.CharField(blank=True, default='', max_length=32),
+        ),
+        migrations.AddField(
+            model_name='resumeanalysis',
+            name='analyzer_version',
+            field=models.CharField(blank=True, default='', max_length=32),
+        ),
+    ]
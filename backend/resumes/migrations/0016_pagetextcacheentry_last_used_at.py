@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-10-18 09:12
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resumes', '0015_analyzer_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pagetextcacheentry',
+            name='last_used_at',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-10-18 09:40
+
+import resumes.fields
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resumes', '0016_pagetextcacheentry_last_used_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resumecontent',
+            name='keyword_terms',
+            field=resumes.fields.CompressedJSONField(blank=True, default=list),
+        ),
+    ]
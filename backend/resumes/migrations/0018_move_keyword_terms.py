@@ -0,0 +1,67 @@
+# Generated by Django 5.2.5 on 2026-10-18 09:40
+
+from django.db import migrations
+
+BATCH_SIZE = 500
+
+
+def move_keyword_terms(apps, schema_editor):
+    """Copy keyword terms into ResumeContent and drop response blobs that embed the text
+
+    Dropped blobs are rendered again, without the text, the first time their
+    analysis is fetched.
+    """
+    db = schema_editor.connection.alias
+    ResumeAnalysis = apps.get_model('resumes', 'ResumeAnalysis')
+    ResumeContent = apps.get_model('resumes', 'ResumeContent')
+
+    rows = ResumeAnalysis.objects.using(db).order_by('id').values_list('id', 'keyword_terms')
+    last_id = 0
+    while True:
+        batch = list(rows.filter(id__gt=last_id)[:BATCH_SIZE])
+        if not batch:
+            break
+        ResumeContent.objects.using(db).bulk_update([
+            ResumeContent(resume_id=resume_id, keyword_terms=terms or [])
+            for resume_id, terms in batch
+        ], ['keyword_terms'])
+        ResumeAnalysis.objects.using(db).filter(id__gt=last_id, id__lte=batch[-1][0]).update(
+            response_blob=None, response_blob_encoding=''
+        )
+        last_id = batch[-1][0]
+
+
+def restore_keyword_terms(apps, schema_editor):
+    """Copy keyword terms back onto the resume rows"""
+    db = schema_editor.connection.alias
+    ResumeAnalysis = apps.get_model('resumes', 'ResumeAnalysis')
+
+    rows = ResumeAnalysis.objects.using(db).order_by('id').values_list('id', 'content__keyword_terms')
+    last_id = 0
+    while True:
+        batch = list(rows.filter(id__gt=last_id)[:BATCH_SIZE])
+        if not batch:
+            break
+        ResumeAnalysis.objects.using(db).bulk_update([
+            ResumeAnalysis(id=resume_id, keyword_terms=terms or [], response_blob=None, response_blob_encoding='')
+            for resume_id, terms in batch
+        ], ['keyword_terms', 'response_blob', 'response_blob_encoding'])
+        last_id = batch[-1][0]
+
+
+def clear_page_text_cache(apps, schema_editor):
+    """Cached page texts are dropped rather than compressed; they are filled again by uploads"""
+    PageTextCacheEntry = apps.get_model('resumes', 'PageTextCacheEntry')
+    PageTextCacheEntry.objects.using(schema_editor.connection.alias).all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resumes', '0017_resume_content_terms'),
+    ]
+
+    operations = [
+        migrations.RunPython(move_keyword_terms, restore_keyword_terms),
+        migrations.RunPython(clear_page_text_cache, clear_page_text_cache),
+    ]
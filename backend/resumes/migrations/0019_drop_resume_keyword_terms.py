@@ -0,0 +1,29 @@
+# Generated by Django 5.2.5 on 2026-10-18 09:40
+
+import resumes.fields
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resumes', '0018_move_keyword_terms'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='resumeanalysis',
+            name='keyword_terms',
+        ),
+        # Replaced rather than altered: a text column has no cast to the
+        # compressed bytes (the table was emptied in 0018)
+        migrations.RemoveField(
+            model_name='pagetextcacheentry',
+            name='text',
+        ),
+        migrations.AddField(
+            model_name='pagetextcacheentry',
+            name='text',
+            field=resumes.fields.CompressedTextField(blank=True, default=''),
+        ),
+    ]
@@ -1,12 +1,24 @@
-from django.db import models
+import hashlib
+
+from django.db import models, transaction
 from django.core.validators import FileExtensionValidator
+from django.utils import timezone
+
+from .analyzer import analyzer_version
+from .features import keyword_terms
+from .fields import AnalysisResultsField, CompressedJSONField, CompressedTextField
+from .storage import get_resume_storage
 import json
 
+# Marks a job description text that has not been assigned on this instance
+_UNSET = object()
+
 class ResumeAnalysis(models.Model):
     # File information
     filename = models.CharField(max_length=255)
     file = models.FileField(
         upload_to='resumes/',
+        storage=get_resume_storage,
         validators=[FileExtensionValidator(allowed_extensions=['pdf', 'docx', 'doc', 'txt'])]
     )
 
@@ -14,19 +26,22 @@ class ResumeAnalysis(models.Model):
     upload_timestamp = models.DateTimeField(auto_now_add=True)
     analysis_timestamp = models.DateTimeField(auto_now=True)
 
-    # Extracted content
-    raw_text = models.TextField(blank=True, null=True)
-
-    # Analysis results
+    # Extracted text, its keyword terms and analysis results live in
+    # ResumeContent (the raw_text, keyword_terms and analysis_results
+    # properties), job descriptions in StoredJobDescription
     ats_score = models.FloatField(blank=True, null=True)
-    analysis_results = models.JSONField(default=dict, blank=True)
 
     # Job matching
-    job_description = models.TextField(blank=True, null=True)
+    stored_job_description = models.ForeignKey(
+        'StoredJobDescription', on_delete=models.PROTECT, blank=True, null=True, related_name='resumes'
+    )
     job_match_score = models.FloatField(blank=True, null=True)
+    # Analyzer that produced the scores (see analyzer.analyzer_version)
+    analyzer_version = models.CharField(max_length=32, blank=True, default='')
 
     # Additional metadata
     file_size = models.IntegerField(blank=True, null=True)
+    content_hash = models.CharField(max_length=64, blank=True, default='', db_index=True)
     processing_status = models.CharField(
         max_length=20,
         choices=[
@@ -38,14 +53,101 @@ class ResumeAnalysis(models.Model):
         default='pending'
     )
 
+    # Client-facing analysis response without the extracted text, encoded once
+    # when the analysis finished ('gzip' encoding when compressed; see
+    # resumes/response_blobs.py)
+    response_blob = models.BinaryField(blank=True, null=True)
+    response_blob_encoding = models.CharField(max_length=10, blank=True, default='')
+
+    # Latest progress event of the analysis (see resumes/progress.py)
+    progress = models.JSONField(default=dict, blank=True)
+
+    # Background job lease (async analysis mode)
+    lease_owner = models.CharField(max_length=100, blank=True, default='')
+    lease_expires_at = models.DateTimeField(blank=True, null=True)
+    attempts = models.IntegerField(default=0)
+
     class Meta:
         ordering = ['-upload_timestamp']
+        indexes = [
+            models.Index(fields=['processing_status', 'lease_expires_at'], name='resume_job_claim_idx'),
+            # Keyset pagination of /api/my-resumes/, with and without a status filter
+            models.Index(fields=['-upload_timestamp', '-id'], name='resume_list_idx'),
+            models.Index(fields=['processing_status', '-upload_timestamp', '-id'], name='resume_list_status_idx'),
+        ]
         verbose_name = 'Resume Analysis'
         verbose_name_plural = 'Resume Analyses'
 
     def __str__(self):
         return f"{self.filename} - {self.upload_timestamp}"
 
+    def save(self, *args, **kwargs):
+        with transaction.atomic(using=kwargs.get('using')):
+            store_job_descriptions([self])
+            adding = self._state.adding
+            super().save(*args, **kwargs)
+            if adding and not ResumeAnalysis.content.is_cached(self):
+                # New rows always get a content row, so reading it never queries
+                self.content = ResumeContent(resume=self)
+            store_contents([self])
+
+    @property
+    def stored_content(self):
+        """The ResumeContent of this record, loaded once (a new one if there is none yet)"""
+        try:
+            return self.content
+        except ResumeContent.DoesNotExist:
+            self.content = ResumeContent(resume=self)
+            return self.content
+
+    @property
+    def raw_text(self):
+        return self.stored_content.raw_text
+
+    @raw_text.setter
+    def raw_text(self, value):
+        self.stored_content.raw_text = value
+
+    @property
+    def keyword_terms(self):
+        return self.stored_content.keyword_terms
+
+    @keyword_terms.setter
+    def keyword_terms(self, value):
+        self.stored_content.keyword_terms = value
+
+    @property
+    def analysis_results(self):
+        return self.stored_content.analysis_results
+
+    @analysis_results.setter
+    def analysis_results(self, value):
+        self.stored_content.analysis_results = value
+
+    @property
+    def job_description(self):
+        text = self.__dict__.get('_job_description_text', _UNSET)
+        if text is not _UNSET:
+            return text
+        if self.stored_job_description_id is None:
+            return None
+        return self.stored_job_description.text
+
+    @job_description.setter
+    def job_description(self, value):
+        # Resolved to its deduplicated row when the record is saved
+        self.__dict__['_job_description_text'] = value
+
+    def apply_analysis(self, raw_text, analysis_results):
+        """Store extracted text and completed analysis results on this record (not saved)"""
+        self.raw_text = raw_text
+        self.keyword_terms = keyword_terms(raw_text)
+        self.analysis_results = analysis_results
+        self.ats_score = analysis_results.get('ats_score', {}).get('overall_score', 0)
+        self.job_match_score = analysis_results.get('job_match_score', 0)
+        self.analyzer_version = analyzer_version()
+        self.processing_status = 'completed'
+
     @property
     def extracted_skills(self):
         """Get extracted skills from analysis results"""
@@ -60,3 +162,154 @@ class ResumeAnalysis(models.Model):
     def ats_breakdown(self):
         """Get ATS score breakdown"""
         return self.analysis_results.get('ats_score', {}).get('breakdown', {})
+
+
+class ResumeContent(models.Model):
+    """Extracted text and analysis results of a resume, stored compressed off the main table"""
+    resume = models.OneToOneField(ResumeAnalysis, on_delete=models.CASCADE, primary_key=True, related_name='content')
+    raw_text = CompressedTextField(blank=True, null=True)
+    # Unique lowercase resume words, so the resume can be re-scored against
+    # another job description without re-reading the file or raw_text
+    keyword_terms = CompressedJSONField(default=list, blank=True)
+    analysis_results = AnalysisResultsField(default=dict, blank=True)
+
+    def __str__(self):
+        return f"content of {self.resume_id}"
+
+
+class StoredJobDescription(models.Model):
+    """A job description text shared by every resume analyzed against it, keyed by its hash"""
+    hash = models.CharField(max_length=64, primary_key=True)
+    text = CompressedTextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.hash[:12]} ({len(self.text)} chars)"
+
+
+def hash_job_description_text(text):
+    """Exact (not normalized) hash of a job description"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def store_job_descriptions(resumes):
+    """Point resumes at the stored rows of job description texts assigned to them, creating missing rows"""
+    texts = {}
+    for resume in resumes:
+        text = resume.__dict__.pop('_job_description_text', _UNSET)
+        if text is _UNSET:
+            continue
+        if text is None:
+            resume.stored_job_description = None
+            continue
+        digest = hash_job_description_text(text)
+        texts[digest] = text
+        resume.stored_job_description = StoredJobDescription(hash=digest, text=text)
+
+    if texts:
+        known = set(StoredJobDescription.objects.filter(hash__in=list(texts)).values_list('hash', flat=True))
+        StoredJobDescription.objects.bulk_create(
+            [StoredJobDescription(hash=digest, text=text) for digest, text in texts.items() if digest not in known],
+            ignore_conflicts=True,
+        )
+
+
+def store_contents(resumes):
+    """Write the loaded content rows of saved resumes (one multi-row insert for new ones)"""
+    contents = [resume.content for resume in resumes if ResumeAnalysis.content.is_cached(resume)]
+    new = [content for content in contents if content._state.adding]
+    existing = [content for content in contents if not content._state.adding]
+    if new:
+        ResumeContent.objects.bulk_create(
+            new, update_conflicts=True, unique_fields=['resume'], update_fields=['raw_text', 'keyword_terms', 'analysis_results']
+        )
+    for content in existing:
+        content.save()
+
+
+class AnalysisCacheEntry(models.Model):
+    """Analysis results keyed by the uploaded file's content and the job description"""
+    file_hash = models.CharField(max_length=64)
+    job_hash = models.CharField(max_length=64)
+
+    raw_text = CompressedTextField(blank=True, default='')
+    analysis_results = AnalysisResultsField(default=dict, blank=True)
+    # Entries of other analyzer versions are not reused
+    analyzer_version = models.CharField(max_length=32, blank=True, default='')
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(default=timezone.now, db_index=True)
+    hit_count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['file_hash', 'job_hash'], name='unique_analysis_cache_key'),
+        ]
+        verbose_name = 'Analysis Cache Entry'
+        verbose_name_plural = 'Analysis Cache Entries'
+
+    def __str__(self):
+        return f"{self.file_hash[:12]}/{self.job_hash[:12]} ({self.hit_count} hits)"
+
+
+class PageTextCacheEntry(models.Model):
+    """Text extracted from one PDF page, keyed by the file's content hash"""
+    file_hash = models.CharField(max_length=64)
+    page_index = models.IntegerField()
+    text = CompressedTextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    last_used_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['file_hash', 'page_index'], name='unique_page_text_key'),
+        ]
+
+    def __str__(self):
+        return f"{self.file_hash[:12]} page {self.page_index}"
+
+
+class ResumeTerm(models.Model):
+    """Inverted index posting: a term of a stored resume with its normalized weight"""
+    resume = models.ForeignKey(ResumeAnalysis, on_delete=models.CASCADE, related_name='terms')
+    term = models.CharField(max_length=64)
+    weight = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['term', 'resume'], name='unique_resume_term'),
+        ]
+
+    def __str__(self):
+        return f"{self.term} -> {self.resume_id} ({self.weight:.3f})"
+
+
+class CorpusTerm(models.Model):
+    """Number of indexed resumes containing a term (for IDF weighting)"""
+    term = models.CharField(max_length=64, primary_key=True)
+    doc_freq = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.term} ({self.doc_freq})"
+
+
+class MaintenanceLock(models.Model):
+    """Named lease that lets one process at a time run a periodic maintenance task"""
+    name = models.CharField(max_length=50, primary_key=True)
+    owner = models.CharField(max_length=100, blank=True, default='')
+    expires_at = models.DateTimeField(blank=True, null=True)
+    # Where the task's last incremental pass stopped
+    cursor = models.CharField(max_length=255, blank=True, default='')
+
+    def __str__(self):
+        return f"{self.name} ({self.owner or 'free'})"
+
+
+class StoredFile(models.Model):
+    """A content-addressed upload and the number of analyses referencing it"""
+    name = models.CharField(max_length=255, primary_key=True)
+    ref_count = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.ref_count} refs)"
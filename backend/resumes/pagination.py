@@ -0,0 +1,102 @@
+"""
+Keyset (cursor) pagination for the resume listing.
+
+Pages are ordered newest first by (upload_timestamp, id). The cursor encodes
+the last row of the previous page, so the next page is a range scan on the
+composite index starting right after it. Page cost stays the same however
+deep the client pages, unlike OFFSET which re-reads every skipped row.
+"""
+import base64
+import binascii
+import json
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+from .serializers import ResumeListSerializer
+
+LIST_ORDERING = ('-upload_timestamp', '-id')
+
+
+class InvalidListQuery(ValueError):
+    pass
+
+
+class InvalidCursor(InvalidListQuery):
+    pass
+
+
+def encode_cursor(resume):
+    payload = json.dumps({'t': resume.upload_timestamp.isoformat(), 'id': resume.pk})
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """Return the (upload_timestamp, id) position stored in a cursor"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        timestamp = parse_datetime(payload['t'])
+        resume_id = int(payload['id'])
+    except (binascii.Error, UnicodeError, ValueError, KeyError, TypeError):
+        raise InvalidCursor('Invalid cursor')
+    if timestamp is None:
+        raise InvalidCursor('Invalid cursor')
+    return timestamp, resume_id
+
+
+def filter_resumes(params, queryset):
+    """Apply the listing's status and score filters; returns (queryset, page size)"""
+    try:
+        limit = int(params.get('limit', settings.RESUME_LIST_PAGE_SIZE))
+        min_score = params.get('min_score')
+        max_score = params.get('max_score')
+        if min_score not in (None, ''):
+            queryset = queryset.filter(ats_score__gte=float(min_score))
+        if max_score not in (None, ''):
+            queryset = queryset.filter(ats_score__lte=float(max_score))
+    except ValueError:
+        raise InvalidListQuery('limit, min_score and max_score must be numbers')
+    if not 1 <= limit <= settings.RESUME_LIST_MAX_PAGE_SIZE:
+        raise InvalidListQuery(f'limit must be between 1 and {settings.RESUME_LIST_MAX_PAGE_SIZE}')
+
+    processing_status = params.get('status')
+    if processing_status:
+        valid_statuses = [choice for choice, _ in queryset.model._meta.get_field('processing_status').choices]
+        if processing_status not in valid_statuses:
+            raise InvalidListQuery(f'status must be one of {valid_statuses}')
+        queryset = queryset.filter(processing_status=processing_status)
+
+    return queryset, limit
+
+
+def page_queryset(queryset, cursor=None, limit=20):
+    """The rows of the page after the cursor, plus one to tell whether more follow"""
+    queryset = queryset.only(*ResumeListSerializer.Meta.fields).order_by(*LIST_ORDERING)
+
+    if cursor:
+        timestamp, resume_id = decode_cursor(cursor)
+        queryset = queryset.filter(
+            Q(upload_timestamp__lt=timestamp) |
+            Q(upload_timestamp=timestamp, id__lt=resume_id)
+        )
+
+    return queryset[:limit + 1]
+
+
+def build_page(rows, limit):
+    """Serialize fetched rows as one page, with the cursor of the next page"""
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    return {
+        'resumes': ResumeListSerializer(rows, many=True).data,
+        'count': len(rows),
+        'has_more': has_more,
+        'next_cursor': encode_cursor(rows[-1]) if has_more else None,
+    }
+
+
+def paginate_resumes(queryset, cursor=None, limit=20):
+    """One page of list rows after the cursor, plus the cursor of the next page"""
+    return build_page(list(page_queryset(queryset, cursor, limit)), limit)
@@ -0,0 +1,58 @@
+"""
+Page-by-page PDF text extraction.
+
+iter_pdf_pages yields page texts lazily, so a caller that has enough text
+(see EXTRACTION_MAX_PAGES and EXTRACTION_MAX_CHARS) simply stops iterating
+and the remaining pages are never parsed. Text already extracted for a page
+can be passed in and is reused instead of re-parsing the page. Pages without
+a text layer (scans: no fonts, only image XObjects) are detected from their
+resource dictionary and skipped without running the content stream parser.
+"""
+import PyPDF2
+
+FONT = '/Font'
+XOBJECT = '/XObject'
+RESOURCES = '/Resources'
+
+
+def _resolve(value):
+    return value.get_object() if hasattr(value, 'get_object') else value
+
+
+def has_text_layer(page):
+    """False for pages that cannot contain extractable text (no fonts, no form XObjects)"""
+    resources = _resolve(page[RESOURCES]) if RESOURCES in page else None
+    if not resources:
+        return False
+    if FONT in resources:
+        return True
+    if XOBJECT not in resources:
+        return False
+    xobjects = _resolve(resources[XOBJECT])
+    # Form XObjects carry their own resources and may hold text
+    return any(_resolve(xobjects[name]).get('/Subtype') == '/Form' for name in xobjects)
+
+
+def open_pdf(source):
+    """PdfReader over a path or binary file object (pages are parsed on demand)"""
+    return PyPDF2.PdfReader(source)
+
+
+def iter_pdf_pages(reader, max_pages=None, cached_pages=None):
+    """
+    Yield (index, text, fresh) for each page in order, up to max_pages.
+
+    `cached_pages` maps page index to previously extracted text; those pages
+    are yielded with fresh=False and not parsed. Image-only pages yield ''.
+    """
+    cached_pages = cached_pages or {}
+    total_pages = len(reader.pages)
+    limit = min(total_pages, max_pages) if max_pages else total_pages
+
+    for index in range(limit):
+        if index in cached_pages:
+            yield index, cached_pages[index], False
+            continue
+        page = reader.pages[index]
+        text = (page.extract_text() or '') if has_text_layer(page) else ''
+        yield index, text, True
@@ -0,0 +1,258 @@
+"""
+Opt-in profiling of the upload pipeline.
+
+`profiled` wraps a view (sync or async) in cProfile and tracemalloc. A
+request is profiled when one of these triggers fires:
+
+- sampling: a PROFILING_SAMPLE_RATE share of requests (0 by default)
+- header: `X-Profile: <PROFILING_HEADER_TOKEN>` (off unless a token is set)
+- admin flag: `?profile=1` from a logged-in staff user
+
+Each profile is written to PROFILING_DIR as three files sharing one name:
+`.pstats` (cProfile stats), `.alloc.txt` (top allocation sites during the
+request) and `.json` (tags: resume id, file type and size, request id,
+duration, peak memory, allocations). `manage.py profile_report` aggregates
+them into hot-function and allocation reports.
+
+Extraction normally runs in the worker process pool, out of the profiler's
+sight, so profiled requests extract inline. Async views also run analysis
+in an executor thread; `profile_call` gives that thread its own profiler,
+merged into the request's stats. One request per process is profiled at a
+time (tracemalloc is process-wide); others run unprofiled meanwhile.
+
+Under ASGI the profiler of an async view runs on the event loop, which
+every concurrent request shares, so it records their coroutines as well
+(tracemalloc always does). Such profiles are tagged with scope 'process'
+rather than 'request'; `profile_report --scope request` leaves them out.
+"""
+import cProfile
+import functools
+import json
+import logging
+import os
+import pstats
+import random
+import threading
+import time
+import tracemalloc
+from contextvars import ContextVar
+from datetime import datetime, timezone
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+
+from .request_logging import request_id_var
+
+PROFILE_HEADER = 'X-Profile'
+
+logger = logging.getLogger(__name__)
+
+_session_var = ContextVar('profile_session', default=None)
+_profiling_lock = threading.Lock()
+
+# Allocation sites inside the profiler itself are noise
+ALLOCATION_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, cProfile.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+)
+
+
+class ProfileSession:
+    """cProfile and tracemalloc state for one profiled request"""
+
+    def __init__(self, trigger, scope='request'):
+        self.trigger = trigger
+        # 'process' when other requests may have run under the same profiler
+        self.scope = scope
+        self.profilers = []
+        self.started_tracing = False
+        self.baseline = None
+        self.started = None
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(settings.PROFILING_TRACEMALLOC_FRAMES)
+            self.started_tracing = True
+        tracemalloc.reset_peak()
+        self.baseline = tracemalloc.take_snapshot()
+        self.started = time.perf_counter()
+
+    def stop(self):
+        self.duration_ms = round((time.perf_counter() - self.started) * 1000, 1)
+        self.peak_memory = tracemalloc.get_traced_memory()[1]
+        snapshot = tracemalloc.take_snapshot().filter_traces(ALLOCATION_FILTERS)
+        self.allocations = snapshot.compare_to(
+            self.baseline.filter_traces(ALLOCATION_FILTERS), 'lineno'
+        )[:settings.PROFILING_TOP_ALLOCATIONS]
+        if self.started_tracing:
+            tracemalloc.stop()
+
+    def run(self, func, *args, **kwargs):
+        """Call func under a new profiler of this session (in the current thread)"""
+        profiler = cProfile.Profile()
+        self.profilers.append(profiler)
+        return profiler.runcall(func, *args, **kwargs)
+
+    def stats(self):
+        stats = pstats.Stats(self.profilers[0])
+        for profiler in self.profilers[1:]:
+            stats.add(profiler)
+        return stats
+
+
+def is_profiling():
+    """True inside a profiled request (extraction then runs inline)"""
+    return _session_var.get() is not None
+
+
+def profile_call(func, *args, **kwargs):
+    """Run func in the current thread, profiled if the request is being profiled"""
+    session = _session_var.get()
+    if session is None:
+        return func(*args, **kwargs)
+    return session.run(func, *args, **kwargs)
+
+
+def _trigger(request, is_staff):
+    token = settings.PROFILING_HEADER_TOKEN
+    if token and request.headers.get(PROFILE_HEADER) == token:
+        return 'header'
+    if request.GET.get('profile') == '1' and is_staff():
+        return 'admin'
+    if settings.PROFILING_SAMPLE_RATE and random.random() < settings.PROFILING_SAMPLE_RATE:
+        return 'sample'
+    return None
+
+
+def _resume_id(response):
+    data = getattr(response, 'data', None)
+    if data is None:
+        try:
+            data = json.loads(response.content)
+        except (ValueError, AttributeError):
+            return None
+    return data.get('id') if isinstance(data, dict) else None
+
+
+def write_profile(session, request, response):
+    """Write the .pstats, .alloc.txt and .json files of a finished session"""
+    from .models import ResumeAnalysis
+
+    resume_id = _resume_id(response)
+    resume = (
+        ResumeAnalysis.objects.filter(pk=resume_id).values('filename', 'file_size').first()
+        if resume_id else None
+    ) or {'filename': '', 'file_size': None}
+    file_type = os.path.splitext(resume['filename'])[1].lstrip('.').lower() or 'unknown'
+    request_id = request_id_var.get()
+
+    created_at = datetime.now(timezone.utc)
+    name = f"{created_at:%Y%m%d-%H%M%S}-r{resume_id or 0}-{file_type}-{request_id[:12]}"
+    directory = settings.PROFILING_DIR
+    os.makedirs(directory, exist_ok=True)
+    base = os.path.join(directory, name)
+
+    session.stats().dump_stats(base + '.pstats')
+
+    allocations = [
+        {'location': str(stat.traceback[0]), 'size_bytes': stat.size_diff, 'count': stat.count_diff}
+        for stat in session.allocations
+    ]
+    tags = {
+        'resume_id': resume_id,
+        'file_type': file_type,
+        'file_size': resume['file_size'],
+        'request_id': request_id,
+        'trigger': session.trigger,
+        'scope': session.scope,
+        'path': request.path,
+        'status_code': response.status_code,
+        'duration_ms': session.duration_ms,
+        'peak_memory_bytes': session.peak_memory,
+        'created_at': created_at.isoformat(),
+        'allocations': allocations,
+    }
+    with open(base + '.json', 'w') as f:
+        json.dump(tags, f, indent=2)
+
+    with open(base + '.alloc.txt', 'w') as f:
+        f.write(f"resume {resume_id} {file_type} {resume['file_size']} bytes, "
+                f"{session.duration_ms} ms, peak {session.peak_memory} bytes traced\n")
+        if session.scope == 'process':
+            f.write("process-wide: includes every request served concurrently\n")
+        for stat in session.allocations:
+            f.write(f"{stat}\n")
+
+    logger.info('profile written', extra={'profile': base, 'resume_id': resume_id, 'trigger': session.trigger})
+    return base
+
+
+def _begin(trigger, scope='request'):
+    """Start a session, unless nothing triggered or another request is being profiled"""
+    if trigger is None or not _profiling_lock.acquire(blocking=False):
+        return None
+    session = ProfileSession(trigger, scope)
+    try:
+        session.start()
+    except Exception:
+        _profiling_lock.release()
+        raise
+    return session
+
+
+def _end(session):
+    try:
+        session.stop()
+    finally:
+        _profiling_lock.release()
+
+
+def _save(session, request, response):
+    try:
+        write_profile(session, request, response)
+    except Exception:
+        logger.exception('failed to write profile')
+
+
+def profiled(view):
+    """Profile sampled or explicitly requested calls of a view"""
+    if iscoroutinefunction(view):
+        @functools.wraps(view)
+        async def async_wrapper(request, *args, **kwargs):
+            # request.user would query the session synchronously
+            is_staff = request.GET.get('profile') == '1' and (await request.auser()).is_staff
+            # The event loop is shared, so concurrent requests are profiled too
+            session = _begin(_trigger(request, lambda: is_staff), scope='process')
+            if session is None:
+                return await view(request, *args, **kwargs)
+
+            token = _session_var.set(session)
+            profiler = cProfile.Profile()
+            session.profilers.append(profiler)
+            profiler.enable()
+            try:
+                response = await view(request, *args, **kwargs)
+            finally:
+                profiler.disable()
+                _session_var.reset(token)
+                _end(session)
+            await sync_to_async(_save)(session, request, response)
+            return response
+        return async_wrapper
+
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        session = _begin(_trigger(request, lambda: request.user.is_staff))
+        if session is None:
+            return view(request, *args, **kwargs)
+
+        token = _session_var.set(session)
+        try:
+            response = session.run(view, request, *args, **kwargs)
+        finally:
+            _session_var.reset(token)
+            _end(session)
+        _save(session, request, response)
+        return response
+    return wrapper
@@ -0,0 +1,266 @@
+"""
+Per-analysis progress events, streamed to clients as server-sent events.
+
+The pipeline publishes an event as an analysis moves through its stages:
+
+    queued      waiting for run_analysis_worker (async uploads)
+    received    analysis started
+    extracting  text extraction; PDFs report `page` of `pages`
+    scoring     text extracted, scoring against the job description
+    completed   results saved (with `ats_score`)
+    failed      analysis failed, row saved (with `error`)
+
+Each event carries a `seq` that increases per analysis and is sent as the
+SSE event id, so a reconnecting EventSource resumes after the last event it
+saw. Streams served by the process running the analysis are woken directly
+through a small in-process channel per analysis id. The latest event is also
+written to ResumeAnalysis.progress (at most every
+PROGRESS_PERSIST_INTERVAL_SECONDS, the final event always, together with the
+results), so a stream on another server process, or one following
+run_analysis_worker, polls that single column instead of re-reading the row.
+A stream always sends the newest event, so a slow client may skip
+intermediate page events.
+
+A sync stream occupies a whole worker of the default (sync) gunicorn
+server, so it ends after PROGRESS_SYNC_STREAM_MAX_SECONDS, well within the
+worker timeout, and the client reconnects with Last-Event-ID. Deployments
+where clients follow progress should serve it from threaded or gevent
+workers, or from the async views, whose streams last
+PROGRESS_STREAM_MAX_SECONDS.
+"""
+import asyncio
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .models import ResumeAnalysis
+
+TERMINAL_STAGES = ('completed', 'failed')
+# Stage reported for rows that have no recorded progress yet
+STATUS_STAGES = {'pending': 'queued', 'processing': 'received', 'completed': 'completed', 'failed': 'failed'}
+# Reconnection delay suggested to EventSource clients
+RETRY_MILLISECONDS = 2000
+
+
+class _ThreadWaiter:
+    def __init__(self):
+        self._event = threading.Event()
+
+    def wake(self):
+        self._event.set()
+
+    def wait(self, timeout):
+        return self._event.wait(timeout)
+
+
+class _AsyncWaiter:
+    def __init__(self):
+        self._loop = asyncio.get_running_loop()
+        self._future = self._loop.create_future()
+
+    def wake(self):
+        # Events are published from request and executor threads
+        self._loop.call_soon_threadsafe(self._resolve)
+
+    def _resolve(self):
+        if not self._future.done():
+            self._future.set_result(True)
+
+    async def wait(self, timeout):
+        try:
+            return await asyncio.wait_for(self._future, timeout)
+        except asyncio.TimeoutError:
+            return False
+
+
+class _Channel:
+    def __init__(self):
+        self.latest = None
+        self.persisted_at = 0.0
+        self.waiters = set()
+
+
+_channels = OrderedDict()
+_channels_lock = threading.Lock()
+
+
+def _get_channel(resume_id):
+    """Channel of an analysis id (call with the lock held); the least recently used are dropped"""
+    channel = _channels.get(resume_id)
+    if channel is None:
+        channel = _channels[resume_id] = _Channel()
+        while len(_channels) > settings.PROGRESS_MAX_CHANNELS:
+            # Waiters of a dropped channel fall back to polling the database
+            _channels.popitem(last=False)
+    else:
+        _channels.move_to_end(resume_id)
+    return channel
+
+
+def _event(seq, stage, detail):
+    return {'seq': seq, 'stage': stage, **detail, 'at': round(time.time(), 3)}
+
+
+def initial_progress(stage):
+    """First event of a new analysis, stored with the row when it is created"""
+    return _event(1, stage, {})
+
+
+def progress_event(resume_analysis, stage, **detail):
+    """Record the next progress event on a resume record (not saved, nobody notified)"""
+    previous = resume_analysis.progress or {}
+    event = _event(previous.get('seq', 0) + 1, stage, detail)
+    resume_analysis.progress = event
+    return event
+
+
+def notify_progress(resume_id, event, stored=False):
+    """Wake the streams of this process that follow an analysis; `stored` if the event was just saved"""
+    with _channels_lock:
+        channel = _get_channel(resume_id)
+        channel.latest = event
+        if stored:
+            channel.persisted_at = time.monotonic()
+        waiters, channel.waiters = channel.waiters, set()
+    for waiter in waiters:
+        waiter.wake()
+    return channel
+
+
+def publish_progress(resume_analysis, stage, **detail):
+    """Record, announce and (throttled) store the next progress event of an analysis"""
+    event = progress_event(resume_analysis, stage, **detail)
+    channel = notify_progress(resume_analysis.pk, event)
+
+    now = time.monotonic()
+    if stage in TERMINAL_STAGES or now - channel.persisted_at >= settings.PROGRESS_PERSIST_INTERVAL_SECONDS:
+        channel.persisted_at = now
+        ResumeAnalysis.objects.filter(pk=resume_analysis.pk).update(progress=event)
+    return event
+
+
+def final_progress_event(resume_analysis):
+    """Terminal event for an analysis about to be saved"""
+    if resume_analysis.processing_status == 'completed':
+        return progress_event(resume_analysis, 'completed', ats_score=resume_analysis.ats_score)
+    error = (resume_analysis.analysis_results or {}).get('error', '')
+    return progress_event(resume_analysis, 'failed', error=error)
+
+
+def stored_progress(resume_id):
+    """Latest event stored for an analysis; raises ResumeAnalysis.DoesNotExist"""
+    processing_status, progress = (
+        ResumeAnalysis.objects.values_list('processing_status', 'progress').get(pk=resume_id)
+    )
+    progress = progress or {}
+    stage = STATUS_STAGES.get(processing_status, processing_status)
+    if not progress or (stage in TERMINAL_STAGES and progress.get('stage') not in TERMINAL_STAGES):
+        # Rows analyzed before progress was recorded
+        return {'seq': progress.get('seq', 0) + 1, 'stage': stage}
+    return progress
+
+
+def current_progress(resume_id, after_seq):
+    """Newest event after `after_seq`, from this process if it has one, else from the database"""
+    with _channels_lock:
+        channel = _channels.get(resume_id)
+        latest = channel.latest if channel else None
+    if latest and latest['seq'] > after_seq:
+        return latest
+    stored = stored_progress(resume_id)
+    return stored if stored['seq'] > after_seq else None
+
+
+def _register(resume_id, after_seq, waiter):
+    with _channels_lock:
+        channel = _get_channel(resume_id)
+        if channel.latest and channel.latest['seq'] > after_seq:
+            return False
+        channel.waiters.add(waiter)
+        return True
+
+
+def _unregister(resume_id, waiter):
+    with _channels_lock:
+        channel = _channels.get(resume_id)
+        if channel:
+            channel.waiters.discard(waiter)
+
+
+def wait_for_progress(resume_id, after_seq, timeout):
+    """Block until this process publishes an event after `after_seq`, or until timeout"""
+    waiter = _ThreadWaiter()
+    if not _register(resume_id, after_seq, waiter):
+        return True
+    try:
+        return waiter.wait(timeout)
+    finally:
+        _unregister(resume_id, waiter)
+
+
+async def await_progress(resume_id, after_seq, timeout):
+    """Async version of wait_for_progress"""
+    waiter = _AsyncWaiter()
+    if not _register(resume_id, after_seq, waiter):
+        return True
+    try:
+        return await waiter.wait(timeout)
+    finally:
+        _unregister(resume_id, waiter)
+
+
+def parse_last_event_id(request):
+    """Sequence number the client already has (Last-Event-ID header or ?last_event_id=)"""
+    value = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id') or 0
+    try:
+        return max(0, int(value))
+    except (TypeError, ValueError):
+        return 0
+
+
+def format_event(event):
+    return f"id: {event['seq']}\ndata: {json.dumps(event)}\n\n"
+
+
+def event_stream(resume_id, after_seq):
+    """SSE body: progress events until the analysis finishes or the stream times out"""
+    yield f'retry: {RETRY_MILLISECONDS}\n\n'
+    started = last_sent = time.monotonic()
+    while True:
+        event = current_progress(resume_id, after_seq)
+        if event:
+            yield format_event(event)
+            after_seq, last_sent = event['seq'], time.monotonic()
+            if event['stage'] in TERMINAL_STAGES:
+                return
+            continue
+        if time.monotonic() - started >= settings.PROGRESS_SYNC_STREAM_MAX_SECONDS:
+            return
+        if time.monotonic() - last_sent >= settings.PROGRESS_KEEPALIVE_SECONDS:
+            yield ': keep-alive\n\n'
+            last_sent = time.monotonic()
+        wait_for_progress(resume_id, after_seq, settings.PROGRESS_POLL_SECONDS)
+
+
+async def aevent_stream(resume_id, after_seq):
+    """Async version of event_stream"""
+    yield f'retry: {RETRY_MILLISECONDS}\n\n'
+    started = last_sent = time.monotonic()
+    while True:
+        event = await sync_to_async(current_progress)(resume_id, after_seq)
+        if event:
+            yield format_event(event)
+            after_seq, last_sent = event['seq'], time.monotonic()
+            if event['stage'] in TERMINAL_STAGES:
+                return
+            continue
+        if time.monotonic() - started >= settings.PROGRESS_STREAM_MAX_SECONDS:
+            return
+        if time.monotonic() - last_sent >= settings.PROGRESS_KEEPALIVE_SECONDS:
+            yield ': keep-alive\n\n'
+            last_sent = time.monotonic()
+        await await_progress(resume_id, after_seq, settings.PROGRESS_POLL_SECONDS)
@@ -0,0 +1,93 @@
+"""
+Bulk re-scoring of stored analyses made by an older analyzer version.
+
+Every analysis records the analyzer version that scored it (see
+analyzer.analyzer_version). `manage.py reanalyze` walks the completed
+analyses of other versions in id order, a batch at a time, and re-scores
+them from their stored raw_text against their own job description in the
+scoring process pool; no file is read or extracted again. Each batch is
+written with one bulk_update of the resume rows and one of their content
+rows, in the same transaction as the checkpoint (the last id handled, kept
+on the 'reanalyze' MaintenanceLock row), so an interrupted run resumes after
+the last committed batch. The lease on the same row keeps a second run from
+starting concurrently, and the command throttles itself to
+REANALYZE_MAX_ROWS_PER_SECOND so live traffic keeps its share of CPU and
+database.
+
+bulk_update sends no signals, so the cached detail responses of each batch
+are invalidated here; the pre-rendered response blob and the final progress
+event are rebuilt along with the scores.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from .analyzer import analyzer_version
+from .batch import score_resume_pairs
+from .models import MaintenanceLock, ResumeAnalysis, ResumeContent
+from .progress import final_progress_event
+from .response_blobs import build_analysis_response, store_response_blob
+from .response_cache import invalidate_details
+
+REANALYZE_LOCK = 'reanalyze'
+
+UPDATE_FIELDS = [
+    'ats_score', 'job_match_score', 'analyzer_version', 'analysis_timestamp',
+    'progress', 'response_blob', 'response_blob_encoding',
+]
+
+
+def outdated_analyses(version=None):
+    """Completed analyses with stored text scored by another analyzer version"""
+    # Rows without stored text cannot be re-scored; they would stay outdated
+    # and be read again by every run
+    return ResumeAnalysis.objects.filter(
+        processing_status='completed', content__raw_text__isnull=False
+    ).exclude(
+        analyzer_version=version or analyzer_version()
+    )
+
+
+def load_checkpoint(version):
+    """Last id handled by an interrupted run of this analyzer version, or 0"""
+    cursor = MaintenanceLock.objects.filter(name=REANALYZE_LOCK).values_list('cursor', flat=True).first() or ''
+    checkpoint_version, _, last_id = cursor.rpartition(':')
+    return int(last_id) if checkpoint_version == version and last_id.isdigit() else 0
+
+
+def save_checkpoint(version, last_id):
+    """Store where the run stopped; a last_id of 0 clears the checkpoint"""
+    MaintenanceLock.objects.filter(name=REANALYZE_LOCK).update(cursor=f'{version}:{last_id}' if last_id else '')
+
+
+def reanalyze_rows(rows):
+    """Re-score rows from their stored text (not saved); rows without text are left out"""
+    rows = [row for row in rows if row.raw_text]
+    results = score_resume_pairs([row.raw_text for row in rows], [row.job_description for row in rows])
+    now = timezone.now()
+    for row, analysis_results in zip(rows, results):
+        # The text is not extracted again, so its extraction details still hold
+        analysis_results['extraction'] = (row.analysis_results or {}).get('extraction', {})
+        row.apply_analysis(row.raw_text, analysis_results)
+        row.analysis_timestamp = now
+        final_progress_event(row)
+        store_response_blob(row, build_analysis_response(row))
+    return rows
+
+
+def reanalyze_next_batch(version, after_id, batch_size):
+    """Re-score the next batch of outdated analyses after an id; (rows examined, rows re-scored, last id)"""
+    rows = list(
+        outdated_analyses(version).filter(id__gt=after_id).order_by('id')
+        .select_related('content', 'stored_job_description').defer('response_blob')[:batch_size]
+    )
+    if not rows:
+        return 0, 0, after_id
+
+    rescored = reanalyze_rows(rows)
+    last_id = rows[-1].pk
+    with transaction.atomic():
+        ResumeAnalysis.objects.bulk_update(rescored, UPDATE_FIELDS)
+        ResumeContent.objects.bulk_update([row.content for row in rescored], ['keyword_terms', 'analysis_results'])
+        save_checkpoint(version, last_id)
+    invalidate_details([row.pk for row in rescored])
+    return len(rows), len(rescored), last_id
@@ -0,0 +1,70 @@
+"""
+Fast JSON encoding for API responses and pre-rendered analysis payloads.
+
+FastJSONRenderer is a drop-in replacement for DRF's JSONRenderer (see
+REST_FRAMEWORK in settings). It encodes with orjson when that is installed
+and JSON_ENCODER is 'orjson', and with the standard json module otherwise.
+Values orjson cannot encode itself (Decimal, lazy translation strings, ...)
+and dates and times are converted by DRF's encoder, so both produce the same
+documents; only very large or small floats may be written in a different
+but equal exponent notation (1e-5 for 1e-05). orjson writes NaN and
+Infinity as null, so documents containing them are rejected with
+ValueError, as DRF's strict JSON encoding does.
+"""
+import json
+import math
+from decimal import Decimal
+
+from django.conf import settings
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_drf_encoder = JSONEncoder()
+
+
+def _use_orjson():
+    return orjson is not None and settings.JSON_ENCODER == 'orjson'
+
+
+def _non_finite(value):
+    """True if `value` contains a NaN or infinite number"""
+    if isinstance(value, float):
+        return not math.isfinite(value)
+    if isinstance(value, Decimal):
+        return not value.is_finite()
+    if isinstance(value, dict):
+        return any(_non_finite(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return any(_non_finite(item) for item in value)
+    return False
+
+
+def dumps_json(data):
+    """Compact UTF-8 JSON bytes of `data`"""
+    if _use_orjson():
+        body = orjson.dumps(
+            data,
+            default=_drf_encoder.default,
+            option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS,
+        )
+        # orjson encodes non-finite numbers as null, so only then is the data checked
+        if b'null' in body and _non_finite(data):
+            raise ValueError('Out of range float values are not JSON compliant')
+        return body
+    return json.dumps(data, cls=JSONEncoder, ensure_ascii=False, allow_nan=False, separators=(',', ':')).encode('utf-8')
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer that encodes with dumps_json (indented output still goes through DRF)"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        return dumps_json(data)
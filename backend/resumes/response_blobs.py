@@ -0,0 +1,109 @@
+"""
+Pre-rendered analysis responses.
+
+When an analysis finishes, its client-facing response (the `analysis_result`
+document built by build_analysis_response) is encoded once and stored
+on the row as JSON bytes. The extracted text is not part of the blob; it is
+kept once, in ResumeContent, and the blob holds a null `text_content` that is
+replaced with the encoded text when the blob is sent. Blobs of at least
+RESPONSE_BLOB_COMPRESS_MIN_BYTES are gzip compressed when
+RESPONSE_BLOB_COMPRESSION is on. The upload response and GET
+/api/resumes/<id>/analysis/ send the stored bytes with only the text spliced
+in; no serializer runs on these paths. A ?fields=, ?exclude= or ?compact=
+request (see selection.py) decodes the blob and encodes just the selected
+part, and does not load the text when it leaves it out.
+"""
+import gzip
+import json
+
+from django.conf import settings
+from django.http import HttpResponse
+
+from .renderers import dumps_json
+from .selection import select_analysis
+
+# Columns needed to answer GET /api/resumes/<id>/analysis/, besides the text
+BLOB_FIELDS = ('id', 'processing_status', 'analysis_timestamp', 'response_blob', 'response_blob_encoding')
+
+# Stands in for the extracted text in stored blobs; compact encoding has no
+# spaces, and inside JSON strings the quotes would be escaped
+TEXT_PLACEHOLDER = b'"text_content":null'
+
+
+def build_analysis_response(resume_analysis, include_text=True):
+    """Format an analyzed resume to match frontend expectations"""
+    analysis_results = resume_analysis.analysis_results or {}
+    word_count = analysis_results.get('text_quality', {}).get('word_count')
+    if word_count is None:
+        word_count = len((resume_analysis.raw_text or '').split())
+
+    return {
+        'id': resume_analysis.pk,
+        'filename': resume_analysis.filename,
+        'message': 'Resume analyzed successfully',
+        'analysis_result': {
+            'ats_score': {
+                'total_score': analysis_results.get('ats_score', {}).get('overall_score', resume_analysis.ats_score or 0),
+                'components': analysis_results.get('ats_score', {}).get('breakdown', {}),
+                'grade': 'A' if (resume_analysis.ats_score or 0) >= 80 else 'B' if (resume_analysis.ats_score or 0) >= 60 else 'C'
+            },
+            'suggestions': analysis_results.get('suggestions', []),
+            'extracted_skills': analysis_results.get('extracted_skills', []),
+            'analysis_summary': {
+                'total_skills': len(analysis_results.get('extracted_skills', [])),
+                'has_contact_info': True,
+                'has_experience': True,
+                'has_education': True,
+                'word_count': word_count,
+                'section_count': 5
+            },
+            'text_quality': analysis_results.get('text_quality', {}),
+            'text_content': resume_analysis.raw_text if include_text else None,
+            'job_match_score': analysis_results.get('job_match_score'),
+            'extraction': analysis_results.get('extraction', {})
+        }
+    }
+
+
+def store_response_blob(resume_analysis, data):
+    """Encode a response body, without the extracted text, once and keep it on the record (not saved)"""
+    body = dumps_json({**data, 'analysis_result': {**data['analysis_result'], 'text_content': None}})
+    if settings.RESPONSE_BLOB_COMPRESSION and len(body) >= settings.RESPONSE_BLOB_COMPRESS_MIN_BYTES:
+        resume_analysis.response_blob = gzip.compress(body, compresslevel=settings.RESPONSE_BLOB_COMPRESS_LEVEL)
+        resume_analysis.response_blob_encoding = 'gzip'
+    else:
+        resume_analysis.response_blob = body
+        resume_analysis.response_blob_encoding = ''
+    return resume_analysis
+
+
+def _blob_bytes(resume_analysis):
+    body = bytes(resume_analysis.response_blob)
+    if resume_analysis.response_blob_encoding == 'gzip':
+        body = gzip.decompress(body)
+    return body
+
+
+def load_response_blob(resume_analysis, include_text=True):
+    """Decoded response document stored on a record"""
+    data = json.loads(_blob_bytes(resume_analysis))
+    if include_text:
+        data['analysis_result']['text_content'] = resume_analysis.raw_text
+    return data
+
+
+def blob_response(request, resume_analysis, status=200, headers=None):
+    """HttpResponse carrying the stored blob of a record, with its text put in"""
+    text = b'"text_content":' + dumps_json(resume_analysis.raw_text)
+    body = _blob_bytes(resume_analysis).replace(TEXT_PLACEHOLDER, text, 1)
+    return HttpResponse(body, status=status, content_type='application/json', headers=headers)
+
+
+def analysis_response(request, resume_analysis, selection, data=None, status=200, headers=None):
+    """The stored blob, or the selected part of the analysis (`data` if already at hand)"""
+    if selection.is_default:
+        return blob_response(request, resume_analysis, status, headers)
+    if data is None:
+        data = load_response_blob(resume_analysis, include_text=selection.includes('text_content'))
+    body = dumps_json(select_analysis(data, selection))
+    return HttpResponse(body, status=status, content_type='application/json', headers=headers)
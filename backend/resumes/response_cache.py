@@ -0,0 +1,106 @@
+"""
+HTTP and server-side caching of resume detail responses.
+
+A finished analysis (completed or failed) only changes when the row is saved
+again, which bumps analysis_timestamp. Its detail response therefore gets a
+strong ETag built from the id and that timestamp, and the encoded JSON body
+is kept in the 'responses' cache (see CACHES in settings). A repeat request
+is answered from the cache, or with 304 Not Modified when the client's
+If-None-Match still matches, without touching the database, the serializer
+or the JSON encoder. Completed rows are also sent with a private max-age
+(RESPONSE_CACHE_MAX_AGE_SECONDS) so browsers can skip the request entirely.
+
+Requests with ?fields=, ?exclude= or ?compact= (see selection.py) are cut
+from the cached document and get an ETag of their own.
+
+Pending and processing rows change without a save (progress and job lease
+updates), so they are neither cached nor given an ETag.
+
+Entries are dropped by the post_save/post_delete signals on ResumeAnalysis
+(see signals.py). Code that moves a finished row on with QuerySet.update()
+must call invalidate_details itself. The default file-based cache is shared
+by all server processes on a host; use a shared backend (Redis, Memcached)
+when several hosts serve the API.
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.utils.http import parse_etags
+
+from .renderers import dumps_json
+from .selection import selected_etag
+
+CACHEABLE_STATUSES = ('completed', 'failed')
+
+
+def _cache():
+    return caches['responses']
+
+
+def _key(resume_id):
+    return f'resume-detail:{resume_id}'
+
+
+def resume_etag(resume):
+    """Strong ETag of a finished analysis, or None while it may still change"""
+    if resume.processing_status not in CACHEABLE_STATUSES or resume.analysis_timestamp is None:
+        return None
+    return f'"{resume.pk}-{int(resume.analysis_timestamp.timestamp() * 1000000)}"'
+
+
+def cache_headers(resume):
+    """ETag and Cache-Control headers for a resume detail response"""
+    etag = resume_etag(resume)
+    if etag is None:
+        return {'Cache-Control': 'no-cache'}
+    if resume.processing_status == 'completed':
+        cache_control = f'private, max-age={settings.RESPONSE_CACHE_MAX_AGE_SECONDS}'
+    else:
+        cache_control = 'private, no-cache'
+    return {'ETag': etag, 'Cache-Control': cache_control}
+
+
+def build_detail_entry(resume, data):
+    """Cache entry (headers, document and JSON body) of a serialized resume; stored if the analysis is finished"""
+    entry = {'headers': cache_headers(resume), 'data': dict(data), 'body': dumps_json(data)}
+    if settings.RESPONSE_CACHE_ENABLED and 'ETag' in entry['headers']:
+        _cache().set(_key(resume.pk), entry)
+    return entry
+
+
+def get_detail_entry(resume_id):
+    if not settings.RESPONSE_CACHE_ENABLED:
+        return None
+    return _cache().get(_key(resume_id))
+
+
+async def aget_detail_entry(resume_id):
+    if not settings.RESPONSE_CACHE_ENABLED:
+        return None
+    return await _cache().aget(_key(resume_id))
+
+
+def invalidate_details(resume_ids):
+    """Forget the cached detail responses of these resumes"""
+    _cache().delete_many([_key(resume_id) for resume_id in resume_ids])
+
+
+def entry_response(request, entry, selection):
+    """304, the full cached body, or the selected fields of a detail entry"""
+    headers = dict(entry['headers'])
+    if 'ETag' in headers:
+        headers['ETag'] = selected_etag(headers['ETag'], selection)
+    if not_modified(request, headers):
+        return HttpResponse(status=304, headers=headers)
+    body = entry['body'] if selection.is_default else dumps_json(selection.apply(entry['data']))
+    return HttpResponse(body, content_type='application/json', headers=headers)
+
+
+def not_modified(request, headers):
+    """Whether the client's If-None-Match already names the current ETag (weak comparison)"""
+    etag = headers.get('ETag')
+    if etag is None:
+        return False
+    # Compressed responses went out with the ETag weakened to W/"..."
+    client_etags = {tag.removeprefix('W/') for tag in parse_etags(request.headers.get('If-None-Match', ''))}
+    return '*' in client_etags or etag in client_etags
@@ -0,0 +1,184 @@
+"""
+Background retention: delete expired analyses and their uploaded files.
+
+This used to run inside every upload and on every process start. It now runs
+on a schedule, in a daemon thread that every web process starts from wsgi.py
+or asgi.py (RETENTION_THREAD_ENABLED, on by default), or as `manage.py
+run_retention` in a separate service. Every tick first takes a lease on a
+MaintenanceLock row, so exactly one process across all gunicorn workers and
+hosts does the work; the holder keeps renewing its lease and another
+process takes over only once it expires. A tick deletes at most
+RETENTION_MAX_BATCHES_PER_TICK batches of analyses and sweeps the next
+RETENTION_ORPHAN_SCAN_LIMIT entries of the file store for unreferenced
+files (and as many job descriptions no analysis uses any more), so a large
+backlog is worked down over several ticks instead of in one long pause. The
+analysis cache entries of deleted uploads go with them, and each tick also
+evicts expired cache entries.
+"""
+import logging
+import random
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .analysis_cache import evict_entries, purge_files
+from .jobs import make_worker_id
+from .metrics import observe_retention
+from .models import MaintenanceLock, ResumeAnalysis, StoredJobDescription
+from .response_cache import invalidate_details
+from .search import unindex_resumes
+from .signals import delete_handled_by_caller
+from .storage import release_references, sweep_orphaned_files
+
+RETENTION_LOCK = 'retention'
+
+logger = logging.getLogger(__name__)
+
+_thread = None
+_thread_lock = threading.Lock()
+
+
+def acquire_lock(name, owner, lease_seconds):
+    """Take or renew a named lease; False if another live owner holds it"""
+    now = timezone.now()
+    try:
+        MaintenanceLock.objects.get_or_create(name=name)
+    except IntegrityError:
+        # Created concurrently by another process
+        pass
+
+    return bool(MaintenanceLock.objects.filter(
+        Q(owner=owner) | Q(owner='') | Q(expires_at__lt=now) | Q(expires_at__isnull=True),
+        name=name,
+    ).update(owner=owner, expires_at=now + timedelta(seconds=lease_seconds)))
+
+
+def release_lock(name, owner):
+    return bool(MaintenanceLock.objects.filter(name=name, owner=owner).update(owner='', expires_at=None))
+
+
+def delete_expired_analyses(cutoff, batch_size, max_batches):
+    """Delete analyses uploaded before the cutoff in bounded batches"""
+    records_deleted = 0
+
+    # Jobs a worker currently holds a lease on are left alone
+    expired = ResumeAnalysis.objects.filter(upload_timestamp__lt=cutoff).exclude(
+        processing_status='processing', lease_expires_at__gte=timezone.now()
+    ).order_by('upload_timestamp', 'id')
+
+    for _ in range(max_batches):
+        batch = list(expired.values_list('id', flat=True)[:batch_size])
+        if not batch:
+            break
+
+        records_deleted += delete_analyses(batch)
+
+        if len(batch) < batch_size:
+            break
+
+    return records_deleted
+
+
+def delete_analyses(resume_ids):
+    """Delete analyses with a few queries per batch instead of several per row
+
+    The delete signal handlers (see signals.py) would run once per analysis;
+    they are skipped for this delete and their work is done here for the
+    whole batch. Files nothing references any more are removed by the orphan
+    sweep.
+    """
+    analyses = ResumeAnalysis.objects.filter(id__in=resume_ids)
+    with transaction.atomic():
+        files = list(analyses.values_list('file', 'content_hash'))
+        unindex_resumes(resume_ids)
+        with delete_handled_by_caller():
+            _, deleted = analyses.delete()
+        release_references([file_name for file_name, _ in files])
+        purge_files([content_hash for _, content_hash in files])
+    invalidate_details(resume_ids)
+    return deleted.get(ResumeAnalysis._meta.label, 0)
+
+
+def delete_unused_job_descriptions(cutoff, limit):
+    """Delete stored job descriptions created before the cutoff that no analysis references"""
+    unused = list(
+        StoredJobDescription.objects.filter(resumes__isnull=True, created_at__lt=cutoff)
+        .values_list('hash', flat=True)[:limit]
+    )
+    if unused:
+        # Checked again in the DELETE in case an upload started using one meanwhile
+        StoredJobDescription.objects.filter(hash__in=unused, resumes__isnull=True).delete()
+    return len(unused)
+
+
+def run_retention_tick(owner=None):
+    """Run one bounded retention pass; returns None if another process holds the lock"""
+    owner = owner or make_worker_id()
+    if not acquire_lock(RETENTION_LOCK, owner, settings.RETENTION_LOCK_SECONDS):
+        return None
+
+    started = time.monotonic()
+    now = timezone.now()
+    records_deleted = delete_expired_analyses(
+        now - timedelta(seconds=settings.RETENTION_MAX_AGE_SECONDS),
+        settings.RETENTION_BATCH_SIZE,
+        settings.RETENTION_MAX_BATCHES_PER_TICK,
+    )
+
+    # The orphan sweep continues from where the previous tick stopped
+    cursor = MaintenanceLock.objects.filter(name=RETENTION_LOCK).values_list('cursor', flat=True).first()
+    files_deleted, files_scanned, cursor = sweep_orphaned_files(
+        now - timedelta(seconds=settings.RETENTION_ORPHAN_MAX_AGE_SECONDS),
+        settings.RETENTION_ORPHAN_SCAN_LIMIT,
+        cursor or '',
+    )
+    MaintenanceLock.objects.filter(name=RETENTION_LOCK).update(cursor=cursor)
+    job_descriptions_deleted = delete_unused_job_descriptions(
+        now - timedelta(seconds=settings.RETENTION_ORPHAN_MAX_AGE_SECONDS),
+        settings.RETENTION_ORPHAN_SCAN_LIMIT,
+    )
+    cache_entries_evicted = evict_entries()
+
+    result = {
+        'records_deleted': records_deleted,
+        'files_deleted': files_deleted,
+        'job_descriptions_deleted': job_descriptions_deleted,
+        'cache_entries_evicted': cache_entries_evicted,
+        'files_scanned': files_scanned,
+        'sweep_cursor': cursor,
+        'duration_ms': round((time.monotonic() - started) * 1000, 1),
+    }
+    observe_retention(result)
+    if records_deleted or files_deleted:
+        logger.info('retention tick', extra=result)
+    return result
+
+
+def _retention_loop(owner):
+    while True:
+        # Jitter keeps web workers started together from polling in lockstep
+        time.sleep(settings.RETENTION_INTERVAL_SECONDS * random.uniform(0.9, 1.1))
+        close_old_connections()
+        try:
+            run_retention_tick(owner)
+        except Exception:
+            logger.exception('retention tick failed')
+
+
+def start_retention_thread():
+    """Start the retention daemon thread for this process (once), if RETENTION_THREAD_ENABLED"""
+    global _thread
+    if not settings.RETENTION_THREAD_ENABLED:
+        return None
+    with _thread_lock:
+        if _thread is None or not _thread.is_alive():
+            _thread = threading.Thread(
+                target=_retention_loop, args=(make_worker_id(),), name='retention', daemon=True
+            )
+            _thread.start()
+    return _thread
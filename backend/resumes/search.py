@@ -0,0 +1,174 @@
+"""
+Reverse matching: rank stored resumes against a job description.
+
+Each completed analysis is indexed when it is saved. ResumeTerm holds one
+posting per (term, resume) with a length-normalized log term frequency, and
+CorpusTerm keeps document frequencies, updated incrementally as resumes are
+indexed and deleted. A query weights its terms by IDF, keeps the most
+selective ones, and lets the database score every matching resume in one
+grouped aggregate over the postings, returning only the top K.
+"""
+import math
+import time
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, FloatField, Sum, Value, When
+
+from .models import CorpusTerm, ResumeAnalysis, ResumeTerm
+from .skills import tokenize
+
+STOP_WORDS = frozenset("""
+a about above after again all also am an and any are as at be been before being below
+between both but by can could did do does doing down during each etc few for from further
+had has have having he her here hers him his how i if in into is it its itself just me
+more most my no nor not now of off on once only or other our ours out over own per same
+she should so some such than that the their theirs them then there these they this those
+through to too under until up very via was we were what when where which while who whom
+why will with within without would you your yours
+""".split())
+
+# Bulk updates are chunked to stay under database parameter limits
+CHUNK_SIZE = 500
+MAX_TERM_LENGTH = 64
+
+
+def index_terms(text):
+    """Normalized terms of a text, one entry per occurrence"""
+    return [
+        term for term in tokenize((text or '').lower())
+        if term not in STOP_WORDS and len(term) <= MAX_TERM_LENGTH
+    ]
+
+
+def term_weights(text):
+    """Length-normalized log term frequencies of a document"""
+    counts = Counter(index_terms(text))
+    weights = {term: 1 + math.log(count) for term, count in counts.items()}
+    norm = math.sqrt(sum(weight * weight for weight in weights.values())) or 1.0
+    return {term: weight / norm for term, weight in weights.items()}
+
+
+def _chunks(items, size=CHUNK_SIZE):
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _adjust_doc_freq(term_counts, sign):
+    """Add (sign=1) or remove (sign=-1) document counts, one UPDATE per distinct count"""
+    by_count = defaultdict(list)
+    for term, count in term_counts.items():
+        by_count[count].append(term)
+
+    for count, terms in by_count.items():
+        for chunk in _chunks(terms):
+            CorpusTerm.objects.filter(term__in=chunk).update(doc_freq=F('doc_freq') + sign * count)
+
+
+def index_resumes(items):
+    """Index (resume_id, raw_text) pairs, replacing any existing postings"""
+    items = list(items)
+    if not items:
+        return 0
+
+    postings = []
+    doc_freq = Counter()
+    for resume_id, raw_text in items:
+        weights = term_weights(raw_text)
+        doc_freq.update(weights.keys())
+        postings.extend(
+            ResumeTerm(resume_id=resume_id, term=term, weight=weight)
+            for term, weight in weights.items()
+        )
+
+    with transaction.atomic():
+        unindex_resumes([resume_id for resume_id, _ in items])
+        ResumeTerm.objects.bulk_create(postings, batch_size=CHUNK_SIZE)
+        CorpusTerm.objects.bulk_create(
+            [CorpusTerm(term=term) for term in doc_freq],
+            batch_size=CHUNK_SIZE,
+            ignore_conflicts=True,
+        )
+        _adjust_doc_freq(doc_freq, 1)
+
+    return len(postings)
+
+
+def unindex_resumes(resume_ids):
+    """Remove the postings of these resumes and their document frequency contributions"""
+    doc_freq = Counter()
+    for chunk in _chunks(resume_ids):
+        doc_freq.update(
+            ResumeTerm.objects.filter(resume_id__in=chunk).values_list('term', flat=True)
+        )
+    if not doc_freq:
+        return 0
+
+    with transaction.atomic():
+        _adjust_doc_freq(doc_freq, -1)
+        deleted = 0
+        for chunk in _chunks(resume_ids):
+            count, _ = ResumeTerm.objects.filter(resume_id__in=chunk).delete()
+            deleted += count
+    return deleted
+
+
+def match_resumes(job_description, top_k=20):
+    """Rank indexed resumes by TF-IDF similarity to a job description"""
+    started = time.perf_counter()
+    corpus_size = ResumeAnalysis.objects.filter(processing_status='completed').count()
+    query_terms = set(index_terms(job_description))
+
+    doc_freq = dict(
+        CorpusTerm.objects.filter(term__in=query_terms, doc_freq__gt=0)
+        .values_list('term', 'doc_freq')
+    ) if query_terms else {}
+
+    # Terms found in most resumes barely change the ranking but dominate the
+    # work, so only the most selective terms are scored.
+    max_doc_freq = max(1, int(corpus_size * settings.MATCH_MAX_DOC_FREQ_RATIO))
+    idf = {
+        term: math.log((corpus_size + 1) / (df + 1)) + 1
+        for term, df in doc_freq.items() if df <= max_doc_freq
+    }
+    selected = sorted(idf, key=idf.get, reverse=True)[:settings.MATCH_MAX_QUERY_TERMS]
+
+    results = []
+    if selected:
+        query_norm = math.sqrt(sum(idf[term] ** 2 for term in selected))
+        term_boost = Case(
+            *[When(term=term, then=Value(idf[term] ** 2 / query_norm)) for term in selected],
+            output_field=FloatField(),
+        )
+        top = list(
+            ResumeTerm.objects.filter(term__in=selected)
+            .values('resume_id')
+            .annotate(score=Sum(F('weight') * term_boost, output_field=FloatField()))
+            .order_by('-score', 'resume_id')[:top_k]
+        )
+
+        resumes = ResumeAnalysis.objects.only(
+            'id', 'filename', 'ats_score', 'upload_timestamp'
+        ).in_bulk([row['resume_id'] for row in top])
+
+        for rank, row in enumerate(top, start=1):
+            resume = resumes.get(row['resume_id'])
+            if resume is None:
+                continue
+            results.append({
+                'rank': rank,
+                'id': resume.pk,
+                'filename': resume.filename,
+                'score': round(row['score'], 4),
+                'ats_score': resume.ats_score,
+                'upload_timestamp': resume.upload_timestamp,
+            })
+
+    return {
+        'corpus_size': corpus_size,
+        'query_terms': selected,
+        'results': results,
+        'took_ms': round((time.perf_counter() - started) * 1000, 1),
+    }
@@ -0,0 +1,82 @@
+"""
+Field selection for analysis responses: ?fields=, ?exclude= and ?compact=1.
+
+`fields` keeps only the named fields, `exclude` drops them, and `compact`
+drops the extracted text plus, on the detail endpoint, the fields derived
+again from analysis_results (extracted_skills, suggestions, ats_breakdown).
+On the upload and /analysis/ responses the selection applies to the keys of
+`analysis_result`; `id`, `filename` and `message` are always sent.
+"""
+import zlib
+
+from .serializers import ResumeAnalysisSerializer
+
+DETAIL_FIELDS = tuple(ResumeAnalysisSerializer.Meta.fields)
+DETAIL_COMPACT_EXCLUDE = ('raw_text', 'extracted_skills', 'suggestions', 'ats_breakdown')
+
+ANALYSIS_FIELDS = (
+    'ats_score', 'suggestions', 'extracted_skills', 'analysis_summary', 'text_quality',
+    'text_content', 'job_match_score', 'extraction',
+)
+ANALYSIS_COMPACT_EXCLUDE = ('text_content',)
+
+TRUE_VALUES = ('', '1', 'true', 'yes')
+
+
+class InvalidFieldSelection(ValueError):
+    pass
+
+
+class FieldSelection:
+    """Fields to keep from a response document"""
+
+    def __init__(self, fields=None, exclude=()):
+        self.fields = tuple(sorted(fields)) if fields is not None else None
+        self.exclude = tuple(sorted(set(exclude)))
+
+    @property
+    def is_default(self):
+        return self.fields is None and not self.exclude
+
+    @property
+    def key(self):
+        """Short stable name of this selection, for cache keys and ETags"""
+        spec = f"{','.join(self.fields or ())}|{','.join(self.exclude)}"
+        return f'{zlib.crc32(spec.encode()):08x}'
+
+    def includes(self, name):
+        return (self.fields is None or name in self.fields) and name not in self.exclude
+
+    def apply(self, data):
+        return {name: value for name, value in data.items() if self.includes(name)}
+
+
+def _names(value, available):
+    names = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        raise InvalidFieldSelection(
+            f"Unknown field(s) {', '.join(unknown)}; available: {', '.join(available)}"
+        )
+    return names
+
+
+def parse_field_selection(params, available, compact_exclude):
+    """FieldSelection from request query parameters; raises InvalidFieldSelection"""
+    fields = _names(params['fields'], available) if params.get('fields') else None
+    exclude = _names(params.get('exclude', ''), available)
+    if 'compact' in params and params['compact'].lower() in TRUE_VALUES:
+        exclude += compact_exclude
+    return FieldSelection(fields, exclude)
+
+
+def select_analysis(data, selection):
+    """Apply a selection to the analysis_result of an upload-shaped response"""
+    return {**data, 'analysis_result': selection.apply(data['analysis_result'])}
+
+
+def selected_etag(etag, selection):
+    """Distinct strong ETag for each representation of a resource"""
+    if etag is None or selection.is_default:
+        return etag
+    return f'{etag[:-1]}-{selection.key}"'
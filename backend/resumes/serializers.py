@@ -19,6 +19,7 @@ class ResumeAnalysisSerializer(serializers.ModelSerializer):
             'job_match_score',
             'file_size',
             'processing_status',
+            'progress',
             'extracted_skills',
             'suggestions',
             'ats_breakdown'
@@ -33,6 +34,7 @@ class ResumeAnalysisSerializer(serializers.ModelSerializer):
             'job_match_score',
             'file_size',
             'processing_status',
+            'progress',
             'extracted_skills',
             'suggestions',
             'ats_breakdown'
@@ -0,0 +1,56 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .analysis_cache import purge_files
+from .models import ResumeAnalysis
+from .response_cache import invalidate_details
+from .search import unindex_resumes
+from .storage import release_references
+
+_handled_by_caller = ContextVar('delete_handled_by_caller', default=False)
+
+
+@contextmanager
+def delete_handled_by_caller():
+    """Skip the per-instance delete handlers in this block; the caller does their work per batch"""
+    token = _handled_by_caller.set(True)
+    try:
+        yield
+    finally:
+        _handled_by_caller.reset(token)
+
+
+@receiver(pre_delete, sender=ResumeAnalysis)
+def remove_from_term_index(sender, instance, **kwargs):
+    """Keep corpus document frequencies in step when a resume is deleted"""
+    if _handled_by_caller.get():
+        return
+    unindex_resumes([instance.pk])
+
+
+@receiver(post_delete, sender=ResumeAnalysis)
+def release_stored_file(sender, instance, **kwargs):
+    """Drop the deleted analysis' reference to its (possibly shared) file"""
+    if _handled_by_caller.get():
+        return
+    release_references([instance.file.name])
+
+
+@receiver(post_delete, sender=ResumeAnalysis)
+def purge_cached_analysis(sender, instance, **kwargs):
+    """Drop cached text of the deleted analysis' file once no other analysis uses it"""
+    if _handled_by_caller.get():
+        return
+    purge_files([instance.content_hash])
+
+
+@receiver(post_save, sender=ResumeAnalysis)
+@receiver(post_delete, sender=ResumeAnalysis)
+def invalidate_cached_detail(sender, instance, **kwargs):
+    """Drop the cached detail response of a saved or deleted analysis"""
+    if _handled_by_caller.get():
+        return
+    invalidate_details([instance.pk])
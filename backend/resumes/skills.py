@@ -0,0 +1,117 @@
+"""
+Skill matching against an external taxonomy.
+
+The taxonomy (resumes/data/skills.json by default, see SKILL_TAXONOMY_PATH)
+lists canonical skill names with their aliases, e.g. "k8s" -> Kubernetes.
+Every name and alias is split into word tokens and compiled into a trie keyed
+by token, so a resume is tokenized once and scanned in a single pass. Lookups
+at each position are dict hits, which keeps matching time independent of the
+taxonomy size, and matching on whole tokens means 'ai' no longer matches
+inside 'maintain' nor 'word' inside 'password'.
+"""
+import hashlib
+import json
+import re
+import threading
+
+from django.conf import settings
+
+# Words may carry inner dots and trailing +/# (node.js, asp.net, c++, c#);
+# a leading dot is kept for names like .net
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9+#]+)*|\.[a-z0-9]+")
+
+
+def tokenize(text_lower):
+    """Split lowercase text into the word tokens used for skill matching"""
+    return TOKEN_RE.findall(text_lower)
+
+
+class SkillMatcher:
+    """Token trie compiled from a skill taxonomy"""
+
+    def __init__(self, skills):
+        self.root = {}
+        self.max_depth = 0
+        self.size = len(skills)
+        # Changes whenever the taxonomy does (part of the analyzer version)
+        self.fingerprint = hashlib.sha256(json.dumps(skills, sort_keys=True).encode('utf-8')).hexdigest()[:8]
+
+        for skill in skills:
+            patterns = list(skill.get('aliases', []))
+            if skill.get('match_name', True):
+                patterns.append(skill['name'])
+            for pattern in patterns:
+                self.add(pattern, skill['name'])
+
+    def add(self, pattern, canonical):
+        """Insert one name or alias, mapped to its canonical skill name"""
+        tokens = tokenize(pattern.lower())
+        if not tokens:
+            return
+        node = self.root
+        for token in tokens:
+            node = node.setdefault(token, {})
+        # The empty-string key can never be a token, so it marks a complete pattern
+        node[''] = canonical
+        self.max_depth = max(self.max_depth, len(tokens))
+
+    def _split_tokens(self, tokens):
+        """Break dotted tokens the taxonomy doesn't know ('experience.python')"""
+        for token in tokens:
+            if '.' in token.strip('.') and token not in self.root:
+                yield from (part for part in token.split('.') if part)
+            else:
+                yield token
+
+    def find(self, text_lower):
+        """Return canonical skills in order of first appearance (leftmost-longest matches)"""
+        return self.find_tokens(tokenize(text_lower))
+
+    def find_tokens(self, tokens):
+        """Like find(), for text that has already been tokenized"""
+        tokens = list(self._split_tokens(tokens))
+        found = {}
+        root = self.root
+        index = 0
+        count = len(tokens)
+
+        while index < count:
+            node = root.get(tokens[index])
+            match = None
+            end = index + 1
+            position = index + 1
+            while node is not None:
+                if '' in node:
+                    match, end = node[''], position
+                if position >= count:
+                    break
+                node = node.get(tokens[position])
+                position += 1
+
+            if match is not None:
+                found.setdefault(match, None)
+                index = end
+            else:
+                index += 1
+
+        return list(found)
+
+
+def load_taxonomy(path):
+    """Read the skill list from a taxonomy JSON file"""
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)['skills']
+
+
+_matcher = None
+_matcher_lock = threading.Lock()
+
+
+def get_skill_matcher():
+    """Compile the configured taxonomy once per process and reuse it"""
+    global _matcher
+    if _matcher is None:
+        with _matcher_lock:
+            if _matcher is None:
+                _matcher = SkillMatcher(load_taxonomy(settings.SKILL_TAXONOMY_PATH))
+    return _matcher
@@ -0,0 +1,234 @@
+"""
+Content-addressed, sharded storage for uploaded resumes.
+
+Files are named by the SHA-256 of their content and sharded two levels deep
+(resumes/ab/cd/abcd...ef.pdf), so identical uploads share one file on disk
+and no directory grows past a few thousand entries even with millions of
+files. StoredFile rows count the analyses referencing each file: saving
+through the storage adds a reference and deleting an analysis releases one
+(see signals.py). Inside defer_references the names are collected instead,
+so a caller can add the references in the transaction that saves the rows.
+
+Releasing the last reference only drops the StoredFile row. The file itself
+is removed by sweep_orphaned_files, which walks the shard tree with
+os.scandir, a bounded number of entries per call, resuming from a cursor.
+It skips recently modified files, and re-uploading an existing file touches
+it, so a file is never deleted while a new upload is about to reference it.
+
+Files stored before this layout (flat in resumes/) are not shared and are
+deleted as soon as their analysis is.
+"""
+import hashlib
+import logging
+import os
+import threading
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.db.models import F
+
+# Reference count updates are chunked to stay under database parameter limits
+CHUNK_SIZE = 500
+
+logger = logging.getLogger(__name__)
+
+_deferred = threading.local()
+
+
+def content_sha256(content):
+    """SHA-256 of a file, reusing the digest computed while it was uploaded"""
+    for candidate in (content, getattr(content, 'file', None)):
+        if getattr(candidate, 'sha256', ''):
+            return candidate.sha256
+
+    digest = hashlib.sha256()
+    content.seek(0)
+    for chunk in content.chunks():
+        digest.update(chunk)
+    content.seek(0)
+    return digest.hexdigest()
+
+
+def content_name(directory, sha256, filename):
+    """Sharded storage name of a file with this content"""
+    extension = os.path.splitext(filename)[1].lower()
+    return f"{directory}/{sha256[:2]}/{sha256[2:4]}/{sha256}{extension}"
+
+
+def is_sharded_name(name):
+    parts = name.split('/')
+    return len(parts) >= 3 and len(parts[-2]) == 2 and len(parts[-3]) == 2
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """FileSystemStorage that stores each distinct content once, named by its hash"""
+
+    def __init__(self, **kwargs):
+        # Two processes may store the same content at once; either copy is fine
+        kwargs.setdefault('allow_overwrite', True)
+        super().__init__(**kwargs)
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+
+        name = content_name(os.path.dirname(name) or 'resumes', content_sha256(content), name)
+        if self.exists(name):
+            # Already stored: refresh the mtime so the orphan sweep leaves it
+            # alone until the new reference is recorded
+            os.utime(self.path(name))
+        else:
+            name = self._save(name, content)
+
+        deferred = getattr(_deferred, 'names', None)
+        if deferred is not None:
+            deferred.append(name)
+        else:
+            add_references([name])
+        return name
+
+
+resume_storage = ContentAddressedStorage()
+
+
+def get_resume_storage():
+    return resume_storage
+
+
+@contextmanager
+def defer_references():
+    """Collect the names saved in this thread instead of adding their references"""
+    names = []
+    _deferred.names = names
+    try:
+        yield names
+    finally:
+        del _deferred.names
+
+
+def _chunks(items, size=CHUNK_SIZE):
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _adjust_references(name_counts, sign):
+    """Add or subtract reference counts, one UPDATE per distinct count"""
+    from .models import StoredFile
+
+    by_count = defaultdict(list)
+    for name, count in name_counts.items():
+        by_count[count].append(name)
+
+    for count, names in by_count.items():
+        for chunk in _chunks(names):
+            StoredFile.objects.filter(name__in=chunk).update(ref_count=F('ref_count') + sign * count)
+
+
+def add_references(names):
+    """Record one more analysis referencing each stored file name"""
+    from .models import StoredFile
+
+    counts = Counter(name for name in names if name)
+    if not counts:
+        return
+    StoredFile.objects.bulk_create(
+        [StoredFile(name=name) for name in counts],
+        batch_size=CHUNK_SIZE,
+        ignore_conflicts=True,
+    )
+    _adjust_references(counts, 1)
+
+
+def release_references(names):
+    """Drop references to stored files; unreferenced files are left to the sweep"""
+    from .models import StoredFile
+
+    counts = Counter(name for name in names if name)
+    if not counts:
+        return
+
+    known = set()
+    for chunk in _chunks(counts):
+        known.update(StoredFile.objects.filter(name__in=chunk).values_list('name', flat=True))
+
+    _adjust_references({name: counts[name] for name in known}, -1)
+    for chunk in _chunks(known):
+        StoredFile.objects.filter(name__in=chunk, ref_count__lte=0).delete()
+
+    # Files from before content addressing belong to a single analysis
+    for name in counts:
+        if name not in known and not is_sharded_name(name):
+            try:
+                resume_storage.delete(name)
+            except OSError as e:
+                logger.warning('error deleting file', extra={'file_name': name, 'error': str(e)})
+
+
+def _sorted_dirs(path):
+    try:
+        with os.scandir(path) as entries:
+            return sorted(entry.name for entry in entries if entry.is_dir() and len(entry.name) == 2)
+    except FileNotFoundError:
+        return []
+
+
+def sweep_orphaned_files(cutoff, limit, cursor='', directory='resumes'):
+    """
+    Delete unreferenced files older than the cutoff from the shard tree.
+
+    Scans shard directories in order, starting after `cursor` ('ab/cd'), and
+    stops once about `limit` entries have been looked at. Returns
+    (deleted, scanned, next_cursor); next_cursor is '' after a full pass.
+    """
+    from .models import StoredFile
+
+    root = resume_storage.path(directory)
+    cutoff_timestamp = cutoff.timestamp()
+    deleted = 0
+    scanned = 0
+
+    for top in _sorted_dirs(root):
+        if top < cursor[:2]:
+            continue
+        for shard in _sorted_dirs(os.path.join(root, top)):
+            key = f"{top}/{shard}"
+            if key <= cursor:
+                continue
+
+            entries = {}
+            with os.scandir(os.path.join(root, top, shard)) as shard_entries:
+                for entry in shard_entries:
+                    if entry.is_file():
+                        entries[f"{directory}/{key}/{entry.name}"] = entry
+            scanned += len(entries)
+
+            referenced = set()
+            for chunk in _chunks(entries):
+                referenced.update(
+                    StoredFile.objects.filter(name__in=chunk, ref_count__gt=0)
+                    .values_list('name', flat=True)
+                )
+
+            orphans = []
+            for name, entry in entries.items():
+                try:
+                    if name not in referenced and entry.stat().st_mtime < cutoff_timestamp:
+                        os.remove(entry.path)
+                        orphans.append(name)
+                except FileNotFoundError:
+                    continue
+                except OSError as e:
+                    logger.warning('error deleting orphaned file', extra={'path': entry.path, 'error': str(e)})
+            for chunk in _chunks(orphans):
+                StoredFile.objects.filter(name__in=chunk, ref_count__lte=0).delete()
+            deleted += len(orphans)
+
+            if scanned >= limit:
+                return deleted, scanned, key
+
+    return deleted, scanned, ''
@@ -0,0 +1,137 @@
+"""
+Catalog of the fixed suggestions and text quality recommendations.
+
+The analyzer builds its suggestions from these entries, and stored analysis
+results keep only their codes: pack_results replaces every entry that
+matches the catalog with its code before the results are written, and
+unpack_results renders the codes back into the full entries when they are
+read (see resumes/fields.py). Entries that are not in the catalog, like
+the error note of the fallback analysis, are stored as they are.
+
+Codes are stored in the database, so they must never be renamed or reused;
+add a new code when the text of an entry changes.
+"""
+
+SUGGESTIONS = {
+    'formatting': {
+        "type": "important",
+        "category": "Formatting",
+        "suggestion": "Improve resume formatting by adding clear sections and contact information",
+        "impact": "High"
+    },
+    'skills': {
+        "type": "moderate",
+        "category": "Skills",
+        "suggestion": "Add more relevant technical and soft skills to improve ATS compatibility",
+        "impact": "Medium"
+    },
+    'experience': {
+        "type": "important",
+        "category": "Experience",
+        "suggestion": "Add more specific experience details with action verbs and achievements",
+        "impact": "High"
+    },
+    'quantify': {
+        "type": "moderate",
+        "category": "Content",
+        "suggestion": "Quantify achievements with numbers and metrics where possible",
+        "impact": "Medium"
+    },
+    'keywords': {
+        "type": "moderate",
+        "category": "Keywords",
+        "suggestion": "Include industry-specific keywords relevant to your target role",
+        "impact": "Medium"
+    },
+}
+
+RECOMMENDATIONS = {
+    'readability': {
+        "type": "readability",
+        "category": "Text Complexity",
+        "message": "Consider using shorter sentences and simpler words to improve readability",
+        "priority": "medium"
+    },
+    'too_short': {
+        "type": "content",
+        "category": "Resume Length",
+        "message": "Your resume may be too short. Consider adding more details about your experience",
+        "priority": "high"
+    },
+    'too_long': {
+        "type": "content",
+        "category": "Resume Length",
+        "message": "Your resume may be too long. Consider condensing to the most relevant information",
+        "priority": "medium"
+    },
+    'concise': {
+        "type": "vocabulary",
+        "category": "Word Choice",
+        "message": "Try using more concise language to improve clarity",
+        "priority": "low"
+    },
+}
+
+
+def suggestion(code):
+    """A fresh copy of a catalog suggestion"""
+    return dict(SUGGESTIONS[code])
+
+
+def recommendation(code):
+    """A fresh copy of a catalog text quality recommendation"""
+    return dict(RECOMMENDATIONS[code])
+
+
+def _codes(catalog):
+    return {tuple(sorted(entry.items())): code for code, entry in catalog.items()}
+
+
+_SUGGESTION_CODES = _codes(SUGGESTIONS)
+_RECOMMENDATION_CODES = _codes(RECOMMENDATIONS)
+
+
+def _pack(items, codes):
+    packed = []
+    for item in items:
+        try:
+            packed.append(codes.get(tuple(sorted(item.items())), item))
+        except (AttributeError, TypeError):
+            # Not a flat dict; keep it verbatim
+            packed.append(item)
+    return packed
+
+
+def _unpack(items, catalog):
+    # A code missing from the catalog is left as it is rather than lost
+    return [dict(catalog[item]) if isinstance(item, str) and item in catalog else item for item in items]
+
+
+def _map_lists(results, suggestions, recommendations):
+    if not isinstance(results, dict):
+        return results
+    results = dict(results)
+    if isinstance(results.get('suggestions'), list):
+        results['suggestions'] = suggestions(results['suggestions'])
+    text_quality = results.get('text_quality')
+    if isinstance(text_quality, dict) and isinstance(text_quality.get('recommendations'), list):
+        results['text_quality'] = {**text_quality, 'recommendations': recommendations(text_quality['recommendations'])}
+    return results
+
+
+def pack_results(results):
+    """Analysis results with catalog suggestions and recommendations replaced by their codes"""
+    return _map_lists(
+        results,
+        lambda items: _pack(items, _SUGGESTION_CODES),
+        lambda items: _pack(items, _RECOMMENDATION_CODES),
+    )
+
+
+def unpack_results(results):
+    """Analysis results with suggestion and recommendation codes rendered back into entries"""
+    return _map_lists(
+        results,
+        lambda items: _unpack(items, SUGGESTIONS),
+        lambda items: _unpack(items, RECOMMENDATIONS),
+    )
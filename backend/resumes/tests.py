@@ -0,0 +1,308 @@
+import shutil
+import tempfile
+import time
+from datetime import timedelta
+from unittest import mock
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.db.models import F
+from django.test import Client, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from .analysis_cache import (
+    evict_entries, lookup_analysis, lookup_page_texts, lookup_text, store_analysis, store_page_texts,
+)
+from .jobs import claim_next_job, claimable_jobs, complete_job, extend_lease, keep_lease
+from .models import (
+    AnalysisCacheEntry, MaintenanceLock, PageTextCacheEntry, ResumeAnalysis, ResumeContent, StoredJobDescription,
+)
+from .pagination import InvalidCursor, decode_cursor
+from .retention import RETENTION_LOCK, acquire_lock, run_retention_tick
+
+MEDIA_ROOT = tempfile.mkdtemp(prefix='resume-tests-')
+
+# Uploaded files and cached responses stay out of the working tree
+test_settings = override_settings(
+    MEDIA_ROOT=MEDIA_ROOT,
+    CACHES={**settings.CACHES, 'responses': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+)
+
+RESUME_TEXT = (
+    'Jane Doe jane@example.com 555-123-4567\n'
+    'Experience: Senior Python developer, 6 years building Django and PostgreSQL services on AWS.\n'
+    'Led a team of 4 and reduced response times by 40%.\n'
+    'Education: BSc Computer Science\n'
+    'Skills: Python, Django, Docker, Kubernetes, SQL\n'
+)
+
+
+def tearDownModule():
+    shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+
+def upload(client, text=RESUME_TEXT, name='resume.txt', job_description='Python developer'):
+    response = client.post('/api/upload/', {
+        'file': SimpleUploadedFile(name, text.encode('utf-8'), 'text/plain'),
+        'job_description': job_description,
+    })
+    assert response.status_code == 201, response.content
+    return response.json()['id']
+
+
+def queue_job(name='queued.txt'):
+    return ResumeAnalysis.objects.create(filename=name, file=f'resumes/{name}', processing_status='pending')
+
+
+@test_settings
+class ClaimJobTests(TestCase):
+    def test_claimed_job_is_not_claimed_again(self):
+        job = queue_job()
+
+        claimed = claim_next_job('worker-a', lease_seconds=60)
+        self.assertEqual(claimed.pk, job.pk)
+        self.assertEqual(claimed.lease_owner, 'worker-a')
+        self.assertEqual(claimed.attempts, 1)
+        self.assertIsNone(claim_next_job('worker-b', lease_seconds=60))
+
+    def test_stale_candidate_loses_the_compare_and_swap(self):
+        job = queue_job()
+        calls = []
+
+        def claimable_jobs_racing(now):
+            calls.append(now)
+            if len(calls) == 2:
+                # After this worker listed the row, another one claimed it and gave it
+                # back: it is claimable again, but not at the attempts count read here
+                ResumeAnalysis.objects.filter(pk=job.pk).update(attempts=F('attempts') + 1)
+            return claimable_jobs(now)
+
+        with mock.patch('resumes.jobs.claimable_jobs', claimable_jobs_racing):
+            self.assertIsNone(claim_next_job('worker-a', lease_seconds=60))
+
+        job.refresh_from_db()
+        self.assertEqual((job.processing_status, job.lease_owner, job.attempts), ('pending', '', 1))
+
+    def test_expired_lease_is_reclaimed_and_old_owner_loses_it(self):
+        job = queue_job()
+        first = claim_next_job('worker-a', lease_seconds=60)
+        ResumeAnalysis.objects.filter(pk=job.pk).update(lease_expires_at=timezone.now() - timedelta(seconds=1))
+
+        second = claim_next_job('worker-b', lease_seconds=60)
+        self.assertEqual(second.pk, job.pk)
+        self.assertEqual(second.attempts, 2)
+        self.assertFalse(extend_lease(first, 'worker-a', 60))
+
+        first.apply_analysis(RESUME_TEXT, {'ats_score': {'overall_score': 50}})
+        self.assertFalse(complete_job(first, 'worker-a'))
+        self.assertEqual(ResumeAnalysis.objects.get(pk=job.pk).processing_status, 'processing')
+
+    def test_job_over_max_attempts_is_abandoned(self):
+        job = queue_job()
+        ResumeAnalysis.objects.filter(pk=job.pk).update(attempts=3)
+
+        self.assertIsNone(claim_next_job('worker-a', lease_seconds=60, max_attempts=3))
+        job.refresh_from_db()
+        self.assertEqual(job.processing_status, 'failed')
+        self.assertIn('error', ResumeContent.objects.get(resume=job).analysis_results)
+
+    def test_extend_lease_pushes_expiry_forward(self):
+        queue_job()
+        job = claim_next_job('worker-a', lease_seconds=1)
+
+        self.assertTrue(extend_lease(job, 'worker-a', 600))
+        job.refresh_from_db()
+        self.assertGreater(job.lease_expires_at, timezone.now() + timedelta(seconds=500))
+        self.assertFalse(extend_lease(job, 'worker-b', 600))
+
+
+@test_settings
+class KeepLeaseTests(TransactionTestCase):
+    # The renewing thread uses its own connection, so the rows must be committed
+
+    def test_lease_is_renewed_while_the_block_runs(self):
+        queue_job()
+        job = claim_next_job('worker-a', lease_seconds=1)
+
+        with keep_lease(job, 'worker-a', lease_seconds=0.6):
+            time.sleep(1.2)
+            job.refresh_from_db()
+            self.assertGreater(job.lease_expires_at, timezone.now())
+        self.assertIsNone(claim_next_job('worker-b', lease_seconds=60))
+
+
+@test_settings
+@override_settings(ANALYSIS_CACHE_ENABLED=True, ANALYSIS_CACHE_TTL_SECONDS=3600, RETENTION_MAX_AGE_SECONDS=3600)
+class AnalysisCacheTests(TestCase):
+    def test_lookup_hits_only_the_same_file_and_job_description(self):
+        store_analysis('file-a', 'Python  Developer', 'resume text', {'ats_score': {'overall_score': 70}})
+
+        entry = lookup_analysis('file-a', 'python developer')
+        self.assertEqual(entry.analysis_results['ats_score']['overall_score'], 70)
+        self.assertEqual(AnalysisCacheEntry.objects.get(file_hash='file-a').hit_count, 1)
+        self.assertIsNone(lookup_analysis('file-a', 'java developer'))
+        self.assertIsNone(lookup_analysis('file-b', 'python developer'))
+        self.assertEqual(lookup_text('file-a'), 'resume text')
+
+    def test_least_recently_used_entries_are_evicted_above_the_limit(self):
+        with override_settings(ANALYSIS_CACHE_MAX_ENTRIES=2):
+            store_analysis('file-a', '', 'a', {})
+            store_analysis('file-b', '', 'b', {})
+            AnalysisCacheEntry.objects.filter(file_hash='file-a').update(
+                last_used_at=timezone.now() - timedelta(minutes=5)
+            )
+            lookup_analysis('file-a', '')
+            store_analysis('file-c', '', 'c', {})
+
+        self.assertEqual(
+            sorted(AnalysisCacheEntry.objects.values_list('file_hash', flat=True)), ['file-a', 'file-c']
+        )
+
+    def test_entries_expire_with_retention(self):
+        store_analysis('file-a', '', 'a', {})
+        AnalysisCacheEntry.objects.update(created_at=timezone.now() - timedelta(minutes=30))
+
+        with override_settings(RETENTION_MAX_AGE_SECONDS=600):
+            self.assertIsNone(lookup_analysis('file-a', ''))
+            self.assertEqual(evict_entries(), 1)
+        self.assertFalse(AnalysisCacheEntry.objects.exists())
+
+    def test_page_texts_are_bounded_like_results(self):
+        store_page_texts('file-a', {0: 'first page', 1: 'second page'})
+        store_page_texts('file-b', {0: 'other'})
+        PageTextCacheEntry.objects.filter(file_hash='file-b').update(
+            last_used_at=timezone.now() - timedelta(minutes=5)
+        )
+        self.assertEqual(lookup_page_texts('file-a', max_pages=1), {0: 'first page'})
+
+        with override_settings(ANALYSIS_CACHE_MAX_ENTRIES=2):
+            evict_entries()
+        self.assertEqual(lookup_page_texts('file-a'), {0: 'first page', 1: 'second page'})
+        self.assertEqual(lookup_page_texts('file-b'), {})
+
+
+@test_settings
+class ResumeListPaginationTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        ResumeAnalysis.objects.bulk_create([
+            ResumeAnalysis(filename=f'{i}.txt', file=f'resumes/{i}.txt', processing_status='completed')
+            for i in range(7)
+        ])
+        now = timezone.now()
+        for position, resume in enumerate(ResumeAnalysis.objects.order_by('id')):
+            # Pairs of rows share a timestamp, so the id breaks the tie
+            ResumeAnalysis.objects.filter(pk=resume.pk).update(upload_timestamp=now - timedelta(minutes=position // 2))
+
+    def fetch_all(self, limit, **params):
+        ids, cursor = [], None
+        while True:
+            query = {'limit': limit, **params, **({'cursor': cursor} if cursor else {})}
+            page = self.client.get('/api/my-resumes/', query).json()
+            ids += [resume['id'] for resume in page['resumes']]
+            self.assertEqual(page['count'], len(page['resumes']))
+            if not page['has_more']:
+                self.assertIsNone(page['next_cursor'])
+                return ids
+            cursor = page['next_cursor']
+
+    def test_pages_follow_upload_order_without_gaps_or_repeats(self):
+        expected = list(ResumeAnalysis.objects.order_by('-upload_timestamp', '-id').values_list('id', flat=True))
+        for limit in (1, 2, 3, 7, 100):
+            self.assertEqual(self.fetch_all(limit), expected)
+
+    def test_rows_added_between_pages_do_not_shift_the_next_page(self):
+        first = self.client.get('/api/my-resumes/', {'limit': 3}).json()
+        queue_job('newer.txt')
+        rest = self.client.get('/api/my-resumes/', {'limit': 10, 'cursor': first['next_cursor']}).json()
+
+        ids = [resume['id'] for resume in first['resumes'] + rest['resumes']]
+        self.assertEqual(len(ids), 7)
+        self.assertEqual(len(set(ids)), 7)
+
+    def test_invalid_cursor_and_limit_are_rejected(self):
+        with self.assertRaises(InvalidCursor):
+            decode_cursor('not-a-cursor')
+        self.assertEqual(self.client.get('/api/my-resumes/', {'cursor': 'not-a-cursor'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/my-resumes/', {'limit': 0}).status_code, 400)
+
+
+@test_settings
+@override_settings(RETENTION_MAX_AGE_SECONDS=3600, RETENTION_LOCK_SECONDS=60)
+class RetentionTickTests(TestCase):
+    def setUp(self):
+        client = Client()
+        self.expired = [upload(client, RESUME_TEXT + f'\nRef {i}', f'old{i}.txt') for i in range(2)]
+        self.fresh = upload(client, RESUME_TEXT + '\nRef fresh', 'fresh.txt')
+        ResumeAnalysis.objects.filter(id__in=self.expired).update(
+            upload_timestamp=timezone.now() - timedelta(hours=2)
+        )
+
+    def test_tick_deletes_expired_analyses_with_their_content_and_cache(self):
+        result = run_retention_tick('retention-a')
+
+        self.assertEqual(result['records_deleted'], 2)
+        self.assertEqual(list(ResumeAnalysis.objects.values_list('id', flat=True)), [self.fresh])
+        self.assertEqual(list(ResumeContent.objects.values_list('resume_id', flat=True)), [self.fresh])
+        fresh_hash = ResumeAnalysis.objects.get(id=self.fresh).content_hash
+        self.assertEqual(list(AnalysisCacheEntry.objects.values_list('file_hash', flat=True)), [fresh_hash])
+        # The job description is still used by the fresh analysis
+        self.assertEqual(StoredJobDescription.objects.count(), 1)
+
+    def test_only_the_lease_holder_runs_a_tick(self):
+        self.assertTrue(acquire_lock(RETENTION_LOCK, 'retention-a', 60))
+
+        self.assertIsNone(run_retention_tick('retention-b'))
+        self.assertEqual(ResumeAnalysis.objects.count(), 3)
+
+        MaintenanceLock.objects.filter(name=RETENTION_LOCK).update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(run_retention_tick('retention-b')['records_deleted'], 2)
+        self.assertFalse(acquire_lock(RETENTION_LOCK, 'retention-a', 60))
+
+
+class ResumeContentMigrationTests(TransactionTestCase):
+    """Rows written before 0012 end up in ResumeContent and StoredJobDescription"""
+    app = 'resumes'
+    migrate_from = '0011_resume_response_blob'
+
+    def setUp(self):
+        self.executor = MigrationExecutor(connection)
+        self.migrate_to = self.executor.loader.graph.leaf_nodes(self.app)
+        self.executor.migrate([(self.app, self.migrate_from)])
+        self.executor.loader.build_graph()
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.migrate_to)
+
+    def test_forward_migration_moves_text_results_terms_and_job_descriptions(self):
+        old_apps = self.executor.loader.project_state([(self.app, self.migrate_from)]).apps
+        OldResumeAnalysis = old_apps.get_model(self.app, 'ResumeAnalysis')
+        results = {'ats_score': {'overall_score': 72, 'breakdown': {'skills': 60}}, 'extracted_skills': ['Python']}
+        shared = OldResumeAnalysis.objects.create(
+            filename='a.txt', file='resumes/a.txt', processing_status='completed', raw_text=RESUME_TEXT,
+            analysis_results=results, job_description='Python developer', keyword_terms=['python', 'django'],
+        )
+        also_shared = OldResumeAnalysis.objects.create(
+            filename='b.txt', file='resumes/b.txt', processing_status='completed', raw_text='other text',
+            analysis_results={}, job_description='Python developer', keyword_terms=['other'],
+        )
+        without_text = OldResumeAnalysis.objects.create(
+            filename='c.txt', file='resumes/c.txt', processing_status='pending', raw_text=None,
+            analysis_results={}, job_description=None, keyword_terms=[],
+        )
+
+        MigrationExecutor(connection).migrate(self.migrate_to)
+
+        rows = ResumeAnalysis.objects.select_related('content', 'stored_job_description').in_bulk()
+        self.assertEqual(rows[shared.pk].raw_text, RESUME_TEXT)
+        self.assertEqual(rows[shared.pk].analysis_results, results)
+        self.assertEqual(rows[shared.pk].keyword_terms, ['python', 'django'])
+        self.assertEqual(rows[also_shared.pk].keyword_terms, ['other'])
+        self.assertIsNone(rows[without_text.pk].raw_text)
+        self.assertEqual(StoredJobDescription.objects.count(), 1)
+        self.assertEqual(rows[shared.pk].stored_job_description_id, rows[also_shared.pk].stored_job_description_id)
+        self.assertEqual(rows[shared.pk].job_description, 'Python developer')
+        self.assertIsNone(rows[without_text.pk].job_description)
@@ -0,0 +1,113 @@
+"""
+Streaming upload handler.
+
+Django's default handlers keep uploads below FILE_UPLOAD_MAX_MEMORY_SIZE
+entirely in memory, and the analysis code then read the file again to hash
+it. StreamingUploadHandler writes each chunk straight to a temporary file as
+it arrives, hashing and counting bytes on the way, so an upload costs one
+chunk of memory whatever its size. A file larger than UPLOAD_MAX_FILE_SIZE,
+or whose first bytes do not match its extension, is dropped as soon as that
+is known and the rest of its body is discarded instead of stored. Dropped
+files are recorded on the request (see upload_rejections) so views can
+report them.
+
+Saving the upload into a FileField moves the temporary file into storage
+instead of copying it, and the extractors open it by path.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, SkipFile
+
+ALLOWED_EXTENSIONS = ['pdf', 'doc', 'docx', 'txt']
+
+# Leading bytes a file must start with to be parsed as its extension
+MAGIC_NUMBERS = {
+    'pdf': (b'%PDF-',),
+    'docx': (b'PK\x03\x04',),
+    'doc': (b'PK\x03\x04', b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'),
+}
+
+
+def file_size_error():
+    return f"File size cannot exceed {settings.UPLOAD_MAX_FILE_SIZE // (1024 * 1024)}MB"
+
+
+def file_type_error(extension):
+    return f"File type '{extension}' not supported. Allowed types: {ALLOWED_EXTENSIONS}"
+
+
+class HashedUploadedFile(TemporaryUploadedFile):
+    """An upload spooled to a temporary file, with the SHA-256 of its content"""
+    sha256 = ''
+
+
+class StreamingUploadHandler(FileUploadHandler):
+    """Spool uploads to disk while hashing, sizing and checking them"""
+
+    def new_file(self, field_name, file_name, content_type, content_length, charset=None,
+                 content_type_extra=None):
+        super().new_file(field_name, file_name, content_type, content_length, charset,
+                         content_type_extra)
+        # Forget the previous file: on SkipFile the parser closes (and so
+        # deletes) whatever `file` the handler still has
+        self.__dict__.pop('file', None)
+        self.extension = file_name.rsplit('.', 1)[-1].lower() if '.' in file_name else ''
+
+        if self.extension not in ALLOWED_EXTENSIONS:
+            self.reject(file_type_error(self.extension))
+        if content_length and content_length > settings.UPLOAD_MAX_FILE_SIZE:
+            self.reject(file_size_error())
+
+        self.file = HashedUploadedFile(file_name, content_type, 0, charset, content_type_extra)
+        self.digest = hashlib.sha256()
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        if start == 0:
+            magic_numbers = MAGIC_NUMBERS.get(self.extension)
+            if magic_numbers and not raw_data.startswith(magic_numbers):
+                self.reject(f"File content does not match its '.{self.extension}' extension")
+
+        self.received += len(raw_data)
+        if self.received > settings.UPLOAD_MAX_FILE_SIZE:
+            self.reject(file_size_error())
+
+        self.digest.update(raw_data)
+        self.file.write(raw_data)
+
+    def file_complete(self, file_size):
+        self.file.seek(0)
+        self.file.size = file_size
+        self.file.sha256 = self.digest.hexdigest()
+        return self.file
+
+    def upload_interrupted(self):
+        self.discard()
+
+    def discard(self):
+        file = self.__dict__.pop('file', None)
+        if file is not None:
+            # Closing the temporary file deletes it
+            file.close()
+
+    def reject(self, error):
+        """Drop the current file; the parser skips the rest of its body"""
+        self.discard()
+        if not hasattr(self.request, 'upload_rejections'):
+            self.request.upload_rejections = []
+        self.request.upload_rejections.append({
+            'field': self.field_name,
+            'filename': self.file_name,
+            'error': error,
+        })
+        raise SkipFile()
+
+
+def upload_rejections(request, field_name=None):
+    """Files the upload handler dropped while receiving this request (parse request.data first)"""
+    rejections = getattr(request, 'upload_rejections', [])
+    if field_name is None:
+        return list(rejections)
+    return [rejection for rejection in rejections if rejection['field'] == field_name]
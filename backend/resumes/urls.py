@@ -1,10 +1,31 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import async_views, views
+
+# ASGI deployments (Procfile.asgi) serve the hot endpoints with async views
+if settings.ASYNC_VIEWS_ENABLED:
+    upload_view = async_views.upload_resume
+    list_view = async_views.get_my_resumes
+    detail_view = async_views.get_resume_detail
+    events_view = async_views.get_resume_events
+else:
+    upload_view = views.upload_resume
+    list_view = views.get_my_resumes
+    detail_view = views.get_resume_detail
+    events_view = views.get_resume_events
 
 urlpatterns = [
     # API endpoints
-    path('upload/', views.upload_resume, name='upload_resume'),
-    path('my-resumes/', views.get_my_resumes, name='get_my_resumes'),
-    path('resumes/<int:resume_id>/', views.get_resume_detail, name='get_resume_detail'),
+    path('upload/', upload_view, name='upload_resume'),
+    path('shortlist/', views.shortlist_resumes_view, name='shortlist_resumes'),
+    path('match/', views.match_resumes_view, name='match_resumes'),
+    path('analyze-job/', views.analyze_job, name='analyze_job'),
+    path('my-resumes/', list_view, name='get_my_resumes'),
+    path('resumes/<int:resume_id>/', detail_view, name='get_resume_detail'),
+    path('resumes/<int:resume_id>/analysis/', views.get_resume_analysis, name='get_resume_analysis'),
+    path('resumes/<int:resume_id>/events/', events_view, name='get_resume_events'),
     path('cleanup/', views.cleanup_files, name='cleanup_files'),
+    path('cache/stats/', views.get_analysis_cache_stats, name='get_analysis_cache_stats'),
+    path('admission/stats/', views.get_admission_stats_view, name='get_admission_stats'),
+    path('metrics', views.metrics_view, name='metrics'),
 ]
@@ -1,130 +1,294 @@
-from rest_framework import status, viewsets
+from rest_framework import status
 from rest_framework.decorators import api_view, parser_classes
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.response import Response
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
 from django.conf import settings
-import os
-import PyPDF2
-import docx
-import io
-import json
-import shutil
-import re
-from datetime import datetime, timedelta
-
-from .models import ResumeAnalysis
-from .serializers import ResumeAnalysisSerializer, ResumeUploadSerializer, ResumeListSerializer
-
+from django.urls import reverse
+import logging
+from contextlib import nullcontext
+
+from .admission import AdmissionRejected, get_admission_stats, read_limiter, upload_limiter
+from .analysis_cache import (
+    get_cache_stats, hash_uploaded_file, lookup_analysis, lookup_text, store_analysis
+)
+from .analyzer import analyze_resume_with_ai, rescore_for_job
+from .batch import shortlist_resumes
+from .extraction import extract_text_from_file
+from .features import keyword_terms
+from .jobs import make_worker_id
+from .metrics import render_metrics, stage_timer
+from .models import ResumeAnalysis, ResumeContent
+from .pagination import InvalidListQuery, filter_resumes, paginate_resumes
+from .profiling import profiled
+from .progress import (
+    event_stream, final_progress_event, initial_progress, notify_progress, parse_last_event_id,
+    publish_progress,
+)
+from .response_blobs import BLOB_FIELDS, analysis_response, build_analysis_response, store_response_blob
+from .response_cache import build_detail_entry, cache_headers, entry_response, get_detail_entry, not_modified
+from .retention import RETENTION_LOCK, release_lock, run_retention_tick
+from .search import index_resumes, match_resumes
+from .selection import (
+    ANALYSIS_COMPACT_EXCLUDE, ANALYSIS_FIELDS, DETAIL_COMPACT_EXCLUDE, DETAIL_FIELDS, InvalidFieldSelection,
+    parse_field_selection, selected_etag,
+)
+from .serializers import ResumeAnalysisSerializer
+from .uploads import upload_rejections
+
+logger = logging.getLogger(__name__)
+
+# Everything the detail serializer reads, in one query (the response blob is not needed)
+DETAIL_QUERYSET = ResumeAnalysis.objects.defer('response_blob').select_related('content', 'stored_job_description')
+
+
+@profiled
 @api_view(['POST'])
 @parser_classes([MultiPartParser, FormParser])
 def upload_resume(request):
     """Upload and analyze a resume"""
     try:
-        print(f"Received upload request with data: {list(request.data.keys())}")
+        try:
+            selection = parse_field_selection(request.query_params, ANALYSIS_FIELDS, ANALYSIS_COMPACT_EXCLUDE)
+        except InvalidFieldSelection as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        with stage_timer('upload_receive'):
+            data = request.data
+        logger.info('upload received', extra={'fields': list(data.keys())})
+
+        # Files rejected while streaming in (too large, wrong type or content)
+        rejected = upload_rejections(request, 'file')
+        if rejected and 'file' not in data:
+            return Response(
+                {'error': rejected[0]['error']},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
         # Check if file is provided
-        if 'file' not in request.data:
+        if 'file' not in data:
             return Response(
                 {'error': 'No file provided'},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        file = request.data['file']
-        job_description = request.data.get('job_description', '')
+        file = data['file']
+        job_description = data.get('job_description', '')
+        run_async = wants_async_analysis(request, data)
+
+        # Identical file + job description already analyzed: reuse the result
+        content_hash = hash_uploaded_file(file)
+        cached = lookup_analysis(content_hash, job_description)
+
+        # Only uploads analyzed in this request take an analysis slot
+        analyze_here = cached is None and not run_async
+        queued = run_async and cached is None
+        with upload_limiter.admit() if analyze_here else nullcontext():
+            # Create resume analysis record
+            with stage_timer('store'):
+                resume_analysis = ResumeAnalysis.objects.create(
+                    filename=file.name,
+                    file=file,
+                    job_description=job_description,
+                    file_size=file.size,
+                    content_hash=content_hash,
+                    processing_status='pending' if queued else 'processing',
+                    progress=initial_progress('queued' if queued else 'received')
+                )
+            notify_progress(resume_analysis.pk, resume_analysis.progress, stored=True)
+
+            # In async mode a worker (manage.py run_analysis_worker) picks the row up
+            if queued:
+                return Response(build_queued_response(request, resume_analysis), status=status.HTTP_202_ACCEPTED)
+
+            if cached is not None:
+                apply_cached_analysis(resume_analysis, cached)
+            else:
+                run_resume_analysis(resume_analysis)
+        final_event = final_progress_event(resume_analysis)
+        # Encoded once here; reads of the analysis send the same bytes
+        with stage_timer('serialize'):
+            response_data = build_analysis_response(resume_analysis)
+            store_response_blob(resume_analysis, response_data)
+        with stage_timer('save'):
+            resume_analysis.save()
+        notify_progress(resume_analysis.pk, final_event, stored=True)
+        if resume_analysis.processing_status == 'completed':
+            index_resumes([(resume_analysis.pk, resume_analysis.raw_text)])
+        log_analysis(resume_analysis, cached is not None)
+
+        return analysis_response(request, resume_analysis, selection, response_data, status=status.HTTP_201_CREATED)
+
+    except AdmissionRejected as e:
+        return busy_response(e)
+    except Exception as e:
+        logger.exception('upload failed')
+        return Response(
+            {'error': f'Upload failed: {str(e)}'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
 
-        # Clean up old files before processing new upload
-        cleanup_result = cleanup_current_session_files()
-        print(f"Pre-upload cleanup: {cleanup_result}")
-
-        # Create resume analysis record
-        resume_analysis = ResumeAnalysis.objects.create(
-            filename=file.name,
-            file=file,
-            job_description=job_description,
-            file_size=file.size,
-            processing_status='processing'
+def busy_response(rejection):
+    """503 for a request refused by admission control"""
+    return Response(
+        {'error': str(rejection)},
+        status=status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={'Retry-After': str(rejection.retry_after)}
+    )
+
+def wants_async_analysis(request, data):
+    """Check whether the upload should be queued instead of analyzed inline"""
+    flag = request.GET.get('async', data.get('async'))
+    if flag is None:
+        return settings.RESUME_ANALYSIS_ASYNC
+    return str(flag).lower() in ('1', 'true', 'yes')
+
+def build_queued_response(request, resume_analysis):
+    """Response body for an upload queued for the background worker"""
+    return {
+        'id': resume_analysis.pk,
+        'filename': resume_analysis.filename,
+        'message': 'Resume queued for analysis',
+        'processing_status': resume_analysis.processing_status,
+        'status_url': request.build_absolute_uri(
+            reverse('get_resume_detail', args=[resume_analysis.pk])
+        ),
+        'events_url': request.build_absolute_uri(
+            reverse('get_resume_events', args=[resume_analysis.pk])
         )
+    }
 
-        # Extract text from uploaded file
-        try:
-            extracted_text = extract_text_from_file(resume_analysis.file)
-            resume_analysis.raw_text = extracted_text
+def apply_cached_analysis(resume_analysis, cached):
+    """Copy a cached analysis onto a resume record (not saved)"""
+    resume_analysis.apply_analysis(cached.raw_text, cached.analysis_results)
+    return resume_analysis
 
-            # Perform AI analysis
+def run_resume_analysis(resume_analysis):
+    """Extract text and analyze a stored resume, updating the record in place (not saved)"""
+    try:
+        # The same file may have been extracted before for another job description
+        cached_text = lookup_text(resume_analysis.content_hash)
+        if cached_text is not None:
+            extraction = {'text': cached_text, 'cached': True}
+        else:
+            publish_progress(resume_analysis, 'extracting')
+            extraction = extract_text_from_file(
+                resume_analysis.file,
+                resume_analysis.content_hash,
+                on_page=lambda page, pages: publish_progress(resume_analysis, 'extracting', page=page, pages=pages)
+            )
+        extracted_text = extraction.pop('text')
+
+        # Perform AI analysis
+        publish_progress(resume_analysis, 'scoring')
+        with stage_timer('analyze'):
             analysis_results = analyze_resume_with_ai(
                 extracted_text,
                 resume_analysis.job_description
             )
 
-            resume_analysis.analysis_results = analysis_results
-            resume_analysis.ats_score = analysis_results.get('ats_score', {}).get('overall_score', 0)
-            resume_analysis.job_match_score = analysis_results.get('job_match_score', 0)
-            resume_analysis.processing_status = 'completed'
-
-        except Exception as e:
-            resume_analysis.processing_status = 'failed'
-            resume_analysis.analysis_results = {'error': str(e)}
-
-        resume_analysis.save()
-
-        # Format response to match frontend expectations
-        analysis_results = resume_analysis.analysis_results or {}
-
-        response_data = {
-            'id': resume_analysis.pk,
-            'filename': resume_analysis.filename,
-            'message': 'Resume analyzed successfully',
-            'analysis_result': {
-                'ats_score': {
-                    'total_score': analysis_results.get('ats_score', {}).get('overall_score', resume_analysis.ats_score or 0),
-                    'components': analysis_results.get('ats_score', {}).get('breakdown', {}),
-                    'grade': 'A' if (resume_analysis.ats_score or 0) >= 80 else 'B' if (resume_analysis.ats_score or 0) >= 60 else 'C'
-                },
-                'suggestions': analysis_results.get('suggestions', []),
-                'extracted_skills': analysis_results.get('extracted_skills', []),
-                'analysis_summary': {
-                    'total_skills': len(analysis_results.get('extracted_skills', [])),
-                    'has_contact_info': True,
-                    'has_experience': True,
-                    'has_education': True,
-                    'word_count': len((resume_analysis.raw_text or '').split()),
-                    'section_count': 5
-                },
-                'text_quality': analysis_results.get('text_quality', {}),
-                'text_content': resume_analysis.raw_text,
-                'job_match_score': analysis_results.get('job_match_score')
-            }
-        }
-
-        return Response(response_data, status=status.HTTP_201_CREATED)
+        analysis_results['extraction'] = extraction
+        resume_analysis.apply_analysis(extracted_text, analysis_results)
 
-    except Exception as e:
-        return Response(
-            {'error': f'Upload failed: {str(e)}'},
-            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        store_analysis(
+            resume_analysis.content_hash,
+            resume_analysis.job_description,
+            extracted_text,
+            analysis_results
         )
 
-@api_view(['GET'])
-def get_my_resumes(request):
-    """Get all resume analyses"""
+    except Exception as e:
+        logger.warning('analysis failed', extra={'resume_id': resume_analysis.pk, 'error': str(e)})
+        resume_analysis.processing_status = 'failed'
+        resume_analysis.analysis_results = {'error': str(e)}
+
+    return resume_analysis
+
+def log_analysis(resume_analysis, cached):
+    logger.info('upload analyzed', extra={
+        'resume_id': resume_analysis.pk,
+        'file_size': resume_analysis.file_size,
+        'processing_status': resume_analysis.processing_status,
+        'ats_score': resume_analysis.ats_score,
+        'cached': cached,
+    })
+
+@api_view(['POST'])
+@parser_classes([MultiPartParser, FormParser])
+def shortlist_resumes_view(request):
+    """Analyze many resumes against one job description and rank them"""
     try:
-        resumes = ResumeAnalysis.objects.all()
-        serializer = ResumeListSerializer(resumes, many=True)
-        return Response(serializer.data)
+        files = request.FILES.getlist('files')
+        job_description = request.data.get('job_description', '')
+        rejected = upload_rejections(request, 'files')
+
+        if not files and not rejected:
+            return Response(
+                {'error': 'No files provided'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not job_description.strip():
+            return Response(
+                {'error': 'A job description is required for shortlisting'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(files) + len(rejected) > settings.SHORTLIST_MAX_FILES:
+            return Response(
+                {'error': f'Too many files: at most {settings.SHORTLIST_MAX_FILES} per batch'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        with upload_limiter.admit():
+            result = shortlist_resumes(files, job_description, rejected)
+        return Response(result, status=status.HTTP_201_CREATED)
+
+    except AdmissionRejected as e:
+        return busy_response(e)
     except Exception as e:
         return Response(
-            {'error': f'Failed to fetch resumes: {str(e)}'},
+            {'error': f'Shortlist failed: {str(e)}'},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
-@api_view(['GET'])
-def get_resume_detail(request, resume_id):
-    """Get detailed analysis for a specific resume"""
+@api_view(['POST'])
+def analyze_job(request):
+    """Re-score a stored resume against a new job description without re-uploading"""
     try:
-        resume = ResumeAnalysis.objects.get(id=resume_id)
-        serializer = ResumeAnalysisSerializer(resume)
-        return Response(serializer.data)
+        try:
+            resume_id = int(request.data.get('resume_id'))
+        except (TypeError, ValueError):
+            return Response(
+                {'error': 'A valid resume_id is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        job_description = request.data.get('job_description', '')
+
+        # raw_text and the file are never loaded; the stored terms are enough
+        resume = ResumeAnalysis.objects.select_related('content').only(
+            'id', 'filename', 'processing_status', 'ats_score', 'content__keyword_terms', 'content__analysis_results'
+        ).get(id=resume_id)
+
+        if resume.processing_status != 'completed':
+            return Response(
+                {'error': f'Resume analysis is {resume.processing_status}, not completed'},
+                status=status.HTTP_409_CONFLICT
+            )
+
+        terms = resume.keyword_terms
+        if not terms:
+            # Rows analyzed before terms were stored: derive them once and keep them
+            terms = keyword_terms(ResumeContent.objects.values_list('raw_text', flat=True).get(resume_id=resume_id))
+            ResumeContent.objects.filter(resume_id=resume_id).update(keyword_terms=terms)
+
+        analysis_results = rescore_for_job(resume.analysis_results, terms, job_description)
+        resume.analysis_results = analysis_results
+        resume.ats_score = analysis_results['ats_score']['overall_score']
+
+        response_data = build_analysis_response(resume, include_text=False)
+        response_data['message'] = 'Resume re-scored against job description'
+        return Response(response_data)
+
     except ResumeAnalysis.DoesNotExist:
         return Response(
             {'error': 'Resume not found'},
@@ -132,479 +296,190 @@ def get_resume_detail(request, resume_id):
         )
     except Exception as e:
         return Response(
-            {'error': f'Failed to fetch resume: {str(e)}'},
+            {'error': f'Re-scoring failed: {str(e)}'},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
-def extract_text_from_file(file):
-    """Extract text from uploaded file based on file type"""
-    file_extension = file.name.split('.')[-1].lower()
-
-    if file_extension == 'pdf':
-        return extract_text_from_pdf(file)
-    elif file_extension in ['docx', 'doc']:
-        return extract_text_from_docx(file)
-    elif file_extension == 'txt':
-        return file.read().decode('utf-8')
-    else:
-        raise ValueError(f"Unsupported file type: {file_extension}")
-
-def extract_text_from_pdf(file):
-    """Extract text from PDF file"""
+@api_view(['POST'])
+def match_resumes_view(request):
+    """Rank every stored resume against a job description using the term index"""
     try:
-        pdf_reader = PyPDF2.PdfReader(io.BytesIO(file.read()))
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text() + "\n"
-        return text.strip()
+        job_description = request.data.get('job_description', '')
+        if not job_description.strip():
+            return Response(
+                {'error': 'job_description is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            top_k = int(request.data.get('top_k', settings.MATCH_DEFAULT_TOP_K))
+        except (TypeError, ValueError):
+            top_k = 0
+        if not 1 <= top_k <= settings.MATCH_MAX_TOP_K:
+            return Response(
+                {'error': f'top_k must be between 1 and {settings.MATCH_MAX_TOP_K}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return Response(match_resumes(job_description, top_k))
+
     except Exception as e:
-        raise ValueError(f"Error reading PDF: {str(e)}")
+        return Response(
+            {'error': f'Matching failed: {str(e)}'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
 
-def extract_text_from_docx(file):
-    """Extract text from DOCX file"""
+@api_view(['GET'])
+def get_my_resumes(request):
+    """List resume analyses newest first, one keyset-paginated page at a time"""
     try:
-        doc = docx.Document(io.BytesIO(file.read()))
-        text = ""
-        for paragraph in doc.paragraphs:
-            text += paragraph.text + "\n"
-        return text.strip()
+        params = request.query_params
+        try:
+            resumes, limit = filter_resumes(params, ResumeAnalysis.objects.all())
+            with read_limiter.admit():
+                page = paginate_resumes(resumes, params.get('cursor'), limit)
+        except InvalidListQuery as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(page)
+    except AdmissionRejected as e:
+        return busy_response(e)
     except Exception as e:
-        raise ValueError(f"Error reading DOCX: {str(e)}")
+        return Response(
+            {'error': f'Failed to fetch resumes: {str(e)}'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
 
-def analyze_resume_with_ai(resume_text, job_description=None):
-    """Analyze resume using rule-based analysis (no API required)"""
+@api_view(['GET'])
+def get_analysis_cache_stats(request):
+    """Hit/miss counters and size of the analysis result cache"""
     try:
-        # Convert text to lowercase for analysis
-        text_lower = resume_text.lower()
-
-        # Basic text statistics
-        words = resume_text.split()
-        word_count = len(words)
-
-        # Calculate formatting score
-        formatting_score = calculate_formatting_score(resume_text)
-
-        # Extract and score skills
-        skills = extract_skills(text_lower)
-        skills_score = min(100, len(skills) * 10)  # 10 points per skill, max 100
-
-        # Calculate experience score
-        experience_score = calculate_experience_score(text_lower)
-
-        # Calculate keyword score
-        keywords_score = calculate_keywords_score(text_lower, job_description)
-
-        # Calculate overall ATS score
-        overall_score = (formatting_score + skills_score + experience_score + keywords_score) // 4
-
-        # Calculate text quality metrics
-        text_quality = calculate_text_quality(resume_text, word_count)
-
-        # Generate suggestions
-        suggestions = generate_suggestions(resume_text, skills, experience_score, formatting_score)
-
-        # Calculate job match score if job description provided
-        job_match_score = calculate_job_match_score(text_lower, job_description) if job_description else None
-
-        return {
-            "ats_score": {
-                "overall_score": overall_score,
-                "breakdown": {
-                    "keywords": keywords_score,
-                    "formatting": formatting_score,
-                    "experience": experience_score,
-                    "skills": skills_score
-                }
-            },
-            "extracted_skills": skills,
-            "suggestions": suggestions,
-            "job_match_score": job_match_score,
-            "text_quality": text_quality
-        }
-
+        return Response(get_cache_stats())
     except Exception as e:
-        # Return a basic analysis if anything fails
-        return {
-            "ats_score": {
-                "overall_score": 60,
-                "breakdown": {
-                    "keywords": 60,
-                    "formatting": 70,
-                    "experience": 60,
-                    "skills": 60
-                }
-            },
-            "extracted_skills": ["Communication", "Teamwork", "Problem Solving"],
-            "suggestions": [
-                {
-                    "type": "important",
-                    "category": "Analysis",
-                    "suggestion": f"Basic analysis completed. Error: {str(e)}",
-                    "impact": "Medium"
-                }
-            ],
-            "job_match_score": None,
-            "text_quality": {
-                "word_count": len(resume_text.split()) if resume_text else 0,
-                "readability": "Basic"
-            }
-        }
-
-def calculate_formatting_score(text):
-    """Calculate formatting score based on resume structure"""
-    score = 50  # Base score
-
-    # Check for common resume sections
-    sections = ['experience', 'education', 'skills', 'summary', 'objective', 'projects', 'contact']
-    text_lower = text.lower()
-
-    for section in sections:
-        if section in text_lower:
-            score += 8
-
-    # Check for email
-    if '@' in text:
-        score += 10
-
-    # Check for phone number patterns
-    import re
-    if re.search(r'\b\d{3}[-.\s]?\d{3}[-.\s]?\d{4}\b', text):
-        score += 10
-
-    # Check for bullet points or structure
-    if '•' in text or '-' in text or '*' in text:
-        score += 10
-
-    return min(100, score)
-
-def extract_skills(text_lower):
-    """Extract skills from resume text"""
-    # Common technical and soft skills
-    skill_keywords = [
-        'python', 'java', 'javascript', 'react', 'angular', 'vue', 'node.js', 'express',
-        'html', 'css', 'sql', 'mysql', 'postgresql', 'mongodb', 'redis',
-        'git', 'github', 'docker', 'kubernetes', 'aws', 'azure', 'gcp',
-        'machine learning', 'ai', 'data science', 'analytics', 'tableau', 'power bi',
-        'project management', 'agile', 'scrum', 'leadership', 'communication',
-        'teamwork', 'problem solving', 'critical thinking', 'time management',
-        'microsoft office', 'excel', 'powerpoint', 'word', 'photoshop', 'illustrator'
-    ]
-
-    found_skills = []
-    for skill in skill_keywords:
-        if skill in text_lower:
-            found_skills.append(skill.title())
-
-    # Add some default soft skills if none found
-    if not found_skills:
-        found_skills = ['Communication', 'Teamwork', 'Problem Solving']
-
-    return list(set(found_skills[:10]))  # Return unique skills, max 10
-
-def calculate_experience_score(text_lower):
-    """Calculate experience score based on text content"""
-    score = 40  # Base score
-
-    # Look for experience indicators
-    experience_words = ['experience', 'worked', 'developed', 'managed', 'led', 'created',
-                       'implemented', 'designed', 'built', 'achieved', 'improved']
-
-    for word in experience_words:
-        if word in text_lower:
-            score += 6
-
-    # Look for years of experience
-    import re
-    years_pattern = r'\b(\d+)\s*(?:years?|yrs?)\b'
-    years_matches = re.findall(years_pattern, text_lower)
-    if years_matches:
-        max_years = max([int(y) for y in years_matches])
-        score += min(30, max_years * 3)  # 3 points per year, max 30
-
-    return min(100, score)
-
-def calculate_keywords_score(text_lower, job_description=None):
-    """Calculate keyword score"""
-    score = 60  # Base score
-
-    if job_description:
-        job_words = set(job_description.lower().split())
-        resume_words = set(text_lower.split())
-
-        # Find common words (excluding common stop words)
-        stop_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by'}
-        job_keywords = job_words - stop_words
-        common_keywords = job_keywords.intersection(resume_words)
-
-        # Score based on keyword match percentage
-        if job_keywords:
-            match_percentage = len(common_keywords) / len(job_keywords)
-            score = min(100, 40 + (match_percentage * 60))
-
-    return int(score)
-
-def calculate_job_match_score(text_lower, job_description):
-    """Calculate job match score"""
-    if not job_description:
-        return None
-
-    return calculate_keywords_score(text_lower, job_description)
-
-def calculate_text_quality(resume_text, word_count):
-    """Calculate comprehensive text quality metrics"""
-    # Calculate basic readability metrics
-    sentences = resume_text.count('.') + resume_text.count('!') + resume_text.count('?')
-    sentences = max(1, sentences)  # Avoid division by zero
-
-    # Estimate syllables (rough approximation)
-    import re
-    words = resume_text.lower().split()
-    syllable_count = 0
-    for word in words:
-        # Remove punctuation and count vowel groups
-        clean_word = re.sub(r'[^a-z]', '', word)
-        if clean_word:
-            vowel_groups = len(re.findall(r'[aeiouy]+', clean_word))
-            syllable_count += max(1, vowel_groups)
-
-    # Calculate Flesch Reading Ease (simplified)
-    avg_sentence_length = word_count / sentences
-    avg_syllables_per_word = syllable_count / max(1, word_count)
-    flesch_score = 206.835 - (1.015 * avg_sentence_length) - (84.6 * avg_syllables_per_word)
-    flesch_score = max(0, min(100, flesch_score))  # Clamp between 0-100
-
-    # Calculate Flesch-Kincaid Grade Level
-    flesch_kincaid = (0.39 * avg_sentence_length) + (11.8 * avg_syllables_per_word) - 15.59
-    flesch_kincaid = max(1, flesch_kincaid)
-
-    # Determine readability level
-    if flesch_score >= 90:
-        readability_level = "Very Easy"
-    elif flesch_score >= 80:
-        readability_level = "Easy"
-    elif flesch_score >= 70:
-        readability_level = "Fairly Easy"
-    elif flesch_score >= 60:
-        readability_level = "Standard"
-    elif flesch_score >= 50:
-        readability_level = "Fairly Difficult"
-    elif flesch_score >= 30:
-        readability_level = "Difficult"
-    else:
-        readability_level = "Very Difficult"
-
-    # Calculate average word length
-    avg_word_length = sum(len(word.strip('.,!?;:')) for word in words) / max(1, len(words))
-
-    # Calculate quality score (0-100)
-    quality_score = 60  # Base score
-
-    # Adjust based on readability
-    if 60 <= flesch_score <= 80:  # Ideal range for professional documents
-        quality_score += 20
-    elif flesch_score < 30 or flesch_score > 90:
-        quality_score -= 10
-
-    # Adjust based on word count
-    if 200 <= word_count <= 800:  # Ideal resume length
-        quality_score += 10
-    elif word_count < 100:
-        quality_score -= 20
-
-    # Generate quality recommendations
-    recommendations = []
-
-    if flesch_score < 50:
-        recommendations.append({
-            "type": "readability",
-            "category": "Text Complexity",
-            "message": "Consider using shorter sentences and simpler words to improve readability",
-            "priority": "medium"
-        })
-
-    if word_count < 150:
-        recommendations.append({
-            "type": "content",
-            "category": "Resume Length",
-            "message": "Your resume may be too short. Consider adding more details about your experience",
-            "priority": "high"
-        })
-    elif word_count > 1000:
-        recommendations.append({
-            "type": "content",
-            "category": "Resume Length",
-            "message": "Your resume may be too long. Consider condensing to the most relevant information",
-            "priority": "medium"
-        })
-
-    if avg_word_length > 6:
-        recommendations.append({
-            "type": "vocabulary",
-            "category": "Word Choice",
-            "message": "Try using more concise language to improve clarity",
-            "priority": "low"
-        })
-
-    return {
-        "grammar_errors": [],  # We don't have grammar checking in free version
-        "error_count": 0,
-        "readability": {
-            "flesch_reading_ease": round(flesch_score, 1),
-            "flesch_kincaid_grade": round(flesch_kincaid, 1),
-            "readability_level": readability_level,
-            "word_count": word_count,
-            "sentence_count": sentences,
-            "syllable_count": syllable_count
-        },
-        "word_count": word_count,
-        "avg_word_length": round(avg_word_length, 1),
-        "quality_score": min(100, max(0, quality_score)),
-        "recommendations": recommendations
-    }
+        return Response(
+            {'error': f'Failed to fetch cache stats: {str(e)}'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
 
-def generate_suggestions(resume_text, skills, experience_score, formatting_score):
-    """Generate improvement suggestions"""
-    suggestions = []
-
-    if formatting_score < 70:
-        suggestions.append({
-            "type": "important",
-            "category": "Formatting",
-            "suggestion": "Improve resume formatting by adding clear sections and contact information",
-            "impact": "High"
-        })
-
-    if len(skills) < 5:
-        suggestions.append({
-            "type": "moderate",
-            "category": "Skills",
-            "suggestion": "Add more relevant technical and soft skills to improve ATS compatibility",
-            "impact": "Medium"
-        })
-
-    if experience_score < 60:
-        suggestions.append({
-            "type": "important",
-            "category": "Experience",
-            "suggestion": "Add more specific experience details with action verbs and achievements",
-            "impact": "High"
-        })
-
-    # Always add some general suggestions
-    suggestions.extend([
-        {
-            "type": "moderate",
-            "category": "Content",
-            "suggestion": "Quantify achievements with numbers and metrics where possible",
-            "impact": "Medium"
-        },
-        {
-            "type": "moderate",
-            "category": "Keywords",
-            "suggestion": "Include industry-specific keywords relevant to your target role",
-            "impact": "Medium"
-        }
-    ])
-
-    return suggestions[:5]  # Return max 5 suggestions
-
-def cleanup_old_files():
-    """Clean up old uploaded files and database records"""
+@api_view(['GET'])
+def get_admission_stats_view(request):
+    """In-flight requests and queue depths of the admission limiters, and the process answering"""
     try:
-        # Get media directory path
-        media_dir = os.path.join(settings.BASE_DIR, 'media')
-        uploads_dir = os.path.join(media_dir, 'uploads')
-
-        print(f"Starting cleanup of old files in {uploads_dir}")
-
-        # Clean up files older than 1 hour (for development)
-        # In production, you might want to make this longer
-        cutoff_time = datetime.now() - timedelta(hours=1)
-
-        # Clean up database records first
-        old_analyses = ResumeAnalysis.objects.filter(
-            upload_timestamp__lt=cutoff_time
+        return Response(get_admission_stats())
+    except Exception as e:
+        return Response(
+            {'error': f'Failed to fetch admission stats: {str(e)}'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
-        # Delete associated files before deleting database records
-        files_deleted = 0
-        for analysis in old_analyses:
-            if analysis.file and os.path.exists(analysis.file.path):
-                try:
-                    os.remove(analysis.file.path)
-                    files_deleted += 1
-                    print(f"Deleted file: {analysis.file.path}")
-                except Exception as e:
-                    print(f"Error deleting file {analysis.file.path}: {str(e)}")
-
-        # Delete database records
-        records_deleted = old_analyses.count()
-        old_analyses.delete()
-
-        # Clean up any orphaned files in uploads directory
-        orphaned_files = 0
-        if os.path.exists(uploads_dir):
-            for filename in os.listdir(uploads_dir):
-                file_path = os.path.join(uploads_dir, filename)
-                if os.path.isfile(file_path):
-                    file_time = datetime.fromtimestamp(os.path.getmtime(file_path))
-                    if file_time < cutoff_time:
-                        try:
-                            os.remove(file_path)
-                            orphaned_files += 1
-                            print(f"Deleted orphaned file: {file_path}")
-                        except Exception as e:
-                            print(f"Error deleting orphaned file {file_path}: {str(e)}")
-
-        print(f"Cleanup completed: {records_deleted} records, {files_deleted} associated files, {orphaned_files} orphaned files deleted")
-        return {
-            'records_deleted': records_deleted,
-            'files_deleted': files_deleted,
-            'orphaned_files': orphaned_files
-        }
+@require_GET
+def metrics_view(request):
+    """Prometheus metrics of every server process"""
+    body, content_type = render_metrics()
+    return HttpResponse(body, content_type=content_type)
 
+@api_view(['GET'])
+def get_resume_detail(request, resume_id):
+    """Get detailed analysis for a specific resume"""
+    try:
+        try:
+            selection = parse_field_selection(request.query_params, DETAIL_FIELDS, DETAIL_COMPACT_EXCLUDE)
+        except InvalidFieldSelection as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Finished analyses are served from the response cache without a query
+        entry = get_detail_entry(resume_id)
+        if entry is None:
+            with read_limiter.admit():
+                resume = DETAIL_QUERYSET.get(id=resume_id)
+                serializer = ResumeAnalysisSerializer(resume)
+                entry = build_detail_entry(resume, serializer.data)
+        return entry_response(request, entry, selection)
+    except ResumeAnalysis.DoesNotExist:
+        return Response(
+            {'error': 'Resume not found'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    except AdmissionRejected as e:
+        return busy_response(e)
     except Exception as e:
-        print(f"Error during cleanup: {str(e)}")
-        return {'error': str(e)}
+        return Response(
+            {'error': f'Failed to fetch resume: {str(e)}'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
 
-def cleanup_current_session_files():
-    """Clean up files from current session (less aggressive cleanup)"""
+@api_view(['GET'])
+def get_resume_analysis(request, resume_id):
+    """Pre-rendered analysis result of a finished resume (same body as the upload response)"""
     try:
-        # Clean up files older than 10 minutes for current session
-        cutoff_time = datetime.now() - timedelta(minutes=10)
-
-        old_analyses = ResumeAnalysis.objects.filter(
-            upload_timestamp__lt=cutoff_time
+        try:
+            selection = parse_field_selection(request.query_params, ANALYSIS_FIELDS, ANALYSIS_COMPACT_EXCLUDE)
+        except InvalidFieldSelection as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        with read_limiter.admit():
+            resume = ResumeAnalysis.objects.only(*BLOB_FIELDS).get(id=resume_id)
+            if resume.processing_status not in ('completed', 'failed'):
+                return Response(
+                    {'error': f'Resume analysis is {resume.processing_status}, not finished'},
+                    status=status.HTTP_409_CONFLICT
+                )
+
+            headers = cache_headers(resume)
+            headers['ETag'] = selected_etag(headers['ETag'], selection)
+            if not_modified(request, headers):
+                return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+            if resume.response_blob is None:
+                # Analyses finished before responses were pre-rendered: render once and keep it
+                resume = ResumeAnalysis.objects.get(id=resume_id)
+                store_response_blob(resume, build_analysis_response(resume))
+                ResumeAnalysis.objects.filter(id=resume_id).update(
+                    response_blob=resume.response_blob,
+                    response_blob_encoding=resume.response_blob_encoding
+                )
+            if selection.includes('text_content') and not ResumeAnalysis.content.is_cached(resume):
+                # Read only for responses that include it, so 304s never load the text
+                resume.content = ResumeContent.objects.only('raw_text').filter(resume_id=resume_id).first()
+            return analysis_response(request, resume, selection, headers=headers)
+    except ResumeAnalysis.DoesNotExist:
+        return Response(
+            {'error': 'Resume not found'},
+            status=status.HTTP_404_NOT_FOUND
         )
-
-        files_deleted = 0
-        for analysis in old_analyses:
-            if analysis.file and os.path.exists(analysis.file.path):
-                try:
-                    os.remove(analysis.file.path)
-                    files_deleted += 1
-                    print(f"Session cleanup - deleted file: {analysis.file.path}")
-                except Exception as e:
-                    print(f"Error deleting file {analysis.file.path}: {str(e)}")
-
-        records_deleted = old_analyses.count()
-        old_analyses.delete()
-
-        print(f"Session cleanup completed: {records_deleted} records, {files_deleted} files deleted")
-        return {
-            'records_deleted': records_deleted,
-            'files_deleted': files_deleted
-        }
-
+    except AdmissionRejected as e:
+        return busy_response(e)
     except Exception as e:
-        print(f"Error during session cleanup: {str(e)}")
-        return {'error': str(e)}
+        return Response(
+            {'error': f'Failed to fetch analysis: {str(e)}'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+@require_GET
+def get_resume_events(request, resume_id):
+    """Server-sent events following the progress of one analysis until it finishes"""
+    if not ResumeAnalysis.objects.filter(id=resume_id).exists():
+        return JsonResponse({'error': 'Resume not found'}, status=404)
+    response = StreamingHttpResponse(
+        event_stream(resume_id, parse_last_event_id(request)),
+        content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    # Keep reverse proxies (nginx) from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
 
 @api_view(['POST'])
 def cleanup_files(request):
-    """Manual cleanup endpoint"""
+    """Manual cleanup endpoint: run one bounded retention pass now"""
+    owner = make_worker_id()
     try:
-        cleanup_result = cleanup_old_files()
+        cleanup_result = run_retention_tick(owner)
+        if cleanup_result is None:
+            return Response(
+                {'error': 'A retention pass is already running'},
+                status=status.HTTP_409_CONFLICT
+            )
         return Response({
             'message': 'Cleanup completed successfully',
             'details': cleanup_result
@@ -614,3 +489,5 @@ def cleanup_files(request):
             {'error': f'Cleanup failed: {str(e)}'},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
+    finally:
+        release_lock(RETENTION_LOCK, owner)
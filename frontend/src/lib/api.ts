@@ -2,6 +2,7 @@ import type {
   ErrorResponse,
   JobDescriptionRequest,
   ResumeListResponse,
+  ResumeListParams,
   ResumeUploadResponse,
 } from '@/types';
 import axios from 'axios';
@@ -76,9 +77,9 @@ export const resumeAPI = {
     return response.data;
   },
 
-  // Get all resumes
-  getResumes: async (): Promise<ResumeListResponse[]> => {
-    const response = await apiClient.get<ResumeListResponse[]>('/api/my-resumes/');
+  // Get one page of resumes (pass next_cursor back to fetch the following page)
+  getResumes: async (params: ResumeListParams = {}): Promise<ResumeListResponse> => {
+    const response = await apiClient.get<ResumeListResponse>('/api/my-resumes/', { params });
     return response.data;
   },
 
@@ -107,7 +107,17 @@ export interface ResumeListItem {
 
 export interface ResumeListResponse {
   resumes: ResumeListItem[];
-  total: number;
+  count: number;
+  has_more: boolean;
+  next_cursor: string | null;
+}
+
+export interface ResumeListParams {
+  cursor?: string;
+  limit?: number;
+  status?: 'pending' | 'processing' | 'completed' | 'failed';
+  min_score?: number;
+  max_score?: number;
 }
 
 export interface JobDescriptionRequest {